@@ -23,12 +23,15 @@ from tkinterdnd2 import Tk
 
 from .app_utils.audio_utils import AudioDownloader
 from .app_utils.cards import Card
-from .app_utils.decks import CardStatus, Deck, FrozenDict, SavedDataDeck
+from .app_utils.decks import CardStatus, Deck, SavedDataDeck
 from .app_utils.error_handling import create_exception_message, error_handler
 from .app_utils.global_bindings import Binder
+from .app_utils.image_cache import ImageCache
 from .app_utils.image_utils import ImageSearch
 from .app_utils.query_language.exceptions import QueryLangException
-from .app_utils.query_language.query_processing import get_card_filter
+from .app_utils.query_language.query_processing import (explain_query,
+                                                         get_card_filter,
+                                                         profile_query)
 from .app_utils.string_utils import remove_special_chars
 from .app_utils.widgets import EntryWithPlaceholder as Entry
 from .app_utils.widgets import ScrolledFrame
@@ -39,8 +42,12 @@ from .consts.paths import *
 from .plugins_loading.chaining import (ChainDataStorage, PossibleChainTypes, CHAIN_INFO_T)
 from .plugins_loading.containers import LanguagePackageContainer
 from .plugins_loading.factory import loaded_plugins
+from .plugins_loading.monitoring import SOURCE_HEALTH
+from .plugins_loading.process_pool import PLUGIN_PROCESS_POOL
 from .plugins_loading.wrappers import ExternalDataGenerator, GeneratorReturn
 from .plugins_management.config_management import Config, LoadableConfig
+from .plugins_management.http_cache import HTTPCache
+from .plugins_management.http_client import HTTP_CLIENT
 from .plugins_management.parsers_return_types import (
     AUDIO_DATA_T, AUDIO_SCRAPPER_RETURN_T, IMAGE_DATA_T,
     IMAGE_SCRAPPER_RETURN_T, SENTENCE_DATA_T, SENTENCE_SCRAPPER_RETURN_T)
@@ -65,6 +72,19 @@ class App(Tk):
             return
         self.configurations.save()
 
+        if self.configurations["http_cache"]["enabled"]:
+            HTTP_CLIENT.set_cache(
+                HTTPCache(cache_dir=str(HTTP_CACHE_DIR),
+                          max_size=self.configurations["http_cache"]["max_size_mb"] * 2 ** 20,
+                          default_ttl=self.configurations["http_cache"]["default_ttl_hours"] * 60 * 60),
+                offline_fallback=self.configurations["http_cache"]["offline_fallback"])
+        self.image_cache = ImageCache(cache_dir=str(IMAGE_CACHE_DIR),
+                                      max_size=self.configurations["image_search"]["cache_max_size_mb"] * 2 ** 20) \
+            if self.configurations["image_search"]["cache_max_size_mb"] > 0 else None
+        PLUGIN_PROCESS_POOL.configure(n_workers=self.configurations["plugin_processes"]["n_workers"],
+                                      call_timeout=self.configurations["plugin_processes"]["call_timeout"],
+                                      isolated_plugins=self.configurations["plugin_processes"]["isolated_plugins"])
+
         self.theme = loaded_plugins.get_theme(self.configurations["app"]["theme"])
         self.configure(**self.theme.root_cfg)
         self.Label = partial(Label, **self.theme.label_cfg)
@@ -538,6 +558,23 @@ class App(Tk):
             Maximum saving image height to which image would be scaled
             type: integer | null
             no scaling if null
+
+        images_memory_budget_mb
+            Memory for compressed images found by the search, in megabytes.
+            The oldest ones are moved to temporary files when it is exceeded
+            type: integer | float
+            default: 64
+
+        cache_max_size_mb
+            Size of the disk cache of found images and their thumbnails, in megabytes.
+            Cache is disabled if 0. Changes take effect after restart
+            type: integer
+            default: 128
+
+        max_image_size_mb
+            Downloads of bigger images are aborted
+            type: integer | float
+            default: 10
         """
 
             @error_handler(self.show_exception_logs)
@@ -833,6 +870,7 @@ class App(Tk):
         help_menu.add_command(label=self.lang_pack.hotkeys_and_buttons_help_menu_label, command=self.help_command)
         help_menu.add_command(label=self.lang_pack.query_settings_language_label_text,
                               command=self.get_query_language_help)
+        help_menu.add_command(label=self.lang_pack.sources_health_menu_label, command=self.sources_health_dialog)
         file_menu.add_cascade(label=self.lang_pack.help_master_menu_label, menu=help_menu)
 
         file_menu.add_separator()
@@ -1579,15 +1617,18 @@ class App(Tk):
                                                                          "all"])
             },
             "image_search": {
-                "starting_position":   ("+0+0", [str], []),
-                "saving_image_width":  (300, [int, type(None)], []),
-                "saving_image_height": (None, [int, type(None)], []),
-                "max_request_tries":   (1, [int], []),
-                "timeout":             (1, [int, float], []),
-                "show_image_width":    (250, [int, type(None)], []),
-                "show_image_height":   (None, [int, type(None)], []),
-                "n_images_in_row":     (3, [int], []),
-                "n_rows":              (2, [int], [])
+                "starting_position":       ("+0+0", [str], []),
+                "saving_image_width":      (300, [int, type(None)], []),
+                "saving_image_height":     (None, [int, type(None)], []),
+                "max_request_tries":       (1, [int], []),
+                "timeout":                 (1, [int, float], []),
+                "show_image_width":        (250, [int, type(None)], []),
+                "show_image_height":       (None, [int, type(None)], []),
+                "n_images_in_row":         (3, [int], []),
+                "n_rows":                  (2, [int], []),
+                "images_memory_budget_mb": (64, [int, float], []),
+                "cache_max_size_mb":       (128, [int], []),
+                "max_image_size_mb":       (10, [int, float], [])
             },
             "extern_sentence_placer": {
                 "n_sentences_per_batch": (5, [int], [])
@@ -1599,6 +1640,17 @@ class App(Tk):
                 "timeout": (1, [int], []),
                 "request_delay": (3000, [int], [])
             },
+            "http_cache": {
+                "enabled":           (True, [bool], []),
+                "max_size_mb":       (256, [int], []),
+                "default_ttl_hours": (24, [int, float], []),
+                "offline_fallback":  (True, [bool], [])
+            },
+            "plugin_processes": {
+                "isolated_plugins": ([], [list], []),
+                "n_workers":        (2, [int], []),
+                "call_timeout":     (30, [int, float], [])
+            },
             "deck": {
                 "tags_hierarchical_pref": ("", [str], []),
                 "saving_format":          ("anki_package", [str], []),
@@ -1684,8 +1736,10 @@ class App(Tk):
         xsb.grid(row=1, column=0, columnspan=2, sticky="ew")
         items_table.configure(xscroll=xsb.set)
 
-        full_saved_card_data: FrozenDict = {}
-        editor_card_data: Card = {}
+        # edited card is a mutable copy that is written back to the saved deck by save_saved_card
+        full_saved_card_data: dict = {}
+        full_saved_card_index: int = -1
+        editor_card_data: dict = {}
         added_cards_list = []
 
         for i, saved_card_data in enumerate(self.saved_cards_data):
@@ -1743,16 +1797,21 @@ class App(Tk):
         editor_dict_tags_field.grid(row=4, column=0, columnspan=8, sticky="news",
                                     padx=editor_text_padx, pady=editor_text_pady)
 
+        def save_saved_card():
+            if full_saved_card_data:
+                self.saved_cards_data.replace(full_saved_card_index, full_saved_card_data)
+
         def edit_saved_images(new_image_urls: list[str]):
             if full_saved_card_data.get(SavedDataDeck.ADDITIONAL_DATA) is None:
-                full_saved_card_data._data[SavedDataDeck.ADDITIONAL_DATA] = {SavedDataDeck.SAVED_IMAGES_PATHS: []}
-            elif full_saved_card_data._data[SavedDataDeck.ADDITIONAL_DATA].get(
+                full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA] = {SavedDataDeck.SAVED_IMAGES_PATHS: []}
+            elif full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA].get(
                     SavedDataDeck.SAVED_IMAGES_PATHS) is None:
-                full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA]._data[SavedDataDeck.SAVED_IMAGES_PATHS] = []
+                full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA][SavedDataDeck.SAVED_IMAGES_PATHS] = []
 
             saving_dst = full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA][SavedDataDeck.SAVED_IMAGES_PATHS]
             saving_dst.clear()
             saving_dst.extend(new_image_urls)
+            save_saved_card()
 
         editor_fetch_images_button = self.Button(
             item_editor_frame,
@@ -2089,9 +2148,9 @@ class App(Tk):
             if not full_saved_card_data:
                 return
 
-            editor_card_data._data[CardFields.word] = editor_word_text.get(1.0, "end").rstrip()
+            editor_card_data[CardFields.word] = editor_word_text.get(1.0, "end").rstrip()
             items_table.set(selection_index, "#1", editor_card_data[CardFields.word].replace("\n", " "))
-            editor_card_data._data[CardFields.definition] = editor_definition_text.get(1.0, "end").rstrip()
+            editor_card_data[CardFields.definition] = editor_definition_text.get(1.0, "end").rstrip()
             items_table.set(selection_index, "#2", editor_card_data[CardFields.definition].replace("\n", " "))
 
             user_tags = editor_user_tags_field.get().strip()
@@ -2101,16 +2160,16 @@ class App(Tk):
 
             if user_tags or hierarchical_prefix:
                 if full_saved_card_data.get(SavedDataDeck.ADDITIONAL_DATA) is None:
-                    full_saved_card_data._data[SavedDataDeck.ADDITIONAL_DATA] = {}
+                    full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA] = {}
                 if user_tags:
-                    full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA]._data[SavedDataDeck.USER_TAGS] = user_tags
+                    full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA][SavedDataDeck.USER_TAGS] = user_tags
                 if hierarchical_prefix:
-                    full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA]._data[
+                    full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA][
                         SavedDataDeck.HIERARCHICAL_PREFIX] = hierarchical_prefix
 
-            editor_card_data._data[CardFields.sentences] = []
+            editor_card_data[CardFields.sentences] = []
             for sentence in editor_chosen_sentences.values():
-                editor_card_data._data[CardFields.sentences].append(sentence)
+                editor_card_data[CardFields.sentences].append(sentence)
 
             items_table.set(selection_index, "#3", " | ".join((i.replace("\n", " ") for i in editor_chosen_sentences.values())))
 
@@ -2120,7 +2179,7 @@ class App(Tk):
                     return
 
                 if full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA].get(SavedDataDeck.AUDIO_DATA) is None:
-                    full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA][SavedDataDeck.AUDIO_DATA]._data = {
+                    full_saved_card_data[SavedDataDeck.ADDITIONAL_DATA][SavedDataDeck.AUDIO_DATA] = {
                         SavedDataDeck.AUDIO_SRCS: [],
                         SavedDataDeck.AUDIO_SRCS_TYPE: [],
                         SavedDataDeck.AUDIO_SAVING_PATHS: []
@@ -2168,6 +2227,7 @@ class App(Tk):
             if audio_getters_audios:
                 add_audio_data_to_card(audio_getter_info=last_audio_getter_data,
                                        audio_links=audio_getters_audios)
+            save_saved_card()
 
         previously_selected_item: str = ""
 
@@ -2175,6 +2235,7 @@ class App(Tk):
             nonlocal \
                 previously_selected_item, \
                 full_saved_card_data, \
+                full_saved_card_index, \
                 editor_card_data, \
                 editor_audio_inner_frame, \
                 editor_text_widgets_frame, \
@@ -2189,12 +2250,14 @@ class App(Tk):
             previously_selected_item = selected_item_index
 
             *_, added_card_index = items_table.item(selected_item_index)["values"]
-            full_saved_card_data = self.saved_cards_data[added_card_index]
-            if full_saved_card_data is None:
+            if (saved_card_data := self.saved_cards_data[added_card_index]) is None:
+                full_saved_card_data = {}
                 str_selection_index = items_table.selection()[0]
                 items_table.delete(str_selection_index)
                 return False
 
+            full_saved_card_data = saved_card_data.to_dict()
+            full_saved_card_index = added_card_index
             editor_card_data = full_saved_card_data[SavedDataDeck.CARD_DATA]
             # ====
 
@@ -2660,6 +2723,21 @@ class App(Tk):
                          f"{self.lang_pack.current_scheme_label}:\n{current_scheme}\n"
                          f"{self.lang_pack.query_language_label}:\n{lang_docs}")
 
+    @error_handler(show_exception_logs)
+    def sources_health_dialog(self):
+        report = "\n\n".join(section for section in (SOURCE_HEALTH.get_report(), HTTP_CLIENT.get_report()) if section) \
+                 or self.lang_pack.sources_health_no_calls_text
+        health_window = self.show_window(self.lang_pack.sources_health_menu_label, report)
+
+        def reset_sources_health():
+            SOURCE_HEALTH.reset()
+            health_window.destroy()
+
+        reset_button = self.Button(health_window,
+                                   text=self.lang_pack.sources_health_reset_button_text,
+                                   command=reset_sources_health)
+        reset_button.pack(fill="x")
+
     @error_handler(show_exception_logs)
     def download_audio(self, choose_file=False, closing=False):
         if choose_file:
@@ -2797,6 +2875,22 @@ class App(Tk):
                 find_window.destroy()
                 return
 
+            # EXPLAIN has to be a separate word, so that queries starting with it aren't swallowed
+            if find_query.split(maxsplit=1)[0] == "EXPLAIN":
+                explained_query = find_query[len("EXPLAIN"):].strip()
+                try:
+                    report = f"{explain_query(explained_query)}\n\n" \
+                             f"{profile_query(explained_query, (card for _, card in self.deck))}"
+                except QueryLangException as e:
+                    messagebox.showerror(title=self.lang_pack.error_title,
+                                         message=str(e))
+                    find_window.withdraw()
+                    find_window.deiconify()
+                    return
+                find_window.destroy()
+                self.show_window(title=self.lang_pack.find_dialog_explain_window_title, text=report)
+                return
+
             try:
                 searching_filter = get_card_filter(find_query)
             except QueryLangException as e:
@@ -2938,6 +3032,7 @@ class App(Tk):
                                   message=self.lang_pack.on_closing_message):
             self.save_files()
             self.global_binder.stop()
+            PLUGIN_PROCESS_POOL.shutdown()
             self.download_audio(closing=True)
 
     @error_handler(show_exception_logs)
@@ -3492,7 +3587,7 @@ class App(Tk):
                                                      instance.images_source[i],
                                                      self.configurations["scrappers"]["image"]["name"],
                                                      card_data))
-                    instance.preprocess_image(img=instance.saving_images[i],
+                    instance.preprocess_image(img=instance.saving_images[i].open(),
                                               width=self.configurations["image_search"]["saving_image_width"],
                                               height=self.configurations["image_search"]["saving_image_height"]) \
                         .save(saving_name)
@@ -3519,6 +3614,9 @@ class App(Tk):
                                    n_rows=self.configurations["image_search"]["n_rows"],
                                    show_image_width=self.configurations["image_search"]["show_image_width"],
                                    show_image_height=self.configurations["image_search"]["show_image_height"],
+                                   image_cache=self.image_cache,
+                                   max_image_size=int(self.configurations["image_search"]["max_image_size_mb"] * 2 ** 20),
+                                   images_memory_budget=int(self.configurations["image_search"]["images_memory_budget_mb"] * 2 ** 20),
                                    button_padx=button_padx,
                                    button_pady=button_pady,
                                    window_height_limit=height_lim,
@@ -4,10 +4,9 @@ from enum import IntEnum
 from tkinter import (BooleanVar, Button, Checkbutton, Label, Toplevel,
                      messagebox, ttk)
 
-import requests
-
 from ..consts.parser_types import ParserType
 from ..plugins_loading.containers import LanguagePackageContainer
+from ..plugins_management import http_client
 from .decks import SavedDataDeck
 from .storages import FrozenDict
 from .window_utils import spawn_window_in_center
@@ -84,7 +83,7 @@ class AudioDownloader(Toplevel):
     @staticmethod
     def fetch_audio(url, save_path, headers, timeout=5, exception_action=lambda exc: None) -> bool:
         try:
-            r = requests.get(url, headers=headers, timeout=timeout)
+            r = http_client.get(url, headers=headers, timeout=timeout)
             r.raise_for_status()
         except Exception as e:
             exception_action(e)
@@ -0,0 +1,67 @@
+"""
+Measures memory retained by a loaded deck with Card and CompactCard representations.
+
+Usage (from the repository root):
+    python -m src.app_utils.benchmark_cards_memory [n_cards]
+"""
+
+
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from typing import Callable
+
+from .cards import Card, CardInterner, CompactCard
+
+
+def generate_deck_json(n_cards: int) -> str:
+    rng = random.Random(0)
+    parsers = ("[web] cambridge", "[web] google", "[local] wordset")
+    words = [f"word_{i}" for i in range(n_cards // 3 + 1)]
+    deck = []
+    for i in range(n_cards):
+        word = rng.choice(words)
+        deck.append((rng.choice(parsers), {
+            "word": word,
+            "special": rng.sample(["informal", "formal", "approving", "literary"], k=rng.randint(0, 2)),
+            "definition": f"definition of {word} number {i}",
+            "examples": [f"example {j} of {word} in card {i}" for j in range(rng.randint(0, 4))],
+            "image_links": [],
+            "audio_links": [f"https://dictionary.example/media/{word}/{region}.mp3" for region in ("uk", "us")],
+            "tags": {
+                "pos": [rng.choice(["noun", "verb", "adjective", "adverb"])],
+                "level": [rng.choice(["A1", "A2", "B1", "B2", "C1", "C2"])],
+                "region": rng.sample(["UK", "US", "AUS"], k=rng.randint(0, 1)),
+                "usage": rng.sample(["informal", "formal", "specialized"], k=rng.randint(0, 1)),
+                "domain": rng.sample(["FINANCE", "LAW", "MEDICINE", "SPORT"], k=rng.randint(0, 1)),
+            },
+        }))
+    return json.dumps(deck)
+
+
+def measure(deck_json: str, card_factory: Callable, parser_name_factory: Callable[[str], str]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    deck = [(parser_name_factory(i[0]), card_factory(i[1])) for i in json.loads(deck_json)]
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del deck
+    return retained
+
+
+def main(n_cards: int = 100_000) -> None:
+    deck_json = generate_deck_json(n_cards)
+    before = measure(deck_json, Card, lambda name: name)
+    interner = CardInterner()
+    after = measure(deck_json, lambda card: CompactCard(card, interner), sys.intern)
+    print(f"{n_cards} cards")
+    print(f"Card:        {before / 2 ** 20:8.1f} MiB ({before / n_cards:6.0f} B/card)")
+    print(f"CompactCard: {after / 2 ** 20:8.1f} MiB ({after / n_cards:6.0f} B/card)")
+    print(f"saved: {1 - after / before:.1%}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -1,7 +1,8 @@
-from typing import Any, Callable, Union
+import sys
+from typing import Any, Callable, Iterator, Mapping, Union
 
 from ..consts.card_fields import CardFields
-from .storages import FrozenDict
+from .storages import FrozenDict, FrozenList, _FrozenDictNode
 
 
 class Card(FrozenDict):
@@ -25,17 +26,17 @@ class Card(FrozenDict):
         if (dictionary_tags := card_data.get(CardFields.dict_tags)) is None:
             return ""
 
-        def traverse_tags_dict(res_container: list[str], current_item: dict, cur_stage_prefix: str = ""):
+        def traverse_tags_dict(res_container: list[str], current_item: Mapping, cur_stage_prefix: str = ""):
             nonlocal sep
 
             for key in current_item:
                 cur_prefix = f"{cur_stage_prefix}{tag_processor(key)}{sep}"
 
-                if isinstance((value := current_item[key]), dict):
+                if isinstance((value := current_item[key]), Mapping):
                     traverse_tags_dict(res_container, value, cur_prefix)
-                elif isinstance(value, list):
+                elif isinstance(value, (list, tuple)):
                     for item in value:
-                        if isinstance(item, dict):
+                        if isinstance(item, Mapping):
                             traverse_tags_dict(res_container, item, cur_prefix)
                         else:
                             res_container.append(f"{cur_prefix}{tag_processor(item)}")
@@ -47,3 +48,171 @@ class Card(FrozenDict):
         traverse_tags_dict(tags_container, dictionary_tags, cur_stage_prefix=p)
         return " ".join(tags_container)
 
+
+_MISSING = object()
+_EMPTY_LIST = FrozenList()
+
+
+class CardInterner:
+    """Tables of tag keys, lists and tag trees shared by cards of a single deck.
+    They are dropped together with the deck"""
+    __slots__ = "keys", "lists", "tags"
+
+    def __init__(self):
+        self.keys: dict[tuple, tuple] = {}
+        self.lists: dict[FrozenList, FrozenList] = {}
+        self.tags: dict[tuple, "_TagsNode"] = {}
+
+    def compact_list(self, value: list | tuple, intern_items: bool) -> FrozenList:
+        if not value:
+            return _EMPTY_LIST
+        if not intern_items:
+            return FrozenList(value)
+        compact = FrozenList(self.compact_tag(item) for item in value)
+        try:
+            return self.lists.setdefault(compact, compact)
+        except TypeError:  # unhashable items
+            return compact
+
+    def compact_tag(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, Mapping):
+            return _TagsNode(value, self)
+        if isinstance(value, (list, tuple)):
+            return self.compact_list(value, intern_items=True)
+        return value
+
+
+class _TagsNode(_FrozenDictNode):
+    """Tags level stored as interned tuples of keys and values.
+    Identical tag trees are shared across cards of a deck"""
+    __slots__ = "_keys", "_values"
+
+    def __new__(cls, tags: Mapping[Any, Any], interner: CardInterner | None = None):
+        if interner is None:
+            interner = CardInterner()
+        keys = tuple(sys.intern(key) if isinstance(key, str) else key for key in tags)
+        keys = interner.keys.setdefault(keys, keys)
+        values = tuple(interner.compact_tag(tags[key]) for key in keys)
+
+        cache_key = (keys, values)
+        try:
+            if (cached := interner.tags.get(cache_key)) is not None:
+                return cached
+        except TypeError:  # unhashable values
+            cache_key = None
+
+        instance = super(_TagsNode, cls).__new__(cls)
+        instance._keys = keys
+        instance._values = values
+        if cache_key is not None:
+            interner.tags[cache_key] = instance
+        return instance
+
+    def __init__(self, tags: Mapping[Any, Any], interner: CardInterner | None = None):
+        pass
+
+    @classmethod
+    def _from_frozen_data(cls, data: dict[Any, Any]):
+        return cls(data)
+
+    @property
+    def _data(self) -> dict[Any, Any]:
+        return dict(zip(self._keys, self._values))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __getitem__(self, item):
+        try:
+            return self._values[self._keys.index(item)]
+        except ValueError:
+            raise KeyError(item) from None
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, item):
+        return item in self._keys
+
+    def __bool__(self):
+        return bool(self._keys)
+
+    def __hash__(self):
+        return hash((self._keys, self._values))
+
+
+class CompactCard(Card):
+    """Memory-lean Card used for large decks. Fixed card fields are kept in slots,
+    short repeated strings are interned and tags are stored as shared tuples.
+    Tags and lists are shared only among cards created with the same interner.
+    Lists are exposed as read-only FrozenList that thaws into lists"""
+    __slots__ = "_word", "_special", "_definition", "_examples", \
+                "_image_links", "_audio_links", "_tags", "_extra"
+
+    _FIELD_SLOTS = ((CardFields.word,        "_word"),
+                    (CardFields.special,     "_special"),
+                    (CardFields.definition,  "_definition"),
+                    (CardFields.sentences,   "_examples"),
+                    (CardFields.img_links,   "_image_links"),
+                    (CardFields.audio_links, "_audio_links"),
+                    (CardFields.dict_tags,   "_tags"))
+    _SLOT_BY_FIELD = {str(card_field): slot for card_field, slot in _FIELD_SLOTS}
+
+    def __init__(self, card_fields: Mapping[str, Any] | None = None, interner: CardInterner | None = None):
+        if interner is None:
+            interner = CardInterner()
+        for _, slot in CompactCard._FIELD_SLOTS:
+            object.__setattr__(self, slot, _MISSING)
+        extra = {}
+        for key, value in ({} if card_fields is None else card_fields).items():
+            if (slot := CompactCard._SLOT_BY_FIELD.get(key)) is None:
+                extra[key] = value
+                continue
+
+            if key == CardFields.word:
+                value = sys.intern(value) if isinstance(value, str) else value
+            elif key == CardFields.dict_tags:
+                value = interner.compact_tag(value)
+            elif isinstance(value, (list, tuple)):
+                value = interner.compact_list(value, intern_items=key == CardFields.special)
+            object.__setattr__(self, slot, value)
+        self._extra = FrozenDict(extra)._data if extra else None
+
+    @classmethod
+    def _from_frozen_data(cls, data: dict[Any, Any]):
+        return cls(data)
+
+    @property
+    def _data(self) -> dict[Any, Any]:
+        return {key: self[key] for key in self}
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __getitem__(self, item):
+        if (slot := CompactCard._SLOT_BY_FIELD.get(item)) is not None:
+            if (value := getattr(self, slot)) is _MISSING:
+                raise KeyError(item)
+            return value
+        if self._extra is None:
+            raise KeyError(item)
+        return self._extra[item]
+
+    def __iter__(self) -> Iterator[str]:
+        for card_field, slot in CompactCard._FIELD_SLOTS:
+            if getattr(self, slot) is not _MISSING:
+                yield card_field.value
+        if self._extra is not None:
+            yield from self._extra
+
+    def __contains__(self, item):
+        try:
+            self[item]
+        except KeyError:
+            return False
+        return True
+
+    def __bool__(self):
+        return any(True for _ in self)
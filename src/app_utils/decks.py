@@ -1,18 +1,19 @@
 import json
 import os
+import sys
 from enum import Enum
-from typing import Callable, Generator, NoReturn, Optional
+from typing import Any, Callable, Generator, Mapping, NoReturn, Optional
 
 from ..plugins_loading.wrappers import CardGeneratorProtocol
 
-from .cards import Card
+from .cards import Card, CardInterner, CompactCard
 from .storages import FrozenDict, FrozenDictJSONEncoder, PointerList
 from ..consts import ParserType
 
 
 class Deck(PointerList[tuple[str, Card], tuple[str, Card]]):
     __slots__ = "deck_path", "_card_generator", "_cards_left", \
-                "card_addition_limit", "card2deck_gen"
+                "card_addition_limit", "card2deck_gen", "_interner"
 
     def __init__(self, deck_path: str,
                  current_deck_pointer: int,
@@ -21,13 +22,14 @@ class Deck(PointerList[tuple[str, Card], tuple[str, Card]]):
             raise Exception("Invalid _deck path!")
 
         self.deck_path = deck_path
+        self._interner = CardInterner()
 
         self._card_generator: CardGeneratorProtocol = card_generator
         self.card2deck_gen = self._launch_card_to_deck_generator()
         next(self.card2deck_gen)
 
         with open(self.deck_path, "r", encoding="UTF-8") as f:
-            deck: list[tuple[str, Card]] = [(i[0], Card(i[1])) for i in json.load(f)]
+            deck: list[tuple[str, Card]] = [(sys.intern(i[0]), CompactCard(i[1], self._interner)) for i in json.load(f)]
         super(Deck, self).__init__(data=deck,
                                    starting_position=min(current_deck_pointer, len(deck) - 1),
                                    default_return_value=("", Card()))
@@ -74,7 +76,10 @@ class Deck(PointerList[tuple[str, Card], tuple[str, Card]]):
                 for i in range(len(res)):
                     object.__setattr__(res[i].parser_info, "name", f"{self._card_generator.parser_info.full_name}{res[i].parser_info.name}")
 
-            parser_card_pairs = [(generator_result.parser_info.full_name, card) for generator_result in res for card in generator_result.result]
+            parser_card_pairs = []
+            for generator_result in res:
+                parser_name = sys.intern(generator_result.parser_info.full_name)
+                parser_card_pairs.extend((parser_name, CompactCard(card, self._interner)) for card in generator_result.result)
             continuation_flag = yield len(parser_card_pairs)
             if not (continuation_flag):
                 continue
@@ -145,6 +150,14 @@ class SavedDataDeck(PointerList):
         self._pointer_position += 1
         self._statistics[status.value] += 1
 
+    def replace(self, index: int, card_page: Mapping[str, Any]) -> None:
+        """Replaces saved page with its edited to_dict() copy. Card status is kept"""
+        card_page = dict(card_page)
+        card_page[SavedDataDeck.CARD_STATUS] = self._data[index][SavedDataDeck.CARD_STATUS]
+        if (card_data := card_page.get(SavedDataDeck.CARD_DATA)) is not None:
+            card_page[SavedDataDeck.CARD_DATA] = Card(card_data)
+        self._data[index] = FrozenDict(card_page)
+
     def move(self, n: int) -> None:
         if n < 0:
             super(SavedDataDeck, self).move(n)
@@ -0,0 +1,52 @@
+"""
+Persistent cache of images found by the image search.
+Original images and their thumbnails of every displayed size are stored by url
+in a size-bounded LRU file store.
+"""
+
+
+import time
+from typing import Callable, Optional
+
+from ..plugins_management.file_store import LRUFileStore
+
+DEFAULT_MAX_SIZE = 128 * 2 ** 20
+
+
+def _get_original_key(url: str) -> str:
+    return f"original {url}"
+
+
+def _get_thumbnail_key(url: str, width: Optional[int], height: Optional[int]) -> str:
+    return f"thumbnail {width}x{height} {url}"
+
+
+class ImageCache:
+    def __init__(self,
+                 cache_dir: str,
+                 max_size: int = DEFAULT_MAX_SIZE,
+                 clock: Callable[[], float] = time.time):
+        self._store = LRUFileStore(cache_dir, max_size, clock)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        if (stored := self._store.get(key)) is None:
+            return None
+        return stored.content
+
+    def get_original(self, url: str) -> Optional[bytes]:
+        return self._get(_get_original_key(url))
+
+    def put_original(self, url: str, content: bytes) -> None:
+        self._store.put(_get_original_key(url), content)
+
+    def get_thumbnail(self, url: str, width: Optional[int], height: Optional[int]) -> Optional[bytes]:
+        return self._get(_get_thumbnail_key(url, width, height))
+
+    def put_thumbnail(self, url: str, width: Optional[int], height: Optional[int], content: bytes) -> None:
+        self._store.put(_get_thumbnail_key(url, width, height), content)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def close(self) -> None:
+        self._store.close()
@@ -1,21 +1,23 @@
-import copy
 import os
+import queue
+import tempfile
 import time
-from collections import UserList
-from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, UserList
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import IntEnum
 from functools import partial
 from io import BytesIO
 from tkinter import Button, Entry, Frame, Toplevel, messagebox
-from typing import Any, Callable, Generator
+from typing import Any, Callable, Generator, Optional
 
-import requests
 from PIL import Image, ImageTk
 from requests.exceptions import ConnectTimeout, RequestException
 from tkinterdnd2 import DND_FILES, DND_TEXT
 
 from ..consts.paths import SYSTEM
 from ..plugins_loading.containers import LanguagePackageContainer
+from ..plugins_management import http_client
+from .image_cache import ImageCache
 from .widgets import ScrolledFrame
 from ..plugins_loading.wrappers import ExternalDataGenerator, GeneratorReturn
 
@@ -50,12 +52,124 @@ class _UrlDeque(UserList):
             self.appendleft(collection[i])
 
 
+IMAGES_MEMORY_BUDGET = 64 * 2 ** 20
+COMPLETION_CHECK_INTERVAL = 20  # ms
+# images whose hashes differ in fewer bits are considered the same picture
+DUPLICATE_HASH_DISTANCE = 6
+
+MAX_IMAGE_SIZE = 10 * 2 ** 20
+MAX_IMAGE_PIXELS = 50_000_000
+DOWNLOAD_CHUNK_SIZE = 16 * 1024
+# dimensions are looked for only in the beginning of the file
+HEADER_PROBE_LIMIT = 64 * 1024
+# some servers don't know types of files they serve
+BINARY_CONTENT_TYPES = ("application/octet-stream", "binary/octet-stream")
+IMAGE_SIGNATURES = (b"\xff\xd8\xff",           # JPEG
+                    b"\x89PNG\r\n\x1a\n",      # PNG
+                    b"GIF87a", b"GIF89a",
+                    b"BM",                     # BMP
+                    b"II*\x00", b"MM\x00*",    # TIFF
+                    b"\x00\x00\x01\x00")       # ICO
+SIGNATURE_LENGTH = 12
+
+
+def has_image_signature(head: bytes) -> bool:
+    """Checks magic bytes of the file beginning"""
+    return head.startswith(IMAGE_SIGNATURES) or (head[:4] == b"RIFF" and head[8:12] == b"WEBP")
+
+
+def get_dhash(img: Image.Image, hash_size: int = 8) -> int:
+    """Difference hash: signs of horizontal brightness gradients of the image shrunk to (hash_size + 1) x hash_size.
+    It stays the same for resized and recompressed copies of an image"""
+    row_length = hash_size + 1
+    pixels = list(img.convert("L").resize((row_length, hash_size), Image.LANCZOS).getdata())
+    image_hash = 0
+    for row in range(hash_size):
+        for column in range(hash_size):
+            position = row * row_length + column
+            image_hash = image_hash << 1 | (pixels[position] > pixels[position + 1])
+    return image_hash
+
+
+class StoredImage:
+    """Compressed image of a search candidate. It is decoded at full size only when it is saved"""
+    __slots__ = ("content", "path", "size", "image_hash")
+
+    def __init__(self, content: bytes, image_hash: Optional[int] = None):
+        self.content: Optional[bytes] = content
+        self.path: Optional[str] = None
+        self.size = len(content)
+        self.image_hash = image_hash
+
+    @classmethod
+    def from_image(cls, img: Image.Image, image_hash: Optional[int] = None) -> "StoredImage":
+        buffer = BytesIO()
+        img.save(buffer, format="PNG")
+        return cls(buffer.getvalue(), image_hash)
+
+    def spill(self, directory: str) -> None:
+        """Moves compressed image into a temporary file"""
+        file_descriptor, path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(file_descriptor, "wb") as image_file:
+            image_file.write(self.content)
+        self.path = path
+        self.content = None
+
+    def open(self) -> Image.Image:
+        if self.content is not None:
+            return Image.open(BytesIO(self.content))
+        return Image.open(self.path)
+
+
+class ImageStorage:
+    """Keeps compressed images of search candidates within memory budget.
+    The oldest ones are moved to temporary files when the budget is exceeded"""
+
+    def __init__(self, memory_budget: int = IMAGES_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._in_memory: OrderedDict[int, StoredImage] = OrderedDict()
+        self._memory_usage = 0
+        self._spill_dir: Optional[tempfile.TemporaryDirectory] = None
+
+    def add(self, stored_image: StoredImage) -> StoredImage:
+        self._in_memory[id(stored_image)] = stored_image
+        self._memory_usage += stored_image.size
+        while self._memory_usage > self.memory_budget and len(self._in_memory) > 1:
+            _, oldest = next(iter(self._in_memory.items()))
+            try:
+                if self._spill_dir is None:
+                    self._spill_dir = tempfile.TemporaryDirectory(prefix="image_search_")
+                oldest.spill(self._spill_dir.name)
+            except OSError:  # images are kept in memory then
+                break
+            del self._in_memory[id(oldest)]
+            self._memory_usage -= oldest.size
+        return stored_image
+
+    def discard(self, stored_image: StoredImage) -> None:
+        if self._in_memory.pop(id(stored_image), None) is not None:
+            self._memory_usage -= stored_image.size
+        elif stored_image.path is not None:
+            try:
+                os.remove(stored_image.path)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        self._in_memory.clear()
+        self._memory_usage = 0
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+            self._spill_dir = None
+
+
 class ImageSearch(Toplevel):
     class StatusCodes(IntEnum):
         NORMAL = 0
         RETRIABLE_FETCHING_ERROR = 1
         NON_RETRIABLE_FETCHING_ERROR = 2
         IMAGE_PROCESSING_ERROR = 3
+        DUPLICATE = 4
 
     def __init__(self, master, search_term: str, lang_pack: LanguagePackageContainer, **kwargs):
         """
@@ -71,6 +185,10 @@ class ImageSearch(Toplevel):
         timeout: request timeout
         show_image_width: maximum image display width
         show_image_height: maximum image display height
+        images_memory_budget: how many bytes of compressed candidates are kept in memory
+        image_cache: persistent cache of fetched images and their thumbnails
+        max_image_size: downloads of bigger images are aborted
+        max_image_pixels: images with more pixels are rejected as soon as their dimensions are received
         n_images_in_row:
         n_rows:
         button_padx:
@@ -103,6 +221,9 @@ class ImageSearch(Toplevel):
 
         self._headers = kwargs.get("headers")
         self._timeout = kwargs.get("timeout", 1)
+        self._image_cache: Optional[ImageCache] = kwargs.get("image_cache")
+        self._max_image_size = kwargs.get("max_image_size", MAX_IMAGE_SIZE)
+        self._max_image_pixels = kwargs.get("max_image_pixels", MAX_IMAGE_PIXELS)
         self._max_request_tries = kwargs.get("max_request_tries", 5)
 
         self._n_images_in_row = kwargs.get("n_images_in_row", 3)
@@ -113,8 +234,14 @@ class ImageSearch(Toplevel):
         self.optimal_visual_height = kwargs.get("show_image_height")
 
         self._pool: ThreadPoolExecutor = ThreadPoolExecutor()
-
-        self.saving_images: list[Image] = []
+        # (UI thread callback, done future) pairs posted by workers
+        self._completion_queue: queue.Queue[tuple[Callable[[Future], None], Future]] = queue.Queue()
+        self._n_pending_tasks = 0
+        self._completion_check_id = None
+        self._button_images_to_place = []
+
+        self._image_storage = ImageStorage(kwargs.get("images_memory_budget", IMAGES_MEMORY_BUDGET))
+        self.saving_images: list[StoredImage] = []
         self.images_source: list[str] = []
         self.working_state: list[bool] = []  # indices of picked buttons
         self.button_list: list[Button] = []
@@ -212,7 +339,7 @@ class ImageSearch(Toplevel):
             self._cb = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
 
         for image_path in self._init_local_img_paths:
-            self._process_single_image(Image.open(image_path), image_path)
+            self._process_local_image(image_path)
 
         for index, custom_image in enumerate(self._init_images):
             self._process_single_image(custom_image, f"init-image-{index}")
@@ -235,12 +362,16 @@ class ImageSearch(Toplevel):
         self._inner_frame = self._sf.display_widget(partial(Frame, **self._frame_params))
         self._img_urls.clear()
 
+        for i in range(len(self.working_state)):
+            if not self.working_state[i]:
+                self._image_storage.discard(self.saving_images[i])
+
         left_indent = 0
         for i in range(len(self.working_state)):
             if self.working_state[i]:
                 self.images_source[left_indent] = self.images_source[i]
                 self.working_state[left_indent] = True
-                self.saving_images[left_indent] = copy.deepcopy(self.saving_images[i])
+                self.saving_images[left_indent] = self.saving_images[i]
 
                 self.button_list[left_indent].grid_remove()
                 b = Button(master=self._inner_frame,
@@ -268,7 +399,11 @@ class ImageSearch(Toplevel):
     def destroy(self):
         if self._on_closing_action is not None:
             self._on_closing_action(self)
+        if self._completion_check_id is not None:
+            self.after_cancel(self._completion_check_id)
+            self._completion_check_id = None
         super(ImageSearch, self).destroy()
+        self._image_storage.close()
 
     def _resize_window(self):
         current_frame_width = self._inner_frame.winfo_width()
@@ -278,56 +413,158 @@ class ImageSearch(Toplevel):
                                      current_frame_height))
 
     @staticmethod
-    def preprocess_image(img: Image, width: int = None, height: int = None) -> Image:
-        resize_is_needed = False
-        new_width = img.width
-        new_height = img.height
+    def get_scaled_size(img_width: int, img_height: int, width: int = None, height: int = None) -> tuple[int, int]:
+        """Size of the image scaled down to fit given width and height with its aspect ratio kept"""
+        new_width = img_width
+        new_height = img_height
 
         if width is not None and new_width > width:
             new_height = int(new_height * width / new_width)
             new_width = width
-            resize_is_needed = True
 
         if height is not None and new_height > height:
             new_width = int(new_width * height / new_height)
             new_height = height
-            resize_is_needed = True
+        return max(1, new_width), max(1, new_height)
 
-        if resize_is_needed:
-            img = img.resize((new_width, new_height), Image.ANTIALIAS)
+    @staticmethod
+    def preprocess_image(img: Image, width: int = None, height: int = None) -> Image:
+        new_size = ImageSearch.get_scaled_size(img.width, img.height, width, height)
+        if new_size != img.size:
+            img = img.resize(new_size, Image.LANCZOS)
+        return img
+
+    @staticmethod
+    def make_thumbnail(content: bytes, width: int = None, height: int = None) -> Image:
+        """Decodes image scaled down to fit given size. JPEG images are decoded at reduced scale right away"""
+        img = Image.open(BytesIO(content))
+        img.draft(None, ImageSearch.get_scaled_size(img.width, img.height, width, height))
+        img = ImageSearch.preprocess_image(img, width=width, height=height)
+        img.load()
         return img
 
     def fetch_image(self, url):
         """
-        fetches image from web
+        fetches image from cache or from web
         :param url: image url
-        :return: status, button_img, img
+        :return: status, content, url
         """
-        try:
-            response = requests.get(url, headers=self._headers, timeout=self._timeout)
-            response.raise_for_status()
-            content = response.content
+        if self._image_cache is not None and (content := self._image_cache.get_original(url)) is not None:
             return ImageSearch.StatusCodes.NORMAL, content, url
+        try:
+            with http_client.get(url, headers=self._headers, timeout=self._timeout, stream=True) as response:
+                response.raise_for_status()
+                content = self._read_image_body(response)
         except ConnectTimeout:
             return ImageSearch.StatusCodes.RETRIABLE_FETCHING_ERROR, None, None
         except RequestException:
             return ImageSearch.StatusCodes.NON_RETRIABLE_FETCHING_ERROR, None, None
+        if content is None:
+            return ImageSearch.StatusCodes.NON_RETRIABLE_FETCHING_ERROR, None, None
+        return ImageSearch.StatusCodes.NORMAL, content, url
 
-    def _schedule_batch_fetching(self, url_batch: list[str]):
-        image_fetch_tasks = []
-        for url in url_batch:
-            image_fetch_tasks.append(self._pool.submit(self.fetch_image, url))
-        return image_fetch_tasks
+    def _read_image_body(self, response) -> Optional[bytes]:
+        """
+        reads streamed response. Download is aborted as soon as it turns out to be not an image,
+        a file bigger than max_image_size or an image with more than max_image_pixels pixels
+        :return: content or None if download was aborted
+        """
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and not content_type.startswith("image/") and content_type not in BINARY_CONTENT_TYPES:
+            return None
+        content_length = response.headers.get("Content-Length", "")
+        if content_length.isdigit() and int(content_length) > self._max_image_size:
+            return None
+
+        content = bytearray()
+        signature_checked = False
+        dimensions_checked = False
+        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+            content += chunk
+            if len(content) > self._max_image_size:
+                return None
+            if not signature_checked and len(content) >= SIGNATURE_LENGTH:
+                if not has_image_signature(content):
+                    return None
+                signature_checked = True
+            if signature_checked and not dimensions_checked and len(content) <= HEADER_PROBE_LIMIT:
+                # header is parsed lazily, so pixel data isn't decoded or allocated here.
+                # ImageFile.Parser isn't used as it allocates the whole image as soon as the header is read
+                try:
+                    with Image.open(BytesIO(content)) as img:
+                        width, height = img.size
+                except Image.DecompressionBombError:
+                    return None
+                except OSError:  # header isn't received yet
+                    continue
+                if width * height > self._max_image_pixels:
+                    return None
+                dimensions_checked = True
+
+        if not signature_checked and not has_image_signature(content):
+            return None
+        return bytes(content)
 
     def process_bin_data(self, content=None):
+        """
+        decodes fetched image. Runs in worker threads, so button image is returned as PIL image.
+        Full size image isn't decoded until it is saved
+        :return: status, button_img, content
+        """
         try:
-            img = Image.open(BytesIO(content))
-            button_img = ImageTk.PhotoImage(
-                self.preprocess_image(img, width=self.optimal_visual_width, height=self.optimal_visual_height))
-            return ImageSearch.StatusCodes.NORMAL, button_img, img
-        except (IOError, UnicodeError):
+            button_img = self.make_thumbnail(content, width=self.optimal_visual_width, height=self.optimal_visual_height)
+            return ImageSearch.StatusCodes.NORMAL, button_img, content
+        except (IOError, UnicodeError, Image.DecompressionBombError):
             return ImageSearch.StatusCodes.IMAGE_PROCESSING_ERROR, None, None
 
+    def _get_cached_thumbnail(self, url) -> Optional[Image.Image]:
+        if self._image_cache is None or \
+                (thumbnail := self._image_cache.get_thumbnail(url,
+                                                              self.optimal_visual_width,
+                                                              self.optimal_visual_height)) is None:
+            return None
+        try:
+            button_img = Image.open(BytesIO(thumbnail))
+            button_img.load()
+            return button_img
+        except (IOError, UnicodeError):
+            return None
+
+    def _cache_image(self, url, content: bytes, button_img: Image.Image):
+        if self._image_cache is None:
+            return
+        self._image_cache.put_original(url, content)
+        thumbnail_buffer = BytesIO()
+        try:
+            button_img.save(thumbnail_buffer, format="PNG")
+        except (IOError, ValueError):  # modes that PNG doesn't support
+            return
+        self._image_cache.put_thumbnail(url, self.optimal_visual_width, self.optimal_visual_height,
+                                        thumbnail_buffer.getvalue())
+
+    def load_image(self, url):
+        """
+        fetches and decodes image in a worker thread
+        :param url: image url
+        :return: status, url, button_img, content, image_hash
+        """
+        fetching_status, content, _ = self.fetch_image(url)
+        if fetching_status != ImageSearch.StatusCodes.NORMAL:
+            return fetching_status, url, None, None, None
+
+        if (button_img := self._get_cached_thumbnail(url)) is None:
+            processing_status, button_img, content = self.process_bin_data(content)
+            if processing_status != ImageSearch.StatusCodes.NORMAL:
+                return processing_status, url, None, None, None
+            # only images that could be decoded are cached
+            self._cache_image(url, content, button_img)
+        return ImageSearch.StatusCodes.NORMAL, url, button_img, content, get_dhash(button_img)
+
+    def _is_duplicate(self, image_hash: int) -> bool:
+        return any(stored_image.image_hash is not None and
+                   (stored_image.image_hash ^ image_hash).bit_count() <= DUPLICATE_HASH_DISTANCE
+                   for stored_image in self.saving_images)
+
     def _choose_picture(self, button_index):
         self.working_state[button_index] = not self.working_state[button_index]
         self.button_list[button_index]["bg"] = self._choose_color if self.working_state[button_index] else self._button_bg
@@ -344,66 +581,108 @@ class ImageSearch(Toplevel):
             self.working_state.append(False)
             self.button_list.append(b)
 
-        self.aaaaaa["bg"] = "green"
         self._inner_frame.update()
         self._resize_window()
 
+    def _submit(self, on_completion: Callable[[Future], None], function: Callable, *args) -> None:
+        """
+        runs function in the worker pool. Its future is passed to on_completion on the UI thread
+        """
+        self._n_pending_tasks += 1
+        future = self._pool.submit(function, *args)
+        future.add_done_callback(lambda done_future: self._completion_queue.put((on_completion, done_future)))
+        if self._completion_check_id is None:
+            self._completion_check_id = self.after(COMPLETION_CHECK_INTERVAL, self._drain_completion_queue)
+
+    def _drain_completion_queue(self):
+        """
+        handles everything completed by workers since the last call. Is rescheduled only while something is pending
+        """
+        self._completion_check_id = None
+        try:
+            while True:
+                try:
+                    on_completion, future = self._completion_queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._n_pending_tasks -= 1
+                on_completion(future)
+        finally:
+            if self._button_images_to_place:
+                button_images_batch, self._button_images_to_place = self._button_images_to_place, []
+                self._place_buttons(button_images_batch)
+            # callbacks that submitted new tasks have already scheduled the next check
+            if self._n_pending_tasks and self._completion_check_id is None:
+                self._completion_check_id = self.after(COMPLETION_CHECK_INTERVAL, self._drain_completion_queue)
+
     def _process_batch(self, batch_size, n_retries=0):
         """
+        images are shown in order of their loading completion, each one taking the next free grid slot
         :param batch_size: how many images to place
         :param n_retries: (if some error occurred) replace "bad" image with the new one and tries to fetch it.
         :return:
         """
-        def wait_url_generation_future(future, on_completion_action: Callable = None):
-            if future.running():
-                self.after(100, lambda: wait_url_generation_future(future, on_completion_action))
+        n_loading = 0
+
+        def check_batch_completion():
+            if not n_loading:
+                self.aaaaaa["bg"] = "green"
+
+        def load_image(url):
+            nonlocal n_loading
+
+            n_loading += 1
+            self._submit(on_image_loaded, self.load_image, url)
+
+        def request_replacement(is_retry: bool):
+            nonlocal n_loading
+
+            n_loading += 1
+            self._submit(partial(on_replacement_generated, is_retry), self._generate_urls, 1)
+
+        def on_image_loaded(future):
+            nonlocal n_loading
+
+            n_loading -= 1
+            status, url, button_img, content, image_hash = future.result()
+            if status == ImageSearch.StatusCodes.NORMAL and self._is_duplicate(image_hash):
+                status = ImageSearch.StatusCodes.DUPLICATE
+
+            if status == ImageSearch.StatusCodes.NORMAL:
+                # Tk objects can only be created on the UI thread
+                self._button_images_to_place.append(ImageTk.PhotoImage(button_img))
+                self.saving_images.append(self._image_storage.add(StoredImage(content, image_hash)))
+                self.images_source.append(url)
+            elif status == ImageSearch.StatusCodes.DUPLICATE:
+                # duplicates don't use up retries, so that the batch is filled with distinct images
+                request_replacement(is_retry=False)
             else:
-                future.result()
-                if on_completion_action is not None:
-                    on_completion_action()
-
-        def schedule_button_placement():
-            def add_fetching_to_queue():
-                def schedule_fetch_image():
-                    nonlocal n_retries
-
-                    if len(self._img_urls) and n_retries < self._max_request_tries:
-                        image_fetching_futures.append(self._pool.submit(self.fetch_image, self._img_urls.popleft()[0]))
-                        n_retries += 1
-
-                wait_url_generation_future(self._pool.submit(self._generate_urls, 1), schedule_fetch_image)
-
-            url_batch = self._img_urls.popleft(batch_size)
-            button_images_batch = []
-            image_fetching_futures = self._schedule_batch_fetching(url_batch)
-
-            def place_buttons_on_future_completion():
-                if not image_fetching_futures:
-                    self._place_buttons(button_images_batch)
-                    return
-
-                while len(image_fetching_futures) and not (current_future := image_fetching_futures[0]).running():
-                    image_fetching_futures.pop(0)
-                    fetching_status, content, url = current_future.result()
-                    if fetching_status == ImageSearch.StatusCodes.NORMAL:
-                        processing_status, button_img, img = self.process_bin_data(content)
-                        if processing_status == ImageSearch.StatusCodes.NORMAL:
-                            button_images_batch.append(button_img)
-                            self.saving_images.append(img)
-                            self.images_source.append(url)
-                        else:
-                            add_fetching_to_queue()
-                    elif fetching_status == ImageSearch.StatusCodes.RETRIABLE_FETCHING_ERROR:
-                        self._img_urls.append(url)
-                        add_fetching_to_queue()
-                    else:
-                        add_fetching_to_queue()
-
-                self.after(100, place_buttons_on_future_completion)
-
-            place_buttons_on_future_completion()
-
-        wait_url_generation_future(self._pool.submit(self._generate_urls, batch_size), schedule_button_placement)
+                if status == ImageSearch.StatusCodes.RETRIABLE_FETCHING_ERROR:
+                    self._img_urls.append(url)
+                request_replacement(is_retry=True)
+            check_batch_completion()
+
+        def on_replacement_generated(is_retry: bool, future):
+            nonlocal n_loading, n_retries
+
+            n_loading -= 1
+            future.result()
+            if len(self._img_urls) and (not is_retry or n_retries < self._max_request_tries):
+                n_retries += is_retry
+                load_image(self._img_urls.popleft()[0])
+            check_batch_completion()
+
+        def on_urls_generated(future):
+            nonlocal n_loading
+
+            n_loading -= 1
+            future.result()
+            for url in self._img_urls.popleft(batch_size):
+                load_image(url)
+            check_batch_completion()
+
+        n_loading += 1
+        self._submit(on_urls_generated, self._generate_urls, batch_size)
 
     def _show_more(self):
         self.update()
@@ -420,20 +699,27 @@ class ImageSearch(Toplevel):
         self.aaaaaa.update()
         yield
 
-    def _process_single_image(self, img: Image.Image, img_src: str):
-        button_img_batch = [ImageTk.PhotoImage(
-            self.preprocess_image(img, width=self.optimal_visual_width, height=self.optimal_visual_height))]
-        
-        self.saving_images.append(img)
+    def _process_single_image(self, img: Image.Image, img_src: str, content: bytes = None):
+        button_img = self.preprocess_image(img, width=self.optimal_visual_width, height=self.optimal_visual_height)
+        button_img_batch = [ImageTk.PhotoImage(button_img)]
+
+        image_hash = get_dhash(button_img)
+        stored_image = StoredImage(content, image_hash) if content is not None else \
+            StoredImage.from_image(img, image_hash)
+        self.saving_images.append(self._image_storage.add(stored_image))
         self.images_source.append(img_src)
         self._place_buttons(button_img_batch)
 
+    def _process_local_image(self, image_path: str):
+        with open(image_path, "rb") as image_file:
+            content = image_file.read()
+        self._process_single_image(Image.open(BytesIO(content)), image_path, content)
+
     def _drop(self, event):
         if event.data:
             data_path = event.data
             if os.path.exists(data_path):
-                img = Image.open(data_path)
-                self._process_single_image(img, data_path)
+                self._process_local_image(data_path)
             elif data_path.startswith("http"):
                 self._img_urls.appendleft(data_path)
                 self._process_batch(batch_size=1, n_retries=self._max_request_tries)
@@ -487,7 +773,7 @@ if __name__ == "__main__":
     def save_on_closing(instance: ImageSearch):
         for i in range(len(instance.working_state)):
             if instance.working_state[i]:
-                instance.saving_images[i].save(f"./{i}.png")
+                instance.saving_images[i].open().save(f"./{i}.png")
 
     def get_chosen_urls(instance: ImageSearch):
         res = []
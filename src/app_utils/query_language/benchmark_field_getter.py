@@ -0,0 +1,127 @@
+"""
+Compares previous recursive FieldDataGetter.compute with precompiled accessors.
+
+Usage (from the repository root):
+    python -m src.app_utils.query_language.benchmark_field_getter [n_cards] [repeat]
+"""
+
+
+import sys
+import timeit
+from collections.abc import Mapping
+from typing import Any, Iterable
+
+from ..storages import FrozenDict
+from .processing_pipeline import DIGIT_FORCE_PREFIX, FieldDataGetter
+
+
+def legacy_compute(query_chain: list[str], mapping: Mapping) -> Any:
+    """FieldDataGetter.compute before accessors precompilation"""
+    result = None
+    seen = False
+
+    def traverse_recursively(entry: Mapping | Any, chain_index: int = 0) -> None:
+        if entry is None:
+            return
+
+        nonlocal result, seen
+        if chain_index == len(query_chain):
+            end = list(entry.keys()) if isinstance(entry, Mapping) else entry
+            if result is None:
+                result = end
+            else:
+                if not seen:
+                    result = [result]
+                    seen = True
+                result.append(end)
+            return
+
+        current_key = query_chain[chain_index]
+        if current_key.startswith(DIGIT_FORCE_PREFIX):
+            current_key = current_key[len(DIGIT_FORCE_PREFIX):]
+            if current_key.lstrip("-").isdigit() and isinstance(entry, (list, tuple)):
+                current_key = int(current_key)
+                if len(entry) > current_key:
+                    traverse_recursively(entry[current_key], chain_index + 1)
+                return
+            elif current_key.lstrip("-").isdecimal():
+                current_key = float(current_key)
+
+        if current_key == FieldDataGetter.ANY_FIELD:
+            if result is None:
+                result = []
+            if isinstance(entry, Mapping):
+                for value in entry.values():
+                    traverse_recursively(value, chain_index + 1)
+            elif isinstance(entry, Iterable):
+                for item in entry:
+                    traverse_recursively(item, chain_index + 1)
+            return
+
+        if not isinstance(entry, Mapping):
+            return None
+
+        elif current_key == FieldDataGetter.SELF_FIELD:
+            return traverse_recursively(entry, chain_index + 1)
+
+        if (val := entry.get(current_key)) is not None:
+            traverse_recursively(val, chain_index + 1)
+
+    traverse_recursively(mapping)
+    return result
+
+
+def generate_cards(n_cards: int) -> list[FrozenDict]:
+    return [
+        FrozenDict({
+            "word": f"word_{i}",
+            "tags": {
+                "domain": ["dom_1", "dom_2"],
+                "level": ["B2", "C1"],
+                "pos": {
+                    pos: {
+                        "region": {
+                            region: {
+                                "usage": [f"usage_{i % 7}", "formal"],
+                                "examples": [f"example {j}" for j in range(3)],
+                            }
+                            for region in ("uk", "us", "au")
+                        },
+                        "frequency": i % 5,
+                    }
+                    for pos in ("noun", "verb", "adjective", "adverb")
+                },
+            },
+        })
+        for i in range(n_cards)
+    ]
+
+
+QUERIES = (
+    "tags[level]",
+    "tags[pos][noun][region][uk][usage]",
+    "tags[pos][$ANY][frequency]",
+    "tags[pos][$ANY][region][$ANY][usage]",
+    "tags[pos][$ANY][region][$ANY][examples][d_$1]",
+    "tags[$SELF][pos][$SELF]",
+)
+
+
+def main(n_cards: int = 1000, repeat: int = 5) -> None:
+    cards = generate_cards(n_cards)
+    print(f"{n_cards} cards, best of {repeat}")
+    print(f"{'query':<50} {'legacy, ms':>12} {'compiled, ms':>14} {'speedup':>8}")
+    for query in QUERIES:
+        getter = FieldDataGetter(query)
+        query_chain = getter.query_chain
+
+        legacy_time = min(timeit.repeat(lambda: [legacy_compute(query_chain, card) for card in cards],
+                                        number=1, repeat=repeat))
+        compiled_time = min(timeit.repeat(lambda: [getter.compute(card) for card in cards],
+                                          number=1, repeat=repeat))
+        print(f"{query:<50} {legacy_time * 1000:>12.2f} {compiled_time * 1000:>14.2f} "
+              f"{legacy_time / compiled_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
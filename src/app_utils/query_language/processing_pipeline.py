@@ -246,6 +246,7 @@ import copy
 import itertools
 import re
 import sys
+import time
 from abc import ABC, abstractmethod
 from collections.abc import Mapping
 from dataclasses import dataclass, field
@@ -287,13 +288,16 @@ def logic_factory(operator: str) -> T_unary_op | T_binary_op:
                       mapping: Mapping):
         x_computed = False if x is None else x.compute(mapping)
         if isinstance(x_computed, LIST_LIKE_TYPES):
-            return (not item for item in x)
+            return (not item for item in x_computed)
         return not x_computed
 
     def operator_and(x: Iterable[Computable] | Computable,
                      y: Iterable[Computable] | Computable,
                      mapping: Mapping):
         x_computed = False if x is None else x.compute(mapping)
+        # the result is already decided, so y is skipped. List-like y would broadcast x instead
+        if not isinstance(x_computed, LIST_LIKE_TYPES) and not x_computed and is_scalar_node(y):
+            return False
         y_computed = False if y is None else y.compute(mapping)
 
         if isinstance(x_computed, LIST_LIKE_TYPES):
@@ -316,6 +320,9 @@ def logic_factory(operator: str) -> T_unary_op | T_binary_op:
                     y: Iterable[Computable] | Computable,
                     mapping: Mapping):
         x_computed = False if x is None else x.compute(mapping)
+        # the result is already decided, so y is skipped. List-like y would broadcast x instead
+        if not isinstance(x_computed, LIST_LIKE_TYPES) and x_computed and is_scalar_node(y):
+            return True
         y_computed = False if y is None else y.compute(mapping)
 
         if isinstance(x_computed, LIST_LIKE_TYPES):
@@ -501,6 +508,13 @@ class Token_T(Enum):
     COMMA = auto()  # type: ignore
     END = auto()  # type: ignore
 
+
+class Accessor_T(Enum):
+    KEY = auto()  # type: ignore
+    DIGIT = auto()  # type: ignore
+    ANY = auto()  # type: ignore
+    SELF = auto()  # type: ignore
+
 STRING_PLACEHOLDER = "*"
 END_PLACEHOLDER = "END"
 
@@ -512,6 +526,9 @@ class FieldDataGetter(Computable):
     SELF_FIELD: ClassVar[str] = "$SELF"
 
     query_chain: list[str] = field(init=False, repr=True)
+    accessors: tuple[tuple[tuple[tuple[Accessor_T, Any, Optional[int]], ...],
+                           Optional[tuple[Any, ...]],
+                           bool], ...] = field(init=False, repr=False)
 
     def __init__(self, path: str):
         object.__setattr__(self, "value", path)
@@ -535,6 +552,7 @@ class FieldDataGetter(Computable):
             path_chain.append(path[start:last_closed_bracket])
 
         object.__setattr__(self, "query_chain", path_chain)
+        object.__setattr__(self, "accessors", self._compile_query_chain())
 
     def _check_nested_path(self, path) -> None:
         bracket_stack = 0
@@ -563,60 +581,86 @@ class FieldDataGetter(Computable):
                 if not path[i].isspace():
                     raise QuerySyntaxError("Wrong bracket sequence in field query!")
 
+    def _compile_query_chain(self) -> tuple[tuple[tuple[tuple[Accessor_T, Any, Optional[int]], ...],
+                                                  Optional[tuple[Any, ...]],
+                                                  bool], ...]:
+        """Splits query_chain into segments of accessors separated by $ANY. Every segment is
+        (accessors, keys if the segment consists only of plain keys, whether the segment ends with $ANY)"""
+        segments = []
+        accessors = []
+
+        def add_segment(expands_any: bool):
+            keys = tuple(key for _, key, _ in accessors) \
+                if all(accessor_type is Accessor_T.KEY for accessor_type, _, _ in accessors) else None
+            segments.append((tuple(accessors), keys, expands_any))
+            accessors.clear()
+
+        for key in self.query_chain:
+            if key.startswith(DIGIT_FORCE_PREFIX):
+                key = key[len(DIGIT_FORCE_PREFIX):]
+                if key.lstrip("-").isdecimal():
+                    accessors.append((Accessor_T.DIGIT, float(key), int(key)))
+                    continue
+
+            if key == FieldDataGetter.ANY_FIELD:
+                add_segment(expands_any=True)
+            elif key == FieldDataGetter.SELF_FIELD:
+                accessors.append((Accessor_T.SELF, None, None))
+            else:
+                accessors.append((Accessor_T.KEY, key, None))
+        add_segment(expands_any=False)
+        return tuple(segments)
+
     def compute(self, mapping: Mapping) -> list[Any]:
-        """query_chain: chain of keys"""
-        result = None
-        seen = False
-
-        def traverse_recursively(entry: Mapping | Any, chain_index: int = 0) -> None:
-            if entry is None:
-                return
-
-            nonlocal result, seen
-            if chain_index == len(self.query_chain):
-                end = list(entry.keys()) if isinstance(entry, Mapping) else entry
-                if result is None:
-                    result = end
+        """Walks precompiled accessors level by level. If more than one field was found or
+        the path has $ANY, returns list of found fields. If nothing was found after $ANY, returns empty list"""
+        entries = [mapping]
+        any_reached = False
+        for accessors, keys, expands_any in self.accessors:
+            found = []
+            for entry in entries:
+                if entry is None:
+                    continue
+
+                if keys is not None:
+                    for key in keys:
+                        if not isinstance(entry, Mapping):
+                            entry = None
+                            break
+                        if (entry := entry.get(key)) is None:
+                            break
                 else:
-                    if not seen:
-                        result = [result]
-                        seen = True
-                    result.append(end)
-                return
-
-            current_key = self.query_chain[chain_index]
-            if current_key.startswith(DIGIT_FORCE_PREFIX):
-                current_key = current_key[len(DIGIT_FORCE_PREFIX):]
-                if current_key.lstrip("-").isdigit() and isinstance(entry, (list, tuple)):
-                    current_key = int(current_key)
-                    if len(entry) > current_key:
-                        traverse_recursively(entry[current_key], chain_index + 1)
-                    return
-                elif current_key.lstrip("-").isdecimal():
-                    current_key = float(current_key)
-
-            if current_key == FieldDataGetter.ANY_FIELD:
-                if result is None:
-                    result = []
+                    for accessor_type, key, index in accessors:
+                        if accessor_type is Accessor_T.DIGIT and isinstance(entry, (list, tuple)):
+                            entry = entry[index] if -len(entry) <= index < len(entry) else None
+                        elif not isinstance(entry, Mapping):
+                            entry = None
+                        elif accessor_type is not Accessor_T.SELF:
+                            entry = entry.get(key)
+                        if entry is None:
+                            break
+
+                if entry is None:
+                    continue
+                if not expands_any:
+                    found.append(entry)
+                    continue
+
+                any_reached = True
                 if isinstance(entry, Mapping):
-                    for value in entry.values():
-                        traverse_recursively(value, chain_index + 1)
+                    found.extend(entry.values())
                 elif isinstance(entry, Iterable):
-                    for item in entry:
-                        traverse_recursively(item, chain_index + 1)
-                return
+                    found.extend(entry)
+            entries = found
 
-            if not isinstance(entry, Mapping):
-                return None
-
-            elif current_key == FieldDataGetter.SELF_FIELD:
-                return traverse_recursively(entry, chain_index + 1)
-
-            if (val := entry.get(current_key)) is not None:
-                traverse_recursively(val, chain_index + 1)
-
-        traverse_recursively(mapping)
-        return result
+        if not entries:
+            return [] if any_reached else None
+        if len(entries) == 1:
+            if isinstance(entries[0], Mapping):
+                return list(entries[0].keys())
+            # results after $ANY are lists regardless of how many entries were found
+            return [entries[0]] if any_reached else entries[0]
+        return [list(entry.keys()) if isinstance(entry, Mapping) else entry for entry in entries]
 
 
 def format_exception(exc: Type[QueryLangException],exception_message: str,token_string: str):
@@ -673,6 +717,7 @@ class Token(Computable):
     length: int
     prev_token_type: Token_T = field(repr=False)
     t_type: Optional[Token_T] = None
+    field_getter: Optional[FieldDataGetter] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         def get_expected_keys() -> str:
@@ -710,14 +755,17 @@ class Token(Computable):
                              exception_message="Can't compute non-STRING token!",
                              token_string=self.value)
 
-        if self.value.lstrip("-").isdecimal():
-            return float(self.value)
-
         try:
-            if self.value.startswith(FIELD_FORCE_PREFIX):
-                return FieldDataGetter(self.value[len(FIELD_FORCE_PREFIX):]).compute(mapping)
+            if (field_getter := self.field_getter) is None:
+                if self.value.lstrip("-").isdecimal():
+                    return float(self.value)
 
-            return FieldDataGetter(self.value).compute(mapping)
+                if self.value.startswith(FIELD_FORCE_PREFIX):
+                    field_getter = FieldDataGetter(self.value[len(FIELD_FORCE_PREFIX):])
+                else:
+                    field_getter = FieldDataGetter(self.value)
+                object.__setattr__(self, "field_getter", field_getter)
+            return field_getter.compute(mapping)
         except QueryLangException as e:
             if e.caught:
                 raise
@@ -818,6 +866,7 @@ class Method(Computable):
     method_name: str
     method: Callable[[Any], int]
     value: str = field(init=False)
+    is_keyword: bool = False
 
     def __post_init__(self):
         object.__setattr__(self, "value", f"{self.method_name}({self.operand.value})")
@@ -860,6 +909,236 @@ class EvalNode(Computable):
             return self.operation(self.left, mapping)
 
 
+@dataclass(slots=True, frozen=True)
+class Constant(Computable):
+    value: str
+    result: Any
+
+    def compute(self, mapping: Mapping):
+        return self.result
+
+
+@dataclass(slots=True)
+class NodeStatistics:
+    calls: int = 0
+    cumulative_time: float = 0
+    truthy_results: int = 0
+
+    @property
+    def selectivity(self) -> float:
+        return self.truthy_results / self.calls if self.calls else 0
+
+
+@dataclass(slots=True, frozen=True)
+class ProfiledNode(Computable):
+    """Wraps a tree node and collects its call count, cumulative time and selectivity.
+    Lazy (generator) results are materialized so that their evaluation is timed too"""
+    node: Computable
+    value: str = field(init=False)
+    statistics: NodeStatistics = field(init=False, default_factory=NodeStatistics)
+
+    def __post_init__(self):
+        object.__setattr__(self, "value", self.node.value)
+
+    def compute(self, mapping: Mapping):
+        start = time.perf_counter()
+        try:
+            result = self.node.compute(mapping)
+            if isinstance(result, (Generator, itertools.chain)):
+                result = list(result)
+        finally:
+            self.statistics.calls += 1
+            self.statistics.cumulative_time += time.perf_counter() - start
+
+        if isinstance(result, LIST_LIKE_TYPES):
+            self.statistics.truthy_results += any(result)
+        else:
+            self.statistics.truthy_results += bool(result)
+        return result
+
+    def get_report(self) -> str:
+        lines = []
+        for depth, node in walk_tree(self):
+            if not isinstance(node, ProfiledNode):
+                continue
+            stats = node.statistics
+            self_time = stats.cumulative_time - sum(child.statistics.cumulative_time
+                                                    for child in get_node_children(node)
+                                                    if isinstance(child, ProfiledNode))
+            lines.append(f"{'    ' * depth}{describe_node(node)}\n"
+                         f"{'    ' * depth}  calls: {stats.calls}, "
+                         f"cumulative: {stats.cumulative_time * 1000:.3f} ms, "
+                         f"self: {self_time * 1000:.3f} ms, "
+                         f"selectivity: {stats.selectivity:.1%}")
+        return "\n".join(lines)
+
+
+def get_node_children(node: Computable) -> list[Computable]:
+    if isinstance(node, ProfiledNode):
+        return get_node_children(node.node)
+    if isinstance(node, EvalNode):
+        return [child for child in (node.left, node.right) if child is not None]
+    if isinstance(node, Method):
+        return [node.operand]
+    return []
+
+
+def walk_tree(node: Computable, depth: int = 0) -> Iterator[tuple[int, Computable]]:
+    yield depth, node
+    for child in get_node_children(node):
+        yield from walk_tree(child, depth + 1)
+
+
+def describe_node(node: Computable) -> str:
+    if isinstance(node, ProfiledNode):
+        return describe_node(node.node)
+    if isinstance(node, EvalNode):
+        return f"LOGIC {node.operator}"
+    if isinstance(node, Method):
+        if node.is_keyword:
+            query, keyword_name = node.method_name.rstrip().rsplit(" ", 1)
+            return f"KEYWORD {keyword_name} pattern=\"{query}\""
+        return f"METHOD {node.method_name}"
+    if isinstance(node, Constant):
+        return f"CONSTANT {node.result}"
+    if isinstance(node, Token):
+        if node.value.lstrip("-").isdecimal():
+            return f"NUMBER {float(node.value)}"
+        path = node.value[len(FIELD_FORCE_PREFIX):] if node.value.startswith(FIELD_FORCE_PREFIX) else node.value
+        return f"FIELD {node.value} path={FieldDataGetter(path).query_chain}"
+    return f"{type(node).__name__} {node.value}"
+
+
+def profile_node(node: Computable) -> ProfiledNode:
+    """Returns a copy of the tree with every node wrapped in a ProfiledNode"""
+    if isinstance(node, EvalNode):
+        node = EvalNode(operator=node.operator,
+                        left=None if node.left is None else profile_node(node.left),
+                        right=None if node.right is None else profile_node(node.right))
+    elif isinstance(node, Method):
+        node = Method(operand=profile_node(node.operand),
+                      method_name=node.method_name,
+                      method=node.method,
+                      is_keyword=node.is_keyword)
+    return ProfiledNode(node)
+
+
+COMMUTATIVE_LOGIC = frozenset(("and", "or"))
+ANY_FIELD_COST = 5
+DEFAULT_METHOD_COST = 1
+METHOD_COSTS = {"split": 10,
+                "reduce": 10}
+KEYWORD_COST = 20
+
+
+def estimate_cost(node: Computable) -> int:
+    """Rough relative cost of a single node computation"""
+    if isinstance(node, Constant):
+        return 0
+    if isinstance(node, Token):
+        if node.value.lstrip("-").isdecimal():
+            return 0
+        path = node.value[len(FIELD_FORCE_PREFIX):] if node.value.startswith(FIELD_FORCE_PREFIX) else node.value
+        query_chain = FieldDataGetter(path).query_chain
+        return 1 + len(query_chain) + ANY_FIELD_COST * query_chain.count(FieldDataGetter.ANY_FIELD)
+    if isinstance(node, Method):
+        method_cost = KEYWORD_COST if node.is_keyword else METHOD_COSTS.get(node.method_name, DEFAULT_METHOD_COST)
+        return method_cost + estimate_cost(node.operand)
+    if isinstance(node, ProfiledNode):
+        return estimate_cost(node.node)
+    return 1 + sum(estimate_cost(child) for child in get_node_children(node))
+
+
+SCALAR_METHODS = frozenset(("len", "any", "all"))
+
+
+def is_scalar_node(node: Optional[Computable]) -> bool:
+    """Whether node result is never list-like, so that logic operators don't broadcast over it"""
+    if node is None:
+        return True
+    if isinstance(node, ProfiledNode):
+        return is_scalar_node(node.node)
+    if isinstance(node, Constant):
+        return not isinstance(node.result, LIST_LIKE_TYPES)
+    if isinstance(node, Token):
+        return node.value.lstrip("-").isdecimal()
+    if isinstance(node, Method):
+        return node.is_keyword or node.method_name in SCALAR_METHODS
+    if isinstance(node, EvalNode):
+        return all(is_scalar_node(child) for child in get_node_children(node))
+    return False
+
+
+def _fold(node: Computable) -> Computable:
+    if not all(isinstance(child, Constant) for child in get_node_children(node)):
+        return node
+    try:
+        result = node.compute({})
+    except QueryLangException:
+        # leaving errors (and print) to be raised at evaluation time
+        return node
+    if isinstance(result, LIST_LIKE_TYPES):
+        return node
+    return Constant(value=node.value, result=result)
+
+
+def optimize_node(node: Computable) -> Computable:
+    """Folds constant sub-expressions and reorders operands of and/or chains
+    so that the cheapest ones are computed first. Chains with list-like operands
+    broadcast over them, so they are kept as they are"""
+    if isinstance(node, Token):
+        if node.value.lstrip("-").isdecimal():
+            return Constant(value=node.value, result=float(node.value))
+        return node
+
+    if isinstance(node, Method):
+        return _fold(Method(operand=optimize_node(node.operand),
+                            method_name=node.method_name,
+                            method=node.method,
+                            is_keyword=node.is_keyword))
+
+    if not isinstance(node, EvalNode):
+        return node
+
+    if node.right is None:
+        return _fold(EvalNode(operator=node.operator, left=optimize_node(node.left)))
+
+    if node.operator not in COMMUTATIVE_LOGIC:
+        return _fold(EvalNode(operator=node.operator,
+                              left=optimize_node(node.left),
+                              right=optimize_node(node.right)))
+
+    operands = []
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, EvalNode) and current.operator == node.operator and current.right is not None:
+            pending.append(current.right)
+            pending.append(current.left)
+        else:
+            operands.append(optimize_node(current))
+
+    if not all(is_scalar_node(operand) for operand in operands):
+        return EvalNode(operator=node.operator, left=optimize_node(node.left), right=optimize_node(node.right))
+
+    # constant operand either decides the whole chain or doesn't affect it
+    deciding_value = node.operator == "or"
+    variable_operands = []
+    for operand in operands:
+        if not isinstance(operand, Constant):
+            variable_operands.append(operand)
+        elif bool(operand.result) == deciding_value:
+            return Constant(value=node.value, result=deciding_value)
+    if not variable_operands:
+        return operands[-1]
+    operands = sorted(variable_operands, key=estimate_cost)
+
+    optimized = operands[0]
+    for operand in operands[1:]:
+        optimized = _fold(EvalNode(operator=node.operator, left=optimized, right=operand))
+    return optimized
+
+
 class EvaluationTree:
     def __init__(self, tokens):
         if len(tokens) == 1:
@@ -891,7 +1170,8 @@ class EvaluationTree:
                 operand = self._expressions.pop(string_index)
                 self._expressions.insert(string_index, Method(operand=operand,
                                                               method_name=f"{query} {keyword_name} ",
-                                                              method=keyword_function))
+                                                              method=keyword_function,
+                                                              is_keyword=True))
 
             elif next_item.t_type == Token_T.L_PARENTHESIS:
                 method_name = self._expressions.pop(string_index).value
@@ -973,6 +1253,16 @@ class EvaluationTree:
             raise TreeBuildingError("Error creating a syntax tree!")
         return self._expressions[0]
 
+    def optimize(self) -> None:
+        self._expressions[0] = optimize_node(self.get_master_node())
+
+    def explain(self) -> str:
+        return "\n".join(f"{'    ' * depth}{describe_node(node)}"
+                         for depth, node in walk_tree(self.get_master_node()))
+
+    def get_profiled_master_node(self) -> ProfiledNode:
+        return profile_node(self.get_master_node())
+
 
 if __name__ == "__main__":
     print(__doc__)
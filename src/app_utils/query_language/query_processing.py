@@ -1,14 +1,40 @@
-from typing import Any, Callable, Mapping
+import time
+from typing import Any, Callable, Iterable, Mapping
 
-from .processing_pipeline import EvaluationTree, Token_T, Tokenizer
+from .processing_pipeline import EvaluationTree, Token, Token_T, Tokenizer
 
 
-def get_card_filter(expression: str) -> Callable[[Mapping], Any]:
+def _build_tree(tokens: list[Token], optimize: bool) -> EvaluationTree:
+    _logic_tree = EvaluationTree(tokens)
+    _logic_tree.construct()
+    if optimize:
+        _logic_tree.optimize()
+    return _logic_tree
+
+
+def get_card_filter(expression: str, optimize: bool = True) -> Callable[[Mapping], Any]:
     _tokenizer = Tokenizer(expression)
     tokens = _tokenizer.get_tokens()
     if tokens[0].t_type == Token_T.END:
         return lambda x: True
+    return _build_tree(tokens, optimize).get_master_node().compute
 
-    _logic_tree = EvaluationTree(tokens)
-    _logic_tree.construct()
-    return _logic_tree.get_master_node().compute
+
+def explain_query(expression: str, optimize: bool = True) -> str:
+    """Returns parsed tree of the expression with field paths, method and keyword nodes"""
+    return _build_tree(Tokenizer(expression).get_tokens(), optimize).explain()
+
+
+def profile_query(expression: str, cards: Iterable[Mapping], optimize: bool = True) -> str:
+    """Runs the expression over given cards and reports per-node call counts,
+    cumulative time and selectivity"""
+    profiled_node = _build_tree(Tokenizer(expression).get_tokens(), optimize).get_profiled_master_node()
+    n_cards = n_found = 0
+    start = time.perf_counter()
+    for card in cards:
+        n_cards += 1
+        if profiled_node.compute(card):
+            n_found += 1
+    total_time = time.perf_counter() - start
+    return f"Cards: {n_cards}, found: {n_found}, total: {total_time * 1000:.3f} ms\n" \
+           f"{profiled_node.get_report()}"
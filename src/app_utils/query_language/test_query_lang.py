@@ -2,13 +2,16 @@ from itertools import chain
 from typing import Any, Generator, Iterable
 
 from app_utils.query_language.exceptions import ResultPrint
-from app_utils.query_language.query_processing import get_card_filter
+from app_utils.query_language.query_processing import (explain_query,
+                                                       get_card_filter,
+                                                       profile_query)
 
 
 def assert_result(query: str,
                   scheme: dict,
                   assertion: Any,
-                  print_if_failed: str | list[str] | None = None):
+                  print_if_failed: str | list[str] | None = None,
+                  optimize: bool = True):
     def open_generators(item: Any):
         if isinstance(item, str) or not isinstance(item, Iterable):
             return
@@ -21,7 +24,7 @@ def assert_result(query: str,
                     new_item_i.append(k)
                 item[i] = new_item_i
 
-    res = get_card_filter(query)(scheme)
+    res = get_card_filter(query, optimize=optimize)(scheme)
     if isinstance(res, (Generator, chain)):
         res = [i for i in res]
     open_generators(res)
@@ -95,6 +98,36 @@ def test_special_queries():
         assert_result(query="$ANY[$ANY][data]",
                       scheme=scheme,
                       assertion=[1, 2])
+        assert_result(query="pos[$ANY][missing]",
+                      scheme=scheme,
+                      assertion=[])
+        assert_result(query="missing[$ANY]",
+                      scheme=scheme,
+                      assertion=None)
+
+        list_scheme = {
+            "field": [{"data": [1, 2]}, {"data": [3]}, {"other": 4}]
+        }
+        assert_result(query="field[$ANY][data][d_$0]",
+                      scheme=list_scheme,
+                      assertion=[1, 3])
+
+        # single match after $ANY is still a list
+        single_scheme = {
+            "pos": {
+                "noun": "x"
+            },
+            "field": [{"data": 1}]
+        }
+        assert_result(query="pos[$ANY]",
+                      scheme=single_scheme,
+                      assertion=["x"])
+        assert_result(query="field[$ANY][data]",
+                      scheme=single_scheme,
+                      assertion=[1])
+        assert_result(query="len(pos[$ANY])",
+                      scheme=single_scheme,
+                      assertion=1)
     test_any()
     
     def test_self():
@@ -117,6 +150,12 @@ def test_special_queries():
         assert_result(query="array_field[d_$1]",
                       scheme=scheme,
                       assertion=2)
+        assert_result(query="array_field[d_$-1]",
+                      scheme=scheme,
+                      assertion=3)
+        assert_result(query="array_field[d_$-5]",
+                      scheme=scheme,
+                      assertion=None)
         assert_result(query="int_field[d_$1]",
                       scheme=scheme,
                       assertion=[4, 5, 6])
@@ -289,7 +328,114 @@ def test_methods():
     test_reduce()
 
 
+def test_query_inspection():
+    def test_explain():
+        explanation = explain_query("C. in tags[level] and len(field) > 2", optimize=False)
+        assert explanation.splitlines() == ["LOGIC and",
+                                            "    KEYWORD in pattern=\"C.\"",
+                                            "        FIELD tags[level] path=['tags', 'level']",
+                                            "    LOGIC >",
+                                            "        METHOD len",
+                                            "            FIELD field path=['field']",
+                                            "        NUMBER 2.0"]
+    test_explain()
+
+    def test_profile():
+        cards = [{"field": ["1", "2", "3"]},
+                 {"field": ["1"]},
+                 {"field": []},
+                 {}]
+        report = profile_query("len(field) > 1", cards).splitlines()
+        assert report[0].startswith("Cards: 4, found: 1")
+        assert report[1] == "LOGIC >"
+        assert report[2].strip().startswith("calls: 4,")
+        assert report[2].endswith("selectivity: 25.0%")
+        assert report[-1].strip().startswith("calls: 4,")
+        assert report[-1].endswith("selectivity: 100.0%")
+    test_profile()
+
+
+def test_optimization():
+    def test_operands_reordering():
+        explanation = explain_query("C. in tags[level] and any(split(field)) and len(field) > 2")
+        assert explanation.splitlines() == ["LOGIC and",
+                                            "    LOGIC and",
+                                            "        LOGIC >",
+                                            "            METHOD len",
+                                            "                FIELD field path=['field']",
+                                            "            CONSTANT 2.0",
+                                            "        METHOD any",
+                                            "            METHOD split",
+                                            "                FIELD field path=['field']",
+                                            "    KEYWORD in pattern=\"C.\"",
+                                            "        FIELD tags[level] path=['tags', 'level']"]
+        # list-like operands are broadcast over, so their order is kept
+        explanation = explain_query("C. in tags[level] and split(field)")
+        assert explanation.splitlines()[1] == "    KEYWORD in pattern=\"C.\""
+    test_operands_reordering()
+
+    def test_constant_folding():
+        assert explain_query("1 < 2 and len(field)").splitlines() == ["METHOD len",
+                                                                      "    FIELD field path=['field']"]
+        assert explain_query("2 < 1 and len(field)").splitlines() == ["CONSTANT False"]
+        assert explain_query("1 < 2 or len(field)").splitlines() == ["CONSTANT True"]
+        # field can be a list that the constant is broadcast over
+        assert explain_query("2 < 1 and field").splitlines()[0] == "LOGIC and"
+        assert explain_query("len(1) == 0").splitlines() == ["CONSTANT True"]
+    test_constant_folding()
+
+    def test_short_circuit():
+        cards = [{"field": "value"}, {}]
+        report = profile_query("field and any(split(field))", cards).splitlines()
+        assert report[0].startswith("Cards: 2, found: 1")
+        # any is computed only when field was found
+        assert report[-6] == "    METHOD any"
+        assert report[-5].strip().startswith("calls: 1,")
+
+        assert_result(query="not field",
+                      scheme={"field": [1, 0]},
+                      assertion=[False, True])
+    test_short_circuit()
+
+    def test_list_operands():
+        scheme = {
+            "tags": {
+                "a": "x",
+                "b": ""
+            }
+        }
+        # logic operators broadcast over list-like operands, so optimization must not change results
+        for optimize in (False, True):
+            assert_result(query="any(tags[$ANY] and 2 < 1)",
+                          scheme=scheme,
+                          assertion=False,
+                          optimize=optimize)
+            assert_result(query="any(tags[$ANY] or 2 < 1)",
+                          scheme=scheme,
+                          assertion=True,
+                          optimize=optimize)
+            assert_result(query="2 < 1 and tags[$ANY]",
+                          scheme=scheme,
+                          assertion=[False, False],
+                          optimize=optimize)
+            assert_result(query="1 < 2 or tags[$ANY]",
+                          scheme=scheme,
+                          assertion=[True, True],
+                          optimize=optimize)
+            assert_result(query="tags[$ANY] and 1 < 2",
+                          scheme=scheme,
+                          assertion=["x", ""],
+                          optimize=optimize)
+            assert_result(query="tags[$ANY] or 2 < 1",
+                          scheme=scheme,
+                          assertion=["x", ""],
+                          optimize=optimize)
+    test_list_operands()
+
+
 if __name__ == "__main__":
     test_keywords()
     test_special_queries()
     test_methods()
+    test_query_inspection()
+    test_optimization()
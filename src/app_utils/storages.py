@@ -1,15 +1,64 @@
 import copy
+import json
 from json import JSONEncoder
 from typing import Any, Generic, Mapping, TypeVar, Sequence
 from functools import singledispatchmethod
 
 
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (_FrozenDictNode, FrozenList)):
+        # frozen sub-trees are immutable, so they can be shared as-is
+        return value
+    if isinstance(value, dict):
+        # branches of a thawed copy that weren't accessed are still frozen and are shared again
+        return _FrozenDictNode({key: _freeze(item) for key, item in dict.items(value)})
+    if isinstance(value, list):
+        return FrozenList(_freeze(item) for item in value)
+    if type(value) is tuple:
+        return tuple(_freeze(item) for item in value)
+    return copy.deepcopy(value)
+
+
+def _thaw(value: Any) -> Any:
+    """Thaws a single level. Nested frozen values are thawed when they are accessed"""
+    if isinstance(value, _FrozenDictNode):
+        return _ThawedDict(value._data)
+    if isinstance(value, FrozenList):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class FrozenList(tuple):
+    """Immutable list that is thawed back into a list by to_dict. Its items are expected to be frozen"""
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            return len(self) == len(other) and all(x == y for x, y in zip(self, other))
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+    def __repr__(self):
+        return str(list(self))
+
+
 class _FrozenDictNode(Mapping):
     __slots__ = "_data"
 
     def __init__(self, data: dict[Any, Any]):
         self._data = data
 
+    @classmethod
+    def _from_frozen_data(cls, data: dict[Any, Any]):
+        """Creates an instance from already frozen data without copying it"""
+        instance = cls.__new__(cls)
+        instance._data = data
+        return instance
+
     def __len__(self):
         return len(self._data)
 
@@ -25,44 +74,116 @@ class _FrozenDictNode(Mapping):
     def __bool__(self):
         return bool(self._data)
 
-    def to_dict(self):
-        return self._data
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def evolve(self, changes: Mapping[Any, Any]):
+        """Returns a copy with top level keys replaced by given changes.
+        Unchanged sub-trees are shared with the original"""
+        new_data = dict(self._data)
+        for key, value in changes.items():
+            new_data[key] = _freeze(value)
+        return self._from_frozen_data(new_data)
+
+    def set_in(self, path: Sequence[Any], value: Any):
+        """Returns a copy with the value at the given key path replaced. Only the mappings
+        along the path are copied, missing ones are created"""
+        if not path:
+            raise ValueError("Empty path!")
+
+        key, *rest = path
+        if not rest:
+            return self.evolve({key: value})
+
+        child = self._data.get(key)
+        if not isinstance(child, _FrozenDictNode):
+            child = _FrozenDictNode({})
+        return self.evolve({key: child.set_in(rest, value)})
+
+    def delete_in(self, path: Sequence[Any]):
+        """Returns a copy without the value at the given key path.
+        Only the mappings along the path are copied"""
+        if not path:
+            raise ValueError("Empty path!")
+
+        key, *rest = path
+        if key not in self._data:
+            return self
+
+        new_data = dict(self._data)
+        if not rest:
+            new_data.pop(key)
+        elif isinstance((child := self._data[key]), _FrozenDictNode):
+            new_data[key] = child.delete_in(rest)
+        else:
+            return self
+        return self._from_frozen_data(new_data)
+
+    def to_dict(self) -> dict[Any, Any]:
+        """Returns mutable copy. Nested values are copied on first access,
+        so that only accessed branches are thawed"""
+        return _thaw(self)
+
+
+class _ThawedDict(dict):
+    """Mutable copy of a frozen mapping that thaws nested values when they are accessed"""
+    __slots__ = ()
 
+    def _thaw_item(self, key: Any, value: Any) -> Any:
+        if isinstance(value, (_FrozenDictNode, FrozenList)):
+            value = _thaw(value)
+            dict.__setitem__(self, key, value)
+        return value
 
-class FrozenDict(_FrozenDictNode):
-    __slots__ = ()
+    def __getitem__(self, key):
+        return self._thaw_item(key, dict.__getitem__(self, key))
 
-    def __init__(self, data: dict[Any, Any]):
-        def _convert_to_frozen_node(master: dict, master_key: Any, proc_unit: Any):
-            if isinstance(proc_unit, dict):
-                for proc_key in proc_unit:
-                    if isinstance((proc_val := proc_unit[proc_key]), dict):
-                        _convert_to_frozen_node(proc_unit, proc_key, proc_val)
-                master[master_key] = _FrozenDictNode(proc_unit)
-            else:
-                master[master_key] = proc_unit
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            return _thaw(dict.pop(self, key))
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        return key, _thaw(value)
 
-        master_dict = copy.deepcopy(data)
-        for key in master_dict:
-            _convert_to_frozen_node(master_dict, key, master_dict[key])
+    def values(self):
+        return [self[key] for key in self]
 
-        super(FrozenDict, self).__init__(data=master_dict)
+    def items(self):
+        return [(key, self[key]) for key in self]
 
-    def to_dict(self):
-        def convert(data: _FrozenDictNode):
-            # you make a deepcopy so that you wouldn't overwrite original _data
-            a = copy.deepcopy(data._data)
-            for key in a:
-                if isinstance((value:=a[key]), _FrozenDictNode):
-                    value = convert(value)
-                    a[key] = value
-            return a
-        return convert(self)
+    def copy(self):
+        return _ThawedDict(self)
+
+
+class FrozenDict(_FrozenDictNode):
+    __slots__ = ()
+
+    def __init__(self, data: Mapping[Any, Any]):
+        if isinstance(data, _FrozenDictNode):
+            super(FrozenDict, self).__init__(data=data._data)
+            return
+        items = dict.items(data) if isinstance(data, dict) else data.items()
+        super(FrozenDict, self).__init__(data={key: _freeze(value) for key, value in items})
 
 
 class FrozenDictJSONEncoder(JSONEncoder):
     def default(self, o):
-        return o.to_dict()
+        if isinstance(o, _FrozenDictNode):
+            return o._data
+        return super(FrozenDictJSONEncoder, self).default(o)
 
 
 T = TypeVar("T")
@@ -185,6 +306,26 @@ def main():
             else:
                 assert src_val == frozen_src_val
 
+    assert FrozenDict(frozen_check)._data is frozen_check._data
+    assert frozen_check.to_dict() == checking
+
+    with_lists = FrozenDict({"a": [1, {"b": [2]}], "c": {"d": 3}})
+    assert isinstance(with_lists["a"], FrozenList) and isinstance(with_lists["a"][1]["b"], FrozenList)
+    assert copy.deepcopy(with_lists) is with_lists
+    thawed = with_lists.to_dict()
+    thawed["a"][1]["b"].append(3)
+    assert with_lists["a"][1]["b"] == [2] and thawed == {"a": [1, {"b": [2, 3]}], "c": {"d": 3}}
+    # branches that weren't accessed are shared by the frozen copy of the thawed one
+    assert FrozenDict(thawed)["c"] is with_lists["c"]
+    assert json.loads(json.dumps(thawed)) == thawed
+
+    changed = frozen_check.set_in(("anki", 1, 3), 4)
+    assert isinstance(changed, FrozenDict)
+    assert changed["anki"][1][3] == 4 and frozen_check["anki"][1][3] == 2
+    assert changed["app"] is frozen_check["app"]
+    assert changed["anki"]["anki_field"] is frozen_check["anki"]["anki_field"]
+    assert changed.delete_in(("anki", 1))["anki"].get(1) is None
+
     # validate_json(checking, standard_conf_file)
     # assert checking == standard_conf_file
 
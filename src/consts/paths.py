@@ -19,6 +19,12 @@ LOCAL_AUDIO_DIR = LOCAL_MEDIA_DIR / "Audio"
 os.makedirs(LOCAL_AUDIO_DIR, exist_ok=True)
 LOCAL_DICTIONARIES_DIR = LOCAL_MEDIA_DIR / "Dictionaries"
 os.makedirs(LOCAL_DICTIONARIES_DIR, exist_ok=True)
+HTTP_CACHE_DIR = LOCAL_MEDIA_DIR / "http_cache"
+os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+IMAGE_CACHE_DIR = LOCAL_MEDIA_DIR / "image_cache"
+os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+AUDIO_CACHE_DIR = LOCAL_MEDIA_DIR / "audio_cache"
+os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
 
 # Plugins
 PLUGINS_DIR = SOURCE_DIR / "plugins"
@@ -1,3 +1,3 @@
 from .. import app_utils, consts
-from ..plugins_management import config_management, parsers_return_types
+from ..plugins_management import config_management, http_client, parsers_return_types
 from . import language_packages, parsers, saving, themes
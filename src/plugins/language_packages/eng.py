@@ -10,6 +10,9 @@ open_file_menu_label = "Open"
 save_files_menu_label = "Save"
 hotkeys_and_buttons_help_menu_label = "Buttons/Hotkeys"
 query_settings_language_label_text = "Query language"
+sources_health_menu_label = "Sources health"
+sources_health_no_calls_text = "No sources were called yet"
+sources_health_reset_button_text = "Reset"
 help_master_menu_label = "Help"
 download_audio_menu_label = "Download audio"
 change_media_folder_menu_label = "Change downloaded media storage"
@@ -399,6 +402,7 @@ find_dialog_end_rotation_button_text = "Done"
 find_dialog_nothing_found_message = "Nothing found!"
 find_dialog_find_window_title = "Move"
 find_dialog_find_button_text = "Move"
+find_dialog_explain_window_title = "Query profile"
 
 # statistics dialog
 statistics_dialog_statistics_window_title = "Statistics"
@@ -10,6 +10,9 @@ open_file_menu_label = "Открыть"
 save_files_menu_label = "Сохранить"
 hotkeys_and_buttons_help_menu_label = "Кнопки/Горячие клавиши"
 query_settings_language_label_text = "Язык запросов"
+sources_health_menu_label = "Состояние источников"
+sources_health_no_calls_text = "Источники ещё не вызывались"
+sources_health_reset_button_text = "Сбросить"
 help_master_menu_label = "Справка"
 download_audio_menu_label = "Скачать аудио"
 change_media_folder_menu_label = "Сменить пользователя"
@@ -386,6 +389,7 @@ find_dialog_end_rotation_button_text = "Готово"
 find_dialog_nothing_found_message = "Ничего не найдено!"
 find_dialog_find_window_title = "Перейти"
 find_dialog_find_button_text = "Перейти"
+find_dialog_explain_window_title = "Профиль запроса"
 
 # statistics dialog
 statistics_dialog_statistics_window_title = "Статистика"
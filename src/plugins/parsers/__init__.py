@@ -1,2 +1,2 @@
-from .. import app_utils, config_management, consts, parsers_return_types
+from .. import app_utils, config_management, consts, http_client, parsers_return_types
 from . import audio, image, sentence, word
@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+AUDIO_CACHE_MAX_ENTRIES = 512
+AUDIO_CACHE_TTL = 7 * 24 * 60 * 60
+
+AUDIO_INFO_T = tuple[str, str]
+
+
+class AudioCache:
+    """LRU cache of extracted (audio link, info) pairs with expiration.
+    Persisted into a json file, so that words looked up in previous sessions aren't fetched again"""
+
+    def __init__(self,
+                 cache_file: str,
+                 max_entries: int = AUDIO_CACHE_MAX_ENTRIES,
+                 ttl: float = AUDIO_CACHE_TTL,
+                 clock: Callable[[], float] = time.time):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # loaded on first use
+        self._entries: Optional[OrderedDict[str, tuple[float, list[AUDIO_INFO_T]]]] = None
+
+    def _load(self) -> OrderedDict[str, tuple[float, list[AUDIO_INFO_T]]]:
+        if self._entries is not None:
+            return self._entries
+        self._entries = OrderedDict()
+        try:
+            with open(self.cache_file, "r", encoding="UTF-8") as cache_file:
+                saved_entries = json.load(cache_file)
+            for key, (stored_at, audio_data) in saved_entries:
+                self._entries[key] = (stored_at, [(audio_link, info) for audio_link, info in audio_data])
+        except (OSError, ValueError, TypeError):  # no cache yet or it is corrupted
+            self._entries.clear()
+        self._remove_extra(self._entries)
+        return self._entries
+
+    def _save(self, entries: OrderedDict[str, tuple[float, list[AUDIO_INFO_T]]]) -> None:
+        temp_path = f"{self.cache_file}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="UTF-8") as cache_file:
+                json.dump([[key, entry] for key, entry in entries.items()], cache_file, ensure_ascii=False)
+            os.replace(temp_path, self.cache_file)
+        except OSError:  # cache is an optimization, the plugin works without it
+            pass
+
+    def _remove_extra(self, entries: OrderedDict[str, tuple[float, list[AUDIO_INFO_T]]]) -> None:
+        now = self._clock()
+        for key in [key for key, (stored_at, _) in entries.items() if now - stored_at > self.ttl]:
+            del entries[key]
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[list[AUDIO_INFO_T]]:
+        with self._lock:
+            entries = self._load()
+            if (entry := entries.get(key)) is None:
+                return None
+            stored_at, audio_data = entry
+            if self._clock() - stored_at > self.ttl:
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return audio_data
+
+    def put(self, key: str, audio_data: list[AUDIO_INFO_T]) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[key] = (self._clock(), audio_data)
+            entries.move_to_end(key)
+            self._remove_extra(entries)
+            self._save(entries)
+
+    def configure(self, max_entries: int, ttl: float) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            if self._entries is not None:
+                self._remove_extra(self._entries)
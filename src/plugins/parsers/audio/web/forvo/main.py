@@ -4,11 +4,14 @@ Credits:
 """
 
 
+import os
 import re
 
 import requests.utils
+from bs4 import BeautifulSoup
 
-from .. import config_management, parsers_return_types
+from .. import config_management, consts, parsers_return_types
+from .audio_cache import AUDIO_INFO_T, AudioCache
 from .consts import _PLUGIN_LOCATION, _PLUGIN_NAME
 from .page_processing import get_audio_link, get_forvo_page
 
@@ -20,18 +23,28 @@ language_code
 timeout
     request timeout in seconds.
     default value: 1
+
+cache_size
+    maximum number of words whose audio links are kept between sessions
+    default value: 512
+
+cache_ttl_days
+    days after which cached audio links are fetched again
+    default value: 7
 """
 
 _VALIDATION_SCHEME = {
     "language_code": ("en", [str], []),
-    "timeout": (1, [int, float], [])
+    "timeout": (1, [int, float], []),
+    "cache_size": (512, [int], []),
+    "cache_ttl_days": (7, [int, float], [])
 }
 
 config = config_management.LoadableConfig(config_location=_PLUGIN_LOCATION,
                                           validation_scheme=_VALIDATION_SCHEME,
                                           docs=_CONFIG_DOCS)
 
-CACHED_RESULT = {}
+AUDIO_CACHE = AudioCache(os.path.join(consts.paths.AUDIO_CACHE_DIR, f"{_PLUGIN_NAME}.json"))
 
 REMOVE_SPACES_PATTERN = re.compile(r"\s+", re.MULTILINE)
 
@@ -39,33 +52,20 @@ REMOVE_SPACES_PATTERN = re.compile(r"\s+", re.MULTILINE)
 def remove_spaces(string: str) -> str:
     return re.sub(REMOVE_SPACES_PATTERN, " ", string.strip())
 
-def get(word: str, card_data: dict) -> parsers_return_types.AUDIO_SCRAPPER_RETURN_T:
-    global CACHED_RESULT
-
-    word_with_lang_code = "{} {}".format(word, config["language_code"])
-
-    if (audioListLis := CACHED_RESULT.get(word_with_lang_code)) is None:
-        wordEncoded = requests.utils.requote_uri(word)
-        forvoPage, error_message = get_forvo_page("https://forvo.com/word/" + wordEncoded, timeout=config["timeout"])
-        if error_message:
-            return [], error_message
-        speachSections = forvoPage.select("div#language-container-" + config["language_code"])
-        if not len(speachSections):
-            return [], f"[{_PLUGIN_NAME}] Word not found (Language Container does not exist!)"
-        speachSections = forvoPage.select_one("div#language-container-" + config["language_code"])
-        audioListUl = speachSections.select_one("ul")
-        if audioListUl is None or not len(audioListUl.findChildren(recursive=False)):
-            return [], f"[{_PLUGIN_NAME}] Word not found (Language Container exists, but audio not found)"
-        if(config["language_code"] == "en"):
-            audioListLis = forvoPage.select("li[class*=en_]")
-        else:
-            audioListLis = audioListUl.find_all("li")
-
-        if audioListLis:
-            CACHED_RESULT[word_with_lang_code] = audioListLis
-
-    audio_batch: list[tuple[str, str]] = []
-    batch_size = yield
+def extract_audio_data(forvoPage: BeautifulSoup, language_code: str) -> tuple[list[AUDIO_INFO_T], str]:
+    """Only (audio link, info) pairs are kept, so that parsed page can be freed"""
+    speachSections = forvoPage.select_one("div#language-container-" + language_code)
+    if speachSections is None:
+        return [], f"[{_PLUGIN_NAME}] Word not found (Language Container does not exist!)"
+    audioListUl = speachSections.select_one("ul")
+    if audioListUl is None or not len(audioListUl.findChildren(recursive=False)):
+        return [], f"[{_PLUGIN_NAME}] Word not found (Language Container exists, but audio not found)"
+    if(language_code == "en"):
+        audioListLis = forvoPage.select("li[class*=en_]")
+    else:
+        audioListLis = audioListUl.find_all("li")
+
+    audio_data: list[AUDIO_INFO_T] = []
     for li in audioListLis:
         if (r := li.find("div")) is not None and (onclick := r.get("onclick")) is not None:
             audio_link = get_audio_link(onclick)
@@ -74,8 +74,30 @@ def get(word: str, card_data: dict) -> parsers_return_types.AUDIO_SCRAPPER_RETUR
             from_data = li.find("span", {"class": "from"})
             from_data = remove_spaces(from_data.text) if from_data is not None else ""
             additional_info = (f"{by_whom_data}\n{from_data}") if from_data is not None else ""
-            audio_batch.append((audio_link, additional_info))
-            if len(audio_batch) == batch_size:
-                batch_size = yield audio_batch, ""
-                audio_batch = []
-    return audio_batch, ""
+            audio_data.append((audio_link, additional_info))
+    return audio_data, ""
+
+
+def get(word: str, card_data: dict) -> parsers_return_types.AUDIO_SCRAPPER_RETURN_T:
+    word_with_lang_code = "{} {}".format(word, config["language_code"])
+
+    AUDIO_CACHE.configure(max_entries=config["cache_size"], ttl=config["cache_ttl_days"] * 24 * 60 * 60)
+    if (audio_data := AUDIO_CACHE.get(word_with_lang_code)) is None:
+        wordEncoded = requests.utils.requote_uri(word)
+        forvoPage, error_message = get_forvo_page("https://forvo.com/word/" + wordEncoded, timeout=config["timeout"])
+        if error_message:
+            return [], error_message
+        audio_data, error_message = extract_audio_data(forvoPage, config["language_code"])
+        forvoPage.decompose()
+        if error_message:
+            return [], error_message
+        if audio_data:
+            AUDIO_CACHE.put(word_with_lang_code, audio_data)
+
+    batch_size = yield
+    start = 0
+    while len(audio_data) - start > batch_size:
+        audio_batch = audio_data[start:start + batch_size]
+        start += batch_size
+        batch_size = yield audio_batch, ""
+    return audio_data[start:], ""
@@ -4,12 +4,13 @@ from typing import Optional
 import requests
 from bs4 import BeautifulSoup
 
+from .. import http_client
 from .consts import _HEADERS, _PLUGIN_NAME
 
 
-def get_forvo_page(url: str, timeout: int = 1) -> tuple[Optional[BeautifulSoup], str]:
+def get_forvo_page(url: str, timeout: float = 1) -> tuple[Optional[BeautifulSoup], str]:
     try:
-        r = requests.get(url, headers=_HEADERS)
+        r = http_client.get(url, headers=_HEADERS, timeout=timeout)
         r.raise_for_status()
         decoded_page_content = r.content.decode('UTF-8')
     except requests.RequestException as e:
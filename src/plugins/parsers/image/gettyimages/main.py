@@ -2,9 +2,8 @@ import os
 import re
 
 import bs4
-import requests
 
-from .. import config_management, parsers_return_types
+from .. import config_management, http_client, parsers_return_types
 
 PLUGIN_NAME = os.path.split(os.path.dirname(__file__))[-1]
 
@@ -30,7 +29,7 @@ def get(word: str) -> parsers_return_types.IMAGE_SCRAPPER_RETURN_T:
     headers = {'User-Agent': user_agent}
     link = "https://www.gettyimages.com/photos/{}".format(word)
     try:
-        r = requests.get(link, headers=headers, timeout=config["timeout"])
+        r = http_client.get(link, headers=headers, timeout=config["timeout"])
         r.raise_for_status()
     except Exception:
         return [], f"[{PLUGIN_NAME}]: Couldn't get a web page!"
@@ -1,11 +1,13 @@
+import codecs
 import json
 import os
 import re
+from typing import Iterable, Iterator
 
 import bs4
 import requests
 
-from .. import config_management, parsers_return_types
+from .. import config_management, http_client, parsers_return_types
 
 PLUGIN_NAME = os.path.split(os.path.dirname(__file__))[-1]
 
@@ -24,6 +26,67 @@ config = config_management.LoadableConfig(
     docs=_CONF_DOCS,
 )
 
+CHUNK_SIZE = 16 * 1024
+# legacy layout: image metadata is stored in <div class="rg_meta"> as json
+RG_META_MARKER = "rg_meta"
+AF_INIT_DATA_START = "AF_initDataCallback({"
+AF_INIT_DATA_PATTERN = re.compile(re.escape(AF_INIT_DATA_START) + r"[^<]*?data:[^<]*?(\[[^<]+\])")
+
+
+def extract_urls_from_data(data: list) -> Iterator[str]:
+    try:
+        for d in data[31][0][12][2]:
+            try:
+                yield d[1][3][0]
+            except Exception as exception:
+                pass
+    except Exception as exception:
+        try:
+            for d in data[56][1][0][0][1][0]:
+                try:
+                    yield d[0][0]["444383007"][1][3][0]
+                except Exception as exception:
+                    pass
+        except Exception as exception:
+            pass
+
+
+def iter_page_urls(text_chunks: Iterable[str], page_parts: list[str]) -> Iterator[str]:
+    """Yields image urls as soon as their AF_initDataCallback blob is fully received.
+    Received text is appended to page_parts"""
+    # blob can't contain "<", so it is complete once the next tag starts. Buffer holds either
+    # the unfinished blob, where first checked_end characters have no "<", or a tail that may
+    # be the beginning of the next blob. So every received character is scanned only once
+    buffer = ""
+    checked_end = 0
+    for chunk in text_chunks:
+        page_parts.append(chunk)
+        buffer += chunk
+        position = 0
+        while True:
+            if (blob_start := buffer.find(AF_INIT_DATA_START, position)) == -1:
+                buffer = buffer[max(position, len(buffer) - len(AF_INIT_DATA_START) + 1):]
+                checked_end = 0
+                break
+            if (blob_end := buffer.find("<", max(blob_start, checked_end))) == -1:
+                buffer = buffer[blob_start:]
+                checked_end = len(buffer)
+                break
+            if (match := AF_INIT_DATA_PATTERN.match(buffer, blob_start, blob_end)) is not None:
+                yield from extract_urls_from_data(json.loads(match.group(1)))
+            position = blob_end
+            checked_end = 0
+
+    for match in AF_INIT_DATA_PATTERN.finditer(buffer):
+        yield from extract_urls_from_data(json.loads(match.group(1)))
+
+
+def get_rg_meta_urls(html: str) -> list[str]:
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    rg_meta = soup.find_all("div", {"class": "rg_meta"})
+    metadata = [json.loads(e.text) for e in rg_meta]
+    return [d["ou"] for d in metadata]
+
 
 def get(word: str):  # -> parsers_return_types.IMAGE_SCRAPPER_RETURN_T:
     link = f"https://www.google.com/search?tbm=isch&q={word}"
@@ -32,48 +95,32 @@ def get(word: str):  # -> parsers_return_types.IMAGE_SCRAPPER_RETURN_T:
     )
     headers = {"User-Agent": user_agent}
     try:
-        r = requests.get(link, headers=headers, timeout=config["timeout"])
+        # streamed responses bypass the shared HTTP cache
+        r = http_client.get(link, headers=headers, timeout=config["timeout"], stream=True)
         r.raise_for_status()
     except requests.RequestException:
         return [], f"[{PLUGIN_NAME}]: Couldn't get a web page!"
 
-    html = r.text
-    soup = bs4.BeautifulSoup(r.text, "html.parser")
-    rg_meta = soup.find_all("div", {"class": "rg_meta"})
-    metadata = [json.loads(e.text) for e in rg_meta]
-    results = [d["ou"] for d in metadata]
-
-    batch_size = yield
-    if not results:
-        regex = re.escape("AF_initDataCallback({")
-        regex += r"[^<]*?data:[^<]*?" + r"(\[[^<]+\])"
-
-        re.compile(r"[^<]*?data:[^<]*?")
-
-        for txt in re.findall(regex, html):
-            data = json.loads(txt)
-
-            try:
-                for d in data[31][0][12][2]:
-                    try:
-                        results.append(d[1][3][0])
-                        if not len(results) % batch_size:
-                            batch_size = yield results, ""
-                            results = []
-                    except Exception as exception:
-                        pass
-            except Exception as exception:
-                try:
-                    for d in data[56][1][0][0][1][0]:
-                        try:
-                            results.append(d[0][0]["444383007"][1][3][0])
-                            if not len(results) % batch_size:
-                                batch_size = yield results, ""
-                                results = []
-                        except Exception as exception:
-                            pass
-                except Exception as exception:
-                    pass
+    with r:
+        decoder = codecs.getincrementaldecoder(r.encoding or "utf-8")(errors="replace")
+        text_chunks = (decoder.decode(chunk) for chunk in r.iter_content(CHUNK_SIZE))
+
+        batch_size = yield
+        results = []
+        found_any = False
+        page_parts: list[str] = []
+        try:
+            for url in iter_page_urls(text_chunks, page_parts):
+                found_any = True
+                results.append(url)
+                if len(results) == batch_size:
+                    batch_size = yield results, ""
+                    results = []
+        except requests.RequestException:
+            return results, f"[{PLUGIN_NAME}]: Couldn't get a web page!"
+
+    if not found_any and RG_META_MARKER in (html := "".join(page_parts)):
+        results = get_rg_meta_urls(html)
     return results, ""
 
 
@@ -3,7 +3,7 @@ import os
 import bs4
 import requests
 
-from .. import config_management, parsers_return_types
+from .. import config_management, http_client, parsers_return_types
 
 FILE_PATH = os.path.split(os.path.dirname(__file__))[-1]
 
@@ -25,8 +25,8 @@ config = config_management.LoadableConfig(config_location=os.path.dirname(__file
 
 def get(word: str, card_data: dict) -> parsers_return_types.SENTENCE_SCRAPPER_RETURN_T:
     try:
-        page = requests.get(f"https://searchsentences.com/words/{word}-in-a-sentence",
-                            timeout=config["timeout"])
+        page = http_client.get(f"https://searchsentences.com/words/{word}-in-a-sentence",
+                               timeout=config["timeout"])
         page.raise_for_status()
     except requests.RequestException as e:
         return [], f"{FILE_PATH} couldn't get a web page: {e}"
@@ -4,7 +4,7 @@ import re
 import bs4
 import requests
 
-from .. import config_management, parsers_return_types
+from .. import config_management, http_client, parsers_return_types
 
 FILE_PATH = os.path.split(os.path.dirname(__file__))[-1]
 
@@ -28,8 +28,8 @@ def get(word: str, card_data: dict) -> parsers_return_types.SENTENCE_SCRAPPER_RE
     re_pattern = re.compile("^(.?\d+.? )")
 
     try:
-        page = requests.get(f"https://sentencedict.com/{word}.html",
-                            timeout=config["timeout"])
+        page = http_client.get(f"https://sentencedict.com/{word}.html",
+                               timeout=config["timeout"])
         page.raise_for_status()
     except requests.RequestException as e:
         return [], f"{FILE_PATH} couldn't get a web page: {e}"
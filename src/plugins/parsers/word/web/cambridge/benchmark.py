@@ -0,0 +1,90 @@
+"""
+Compares Cambridge page parsing backends on a corpus of saved pages.
+Results of every backend have to be byte-identical to the ones of the "full" backend.
+
+Usage (from the project root):
+    python -m src.plugins.parsers.word.web.cambridge.benchmark [pages dir] [--download word ...] [--repeat N]
+
+Pages dir defaults to the corpus that test_parsing.py runs on.
+"""
+
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import get_args
+
+from .. import http_client
+from .utils import (DEFAULT_REQUESTS_HEADERS, LINK_PREFIX, DictionaryVariation,
+                    ParsingBackend, parse_page)
+
+REFERENCE_BACKEND: ParsingBackend = "full"
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "test_pages")
+
+
+def download_pages(pages_dir: str, words: list[str]) -> None:
+    for word in words:
+        page = http_client.get(f"{LINK_PREFIX}/dictionary/english/{word}", headers=DEFAULT_REQUESTS_HEADERS)
+        page.raise_for_status()
+        with open(os.path.join(pages_dir, f"{word}.html"), "wb") as page_file:
+            page_file.write(page.content)
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("pages_dir", nargs="?", default=PAGES_DIR)
+    arg_parser.add_argument("--download", nargs="*", default=[], metavar="WORD",
+                            help="save pages of these words into pages_dir first")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+    # quantiles need at least two samples
+    if args.repeat < 2:
+        arg_parser.error("--repeat has to be at least 2")
+
+    os.makedirs(args.pages_dir, exist_ok=True)
+    download_pages(args.pages_dir, args.download)
+
+    page_names = sorted(name for name in os.listdir(args.pages_dir) if name.endswith(".html"))
+    if not page_names:
+        print(f"No saved pages in {args.pages_dir}")
+        return 1
+
+    backends: tuple[ParsingBackend, ...] = get_args(ParsingBackend)
+    timings: dict[ParsingBackend, list[float]] = {backend: [] for backend in backends}
+    mismatches = []
+    for page_name in page_names:
+        with open(os.path.join(args.pages_dir, page_name), "rb") as page_file:
+            page_content = page_file.read()
+
+        for dictionary_index in DictionaryVariation:
+            reference = json.dumps(parse_page(page_content, dictionary_index, REFERENCE_BACKEND), ensure_ascii=False)
+            for backend in backends:
+                if json.dumps(parse_page(page_content, dictionary_index, backend), ensure_ascii=False) != reference:
+                    mismatches.append(f"{page_name} ({dictionary_index.name}): {backend}")
+
+        for backend in backends:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                parse_page(page_content, DictionaryVariation.English, backend)
+                timings[backend].append(time.perf_counter() - start)
+
+    print(f"{len(page_names)} pages, {args.repeat} runs each")
+    reference_median = statistics.median(timings[REFERENCE_BACKEND])
+    for backend in backends:
+        median = statistics.median(timings[backend])
+        print(f"{backend:>10}: median {median * 1000:7.1f} ms, "
+              f"p90 {statistics.quantiles(timings[backend], n=10)[-1] * 1000:7.1f} ms, "
+              f"x{reference_median / median:.2f}")
+
+    if mismatches:
+        print("Results differ from the reference backend:", *mismatches, sep="\n    ")
+        return 1
+    print("All backends produce identical results")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
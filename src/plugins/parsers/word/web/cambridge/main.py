@@ -4,6 +4,8 @@ from .. import config_management  # import LoadableConfig
 from .. import consts  # .card_fields import CardFields
 from .utils import RESULT_FORMAT
 from .utils import define as _define
+from .utils import define_many as _define_many
+from .utils import get_dictionary_variation as _get_dictionary_variation
 from .. import app_utils
 
 SCHEME_DOCS = """
@@ -13,6 +15,7 @@ tags: {
     level: English proficiency level (str)["A1", "A2", "B1", "B2", "C1", "C2"]
     region: where this word mostly in use (list[str])
     usage: usage context (list[str])
+    dictionary: source dictionary, only when "dictionaries" are set (str)
 }
 """
 
@@ -52,10 +55,26 @@ bilingual variation
         "vietnamese",
     ] 
 
+dictionaries
+    Dictionaries that are queried at once. Their pages are fetched concurrently
+    and cards are merged in the given order. Empty list means the single dictionary
+    set by "bilingual variation"
+    type: list[string]
+    valid values: "english", "american", "business" or any bilingual variation
+    default value: []
+
 timeout
     Request timeout in seconds
     type: integer | float
     default value: 1
+
+backend
+    Page parsing strategy. "full" builds the tree of the whole page,
+    "strained" only of dictionary blocks and "seek" also skips the part of the page
+    preceding the first of them. All of them give the same results, later ones are faster
+    type: string
+    valid values: either of ["full", "strained", "seek"]
+    default value: "full"
 """
 
 _CONF_VALIDATION_SCHEME = \
@@ -86,8 +105,10 @@ _CONF_VALIDATION_SCHEME = \
                 "ukrainian",
                 "vietnamese",
         ]),
+        "dictionaries": ([], [list], []),
         "audio region": ("us", [str], ["us", "uk"]),
-        "timeout": (1, [int, float], [])
+        "timeout": (1, [int, float], []),
+        "backend": ("full", [str], ["full", "strained", "seek"])
     }
 
 config = config_management.LoadableConfig(
@@ -141,9 +162,31 @@ def translate(definitons_data: RESULT_FORMAT) -> list[consts.CardFormat]:
 
 
 def define(word: str) -> tuple[list[consts.CardFormat], str]:
-    definitions, error = _define(word=app_utils.string_utils.remove_special_chars(word, 
-                                                                                  " ", 
-                                                                                  '№!"#%\'()*,./:;<>?@[\\]^_`{|}~'),  # $ & + - =
-                                 bilingual_vairation=config["bilingual variation"],
-                                 timeout=config["timeout"])
-    return translate(definitions), error
+    word = app_utils.string_utils.remove_special_chars(word, 
+                                                       " ", 
+                                                       '№!"#%\'()*,./:;<>?@[\\]^_`{|}~')  # $ & + - =
+    if not config["dictionaries"]:
+        definitions, error = _define(word=word,
+                                     bilingual_vairation=config["bilingual variation"],
+                                     timeout=config["timeout"],
+                                     backend=config["backend"])
+        return translate(definitions), error
+
+    try:
+        variations = [_get_dictionary_variation(dictionary_name) for dictionary_name in config["dictionaries"]]
+    except ValueError as e:
+        return [], str(e)
+
+    word_list: list[consts.CardFormat] = []
+    errors = []
+    for dictionary_name, (definitions, error) in zip(config["dictionaries"],
+                                                     _define_many(word=word,
+                                                                  variations=variations,
+                                                                  timeout=config["timeout"],
+                                                                  backend=config["backend"])):
+        for card in translate(definitions):
+            card["tags"]["dictionary"] = dictionary_name
+            word_list.append(card)
+        if error:
+            errors.append(f"{dictionary_name}: {error}")
+    return word_list, "\n".join(errors)
@@ -0,0 +1,40 @@
+import os
+from typing import get_args
+
+import pytest
+
+from .utils import DictionaryVariation, ParsingBackend, parse_page
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "test_pages")
+PAGE_NAMES = sorted(name for name in os.listdir(PAGES_DIR) if name.endswith(".html"))
+
+
+def read_page(page_name: str) -> bytes:
+    with open(os.path.join(PAGES_DIR, page_name), "rb") as page_file:
+        return page_file.read()
+
+
+@pytest.mark.parametrize("page_name", PAGE_NAMES)
+def test_backends_are_identical(page_name):
+    page_content = read_page(page_name)
+    for dictionary_index in DictionaryVariation:
+        reference = parse_page(page_content, dictionary_index, "full")
+        for backend in get_args(ParsingBackend):
+            assert parse_page(page_content, dictionary_index, backend) == reference, (dictionary_index, backend)
+
+
+def test_saved_pages_are_parsed():
+    run = parse_page(read_page("run.html"), DictionaryVariation.English)
+    assert list(run) == ["run", "run for it", "in the long run"]
+    assert [pos_data["POS"] for pos_data in run["run"]] == [["verb"], ["noun"]]
+    assert run["run"][0]["data"]["levels"] == ["A1", "B1"]
+    assert run["run"][0]["data"]["US_IPA"][0] == ["/rʌn/"]
+
+    american = parse_page(read_page("run.html"), DictionaryVariation.American)
+    assert american["run"][0]["data"]["UK_IPA"] == [[]]
+
+    take_off = parse_page(read_page("take-off.html"))
+    assert take_off["take off"][0]["POS"] == ["phrasal verb", "verb"]
+    assert take_off["take off"][0]["data"]["definitions_translations"] == ["снимать (одежду)", "взлетать"]
+
+    assert parse_page(read_page("not-found.html")) == {}
@@ -1,9 +1,11 @@
 import bs4
-import requests
-from typing import Optional, TypedDict, Literal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, TypedDict, Literal, get_args
 from enum import IntEnum, auto
 import re
 
+from .. import http_client
+
 
 DEFAULT_REQUESTS_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.1; Win64; x64)'}
 LINK_PREFIX = "https://dictionary.cambridge.org"
@@ -88,6 +90,29 @@ class DictionaryVariation(IntEnum):
     American = auto()
     Business = auto()
 
+
+# "full" builds the tree of the whole page. "strained" builds only dictionary blocks,
+# skipping navigation, scripts and ads that make up most of the page.
+# "seek" also doesn't tokenize the part of the page preceding the first dictionary block
+ParsingBackend = Literal["full", "strained", "seek"]
+SUPERENTRY_ATTRS = {"class": "pr di superentry"}
+SUPERENTRY_STRAINER = bs4.SoupStrainer("div", SUPERENTRY_ATTRS)
+SUPERENTRY_START = '<div class="pr di superentry"'
+# sections whose contents aren't markup
+_RAW_TEXT_BOUNDS = (("<script", "</script"), ("<style", "</style"), ("<!--", "-->"))
+
+
+def seek_first_superentry(markup: str) -> str:
+    """Drops everything before the first dictionary block. Strained parser ignores
+    that part anyway, unless the block start is found inside a script, a style or a comment"""
+    if (position := markup.find(SUPERENTRY_START)) == -1:
+        return markup
+    for opening, closing in _RAW_TEXT_BOUNDS:
+        if (last_opening := markup.rfind(opening, 0, position)) != -1 and \
+                markup.find(closing, last_opening, position) == -1:
+            return markup
+    return markup[position:]
+
 def get_tags(tags_section: Optional[bs4.Tag]) -> tuple[LEVEL_T, 
                                                        LABELS_AND_CODES_T, 
                                                        REGIONS_T, 
@@ -312,7 +337,8 @@ def define(word: str,
            dictionary_index: DictionaryVariation=DictionaryVariation.English, 
            bilingual_vairation: BilingualVariations = "",
            request_headers: Optional[dict]=None,  
-           timeout:float=5.0) -> tuple[RESULT_FORMAT, str]:
+           timeout:float=5.0,
+           backend: ParsingBackend = "full") -> tuple[RESULT_FORMAT, str]:
     """
     dictionary_index: DictionaryVariation
     |  Ignored if bilingual_vairation != "" 
@@ -350,29 +376,102 @@ def define(word: str,
     |       "turkish"
     |       "ukrainian"
     |       "vietnamese"
+    |
+    backend: ParsingBackend
+    |   Page parsing strategy. "strained" and "seek" are faster. test_parsing.py checks
+    |   that they give the same results as "full" on saved pages in test_pages
     """
     if request_headers is None:
         request_headers = DEFAULT_REQUESTS_HEADERS
     
     if bilingual_vairation:
-        link = f"{LINK_PREFIX}/dictionary/english-{bilingual_vairation}/{word}"
         dictionary_index = DictionaryVariation.English
-    else:
-        link = f"{LINK_PREFIX}/dictionary/english/{word}"
     # will raise error if request_headers are None
     try:
-        page = requests.get(link, headers=request_headers, timeout=timeout)
+        page = http_client.get(get_page_link(word, bilingual_vairation), headers=request_headers, timeout=timeout)
     except: 
         return {}, "Timeout"
+    return parse_page(page.content, dictionary_index, backend), ""
+
+
+def get_page_link(word: str, bilingual_vairation: BilingualVariations) -> str:
+    if bilingual_vairation:
+        return f"{LINK_PREFIX}/dictionary/english-{bilingual_vairation}/{word}"
+    return f"{LINK_PREFIX}/dictionary/english/{word}"
+
+
+MONOLINGUAL_DICTIONARIES = {
+    "english":  DictionaryVariation.English,
+    "american": DictionaryVariation.American,
+    "business": DictionaryVariation.Business,
+}
+
+
+def get_dictionary_variation(dictionary_name: str) -> tuple[BilingualVariations, DictionaryVariation]:
+    """Monolingual dictionary name (english, american, business) or bilingual variation.
+    Raises ValueError on unknown names"""
+    if (dictionary_index := MONOLINGUAL_DICTIONARIES.get(dictionary_name)) is not None:
+        return "", dictionary_index
+    if dictionary_name and dictionary_name in get_args(BilingualVariations):
+        return dictionary_name, DictionaryVariation.English  # type: ignore
+    raise ValueError(f"Unknown Cambridge dictionary: {dictionary_name}")
 
+
+def define_many(word: str,
+                variations: Sequence[tuple[BilingualVariations, DictionaryVariation]],
+                request_headers: Optional[dict]=None,
+                timeout: float=5.0,
+                backend: ParsingBackend = "full") -> list[tuple[RESULT_FORMAT, str]]:
+    """
+    define() for several dictionaries at once. Returns results in the order of given variations.
+    Pages are fetched concurrently over the shared connection pool and every one is parsed
+    as soon as it arrives. Monolingual dictionaries share a single page
+    """
+    if request_headers is None:
+        request_headers = DEFAULT_REQUESTS_HEADERS
+
+    # as in define(), dictionary index is ignored for bilingual dictionaries
+    variations = [(bilingual_vairation, DictionaryVariation.English if bilingual_vairation else dictionary_index)
+                  for bilingual_vairation, dictionary_index in variations]
+    # bilingual variation -> dictionary indexes that are read from its page
+    page_indexes: dict[BilingualVariations, list[DictionaryVariation]] = {}
+    for bilingual_vairation, dictionary_index in variations:
+        if dictionary_index not in (indexes := page_indexes.setdefault(bilingual_vairation, [])):
+            indexes.append(dictionary_index)
+
+    def fetch_and_parse(bilingual_vairation: BilingualVariations) -> dict[DictionaryVariation, tuple[RESULT_FORMAT, str]]:
+        try:
+            page = http_client.get(get_page_link(word, bilingual_vairation), headers=request_headers, timeout=timeout)
+        except:
+            return {dictionary_index: ({}, "Timeout") for dictionary_index in page_indexes[bilingual_vairation]}
+        return {dictionary_index: (parse_page(page.content, dictionary_index, backend), "")
+                for dictionary_index in page_indexes[bilingual_vairation]}
+
+    with ThreadPoolExecutor(max_workers=max(1, len(page_indexes)), thread_name_prefix="cambridge") as executor:
+        page_results = dict(zip(page_indexes, executor.map(fetch_and_parse, page_indexes)))
+
+    return [page_results[bilingual_vairation][dictionary_index] for bilingual_vairation, dictionary_index in variations]
+
+
+def parse_page(page_content: bytes | str,
+               dictionary_index: DictionaryVariation=DictionaryVariation.English,
+               backend: ParsingBackend = "full") -> RESULT_FORMAT:
     word_info: RESULT_FORMAT = {}
 
-    soup = bs4.BeautifulSoup(page.content, "html.parser")
+    if backend == "seek":
+        # decoded the same way BeautifulSoup does, as the declared encoding may be in the dropped part
+        if isinstance(page_content, bytes):
+            page_content = bs4.UnicodeDammit(page_content, is_html=True).unicode_markup
+        soup = bs4.BeautifulSoup(seek_first_superentry(page_content), "html.parser", parse_only=SUPERENTRY_STRAINER)
+    elif backend == "strained":
+        soup = bs4.BeautifulSoup(page_content, "html.parser", parse_only=SUPERENTRY_STRAINER)
+    else:
+        soup = bs4.BeautifulSoup(page_content, "html.parser")
     # Only english dictionary
     # word block which contains definitions for every POS_T.
-    primal_block = soup.find_all("div", {'class': 'pr di superentry'})
+    primal_block = soup.find_all("div", SUPERENTRY_ATTRS)
     if len(primal_block) <= dictionary_index:
-        return {}, ""
+        return {}
 
     main_block = primal_block[dictionary_index].find_all("div", {"class": "pr entry-body__el"})
     main_block.extend(primal_block[dictionary_index].find_all("div", {"class": "pv-block"}))
@@ -498,7 +597,7 @@ def define(word: str,
                              us_ipa=us_ipa,
                              uk_audio_links=uk_audio_links,
                              us_audio_links=us_audio_links)
-    return word_info, ""
+    return word_info
 
 
 if __name__ == "__main__":
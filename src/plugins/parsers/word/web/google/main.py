@@ -2,7 +2,7 @@ import os
 
 import requests
 
-from .. import config_management, consts
+from .. import config_management, consts, http_client
 
 FILE_PATH = os.path.split(os.path.dirname(__file__))[-1]
 
@@ -37,7 +37,7 @@ HEADERS = {"User-Agent": USER_AGENT}
 
 
 def define(word: str) -> tuple[list[consts.CardFormat], str]:
-    rsp = requests.get(f"{API_URL}/{word}", timeout=config["timeout"], headers=HEADERS)
+    rsp = http_client.get(f"{API_URL}/{word}", timeout=config["timeout"], headers=HEADERS)
     json_rsp = None
     try:
         rsp.raise_for_status()
@@ -0,0 +1,86 @@
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future
+from typing import (Any, AsyncGenerator, Callable, Coroutine,
+                    Generator, Optional, TypeVar)
+
+
+T = TypeVar("T")
+class EventLoopThread:
+    """Single event loop running on a background daemon thread. Every async plugin
+    is driven by it, so concurrent lookups cost coroutines instead of threads"""
+
+    def __init__(self, thread_name: str = "plugins event loop"):
+        self._thread_name = thread_name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name=self._thread_name, daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def is_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coroutine: Coroutine[Any, Any, T]) -> "Future[T]":
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """Blocks calling thread until coroutine is done"""
+        if self.is_loop_thread():
+            coroutine.close()
+            raise RuntimeError("Blocking call of a coroutine from the event loop thread")
+        return self.submit(coroutine).result()
+
+
+EVENT_LOOP = EventLoopThread()
+
+
+def is_async_definition(function: Callable) -> bool:
+    return inspect.iscoroutinefunction(function)
+
+
+def is_async_batch_generator(function: Callable) -> bool:
+    return inspect.isasyncgenfunction(function)
+
+
+R = TypeVar("R")
+async def to_async_definition(function: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    """Awaits definition function of any style. Synchronous ones are run in the default executor"""
+    if is_async_definition(function):
+        return await function(*args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(None, lambda: function(*args, **kwargs))
+
+
+BATCH_T = TypeVar("BATCH_T")
+def to_sync_batch_generator(
+        async_generator_initializer: Callable[..., AsyncGenerator[tuple[BATCH_T, str], int]]) \
+        -> Callable[..., Generator[tuple[BATCH_T, str], int, tuple[BATCH_T, str]]]:
+    """Adapts async batch getter to the generator protocol of synchronous ones.
+    Async getter starts the same way (batch_size = yield) and yields (batch, error message) pairs.
+    As async generators can't return values, the last batch is an empty one that is
+    returned when the getter is over"""
+    def sync_generator(*args: Any, **kwargs: Any) -> Generator[tuple[BATCH_T, str], int, tuple[BATCH_T, str]]:
+        batch_size = yield  # type: ignore
+        async_generator = async_generator_initializer(*args, **kwargs)
+
+        async def send(value: Optional[int]) -> tuple[BATCH_T, str]:
+            return await async_generator.asend(value)  # type: ignore
+
+        try:
+            EVENT_LOOP.run(send(None))
+            while True:
+                batch_size = yield EVENT_LOOP.run(send(batch_size))
+        except StopAsyncIteration:
+            return [], ""  # type: ignore
+        finally:
+            EVENT_LOOP.run(async_generator.aclose())
+    return sync_generator
@@ -1,4 +1,9 @@
+import asyncio
+import os
+import threading
+import time
 from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, wait
 from typing import Callable, Literal, Generator, Optional, TypedDict, TypeVar, Sized, Iterator
 import json
 
@@ -8,7 +13,10 @@ from ..consts.parser_types import TypedParserName
 from ..consts.paths import *
 from ..plugins_management.config_management import (LoadableConfig,
                                                     LoadableConfigProtocol)
-from .wrappers import WrappedBatchGeneratorProtocol, CardGeneratorProtocol, GeneratorReturn
+from .async_support import EVENT_LOOP
+from .monitoring import SOURCE_HEALTH, ChainStatistics
+from .read_ahead import ReadAheadReader, get_timeout_message, is_read_ahead_worker
+from .wrappers import WrappedBatchGeneratorProtocol, CardGeneratorProtocol, GeneratorReturn, get_skipped_return
 from ..consts.paths import CHAIN_DATA_FILE_PATH
 import itertools
 from dataclasses import dataclass
@@ -19,12 +27,18 @@ class ChainConfig(LoadableConfig):
                  config_dir: str,
                  config_name: str,
                  name_config_pairs: list[tuple[TypedParserName, LoadableConfigProtocol]],
+                 with_read_ahead: bool = False,
                  ):
         validation_scheme = {}
         docs_list = []
 
         validation_scheme["query type"]      = ("all", [str], ["first found", "all"])
         validation_scheme["error verbosity"] = ("silent", [str], ["silent", "if found", "all"])
+        if with_read_ahead:
+            validation_scheme["read ahead"]  = (0, [int], [])
+        validation_scheme["deadline"]        = (0, [int, float], [])
+        validation_scheme["member timeout"]  = (0, [int, float], [])
+        validation_scheme["adaptive order"]  = (False, [bool], [])
         docs_list.append("""
 query type:
     How to get data from sources
@@ -35,6 +49,31 @@ error verbosity:
     silent: doesn't save any errors
     if found: saves errors ONLY IF found something
     all: saves all errors
+
+deadline:
+    Maximum time in seconds to wait for a single request to the whole chain
+    (a single batch for sentences, images and audio).
+    Sources that miss it are abandoned and reported in error message;
+    results gathered so far are returned. 0 means no limit
+
+member timeout:
+    Maximum time in seconds to wait for a single source. 0 means no limit.
+    Nested chains are limited by time limits of the outermost chain.
+    Source that is still running after being abandoned by the previous request
+    is waited for within the same time limits and then abandoned again
+
+adaptive order:
+    Only for "first found" query type. Sources are reordered by their hit rate and latency
+    (both median and 95th percentile) so that the first result is found faster.
+    Statistics of the last 100 calls of every source are kept in
+    configurations/chaining_data/chain_parsers_configurations/<chain type>/<config name>_statistics.json
+""")
+        if with_read_ahead:
+            docs_list.append("""
+read ahead:
+    How many batches of sentences, images or audio to fetch in the background
+    while the current one is shown. Next source's first batch is fetched in advance too.
+    0 disables prefetching
 """)
 
         validation_scheme["parsers"] = {}
@@ -56,6 +95,10 @@ error verbosity:
                                           _config_file_name=config_name)
         self.load()
 
+    @property
+    def statistics_path(self) -> str:
+        return f"{os.path.splitext(self._conf_file_path)[0]}_statistics.json"
+
     def update_children_configs(self):
         for enum_name, config in self.enum_name2config.items():
             config.data = self["parsers"][enum_name]
@@ -279,6 +322,33 @@ def get_enumerated_names(names: list[TypedParserName]) -> list[str]:
     return enum_names
 
 
+CHAIN_MAX_WORKERS = 8
+
+
+def get_config_ids(config: LoadableConfigProtocol) -> set[int]:
+    config_ids = {id(config)}
+    if isinstance(config, ChainConfig):
+        for child_config in config.enum_name2config.values():
+            config_ids |= get_config_ids(child_config)
+    return config_ids
+
+
+def group_by_shared_configs(configs: list[LoadableConfigProtocol]) -> list[list[int]]:
+    """Splits chain members into groups that don't share any (possibly nested) configs.
+    Members of a single group have to be called sequentially because every call
+    overwrites their shared config data, while groups can run concurrently"""
+    groups: list[tuple[set[int], list[int]]] = []
+    for member_index, config in enumerate(configs):
+        config_ids = get_config_ids(config)
+        member_indices = [member_index]
+        for group in [group for group in groups if group[0] & config_ids]:
+            groups.remove(group)
+            config_ids |= group[0]
+            member_indices.extend(group[1])
+        groups.append((config_ids, sorted(member_indices)))
+    return sorted((member_indices for _, member_indices in groups), key=lambda indices: indices[0])
+
+
 class CardGeneratorsChain(CardGeneratorProtocol):
     _scheme_docs: str
     _parser_info: TypedParserName
@@ -324,28 +394,258 @@ class CardGeneratorsChain(CardGeneratorProtocol):
                                    name_config_pairs=[(parser_name, config) for parser_name, config in
                                                        zip(requested_chain_info["chain"], parser_configs)])
         self._scheme_docs = "\n".join(scheme_docs_list)
+        self._update_member_groups()
+        self._statistics = ChainStatistics(self._config.statistics_path)
+        # groups of previous calls that may still run abandoned members, with names of their members
+        self._in_flight_groups: list[tuple[Future, set[str]]] = []
+
+    def _update_member_groups(self) -> None:
+        self._member_groups = group_by_shared_configs([generator.config for generator in self.enum_name2generator.values()])
+        self._member2group = {member_index: group_index for group_index, member_indices in enumerate(self._member_groups)
+                              for member_index in member_indices}
+
+    def _apply_adaptive_order(self) -> None:
+        adaptive_order = self._statistics.get_order(self.enum_name2generator)
+        if adaptive_order != list(self.enum_name2generator):
+            self.enum_name2generator = {enum_name: self.enum_name2generator[enum_name] for enum_name in adaptive_order}
+            self._update_member_groups()
+
+    def _dispatch(self,
+                  query: str,
+                  additional_filter: Callable[[CardFormat], bool] | None,
+                  first_found: bool,
+                  inline: bool,
+                  abandoned_members: set[int],
+                  collect_statistics: bool,
+                  previous_call_timeout: Optional[float]) -> tuple[list[Future], list[threading.Event], list[Optional[float]], Optional[ThreadPoolExecutor]]:
+        """Starts member generators and returns futures of their results in chain order,
+        events that are set when a member is either started or skipped and members start times.
+        When every member is async, groups run as coroutines on the shared event loop instead of threads.
+        Groups whose members are still run by a previous call wait for it at most previous_call_timeout seconds
+        and then fail. Late results of abandoned members aren't reported to the health tracker"""
+        members = list(self.enum_name2generator.items())
+        member_futures: list[Future] = [Future() for _ in members]
+        member_picked = [threading.Event() for _ in members]
+        started_at: list[Optional[float]] = [None for _ in members]
+        self._in_flight_groups = [(group_future, member_names) for group_future, member_names in self._in_flight_groups
+                                  if not group_future.done()]
+        found_index = len(members)
+        found_index_lock = threading.Lock()
+
+        def start_member(member_index: int) -> bool:
+            """Whether member has to be called"""
+            with found_index_lock:
+                # a member preceding this one has already found something
+                if member_index > found_index:
+                    member_futures[member_index].cancel()
+
+            if not member_futures[member_index].set_running_or_notify_cancel():
+                member_picked[member_index].set()
+                return False
+            started_at[member_index] = time.monotonic()
+            member_picked[member_index].set()
+            generator = members[member_index][1]
+            if not SOURCE_HEALTH.allow(generator.parser_info):
+                member_futures[member_index].set_result([get_skipped_return(generator.parser_info)])
+                return False
+            return True
+
+        def fail_member(member_index: int, exception: Exception) -> None:
+            if member_index not in abandoned_members:
+                SOURCE_HEALTH.record_failure(members[member_index][1].parser_info, str(exception))
+            member_futures[member_index].set_exception(exception)
+
+        def finish_member(member_index: int, generator_results: list[GeneratorReturn[list[Card]]]) -> None:
+            nonlocal found_index
+            enum_name, generator = members[member_index]
+            if member_index not in abandoned_members:
+                SOURCE_HEALTH.record_results(generator.parser_info, generator_results)
+                if collect_statistics:
+                    self._statistics.record(enum_name,
+                                            time.monotonic() - started_at[member_index],  # type: ignore
+                                            any(generator_result.result for generator_result in generator_results))
+
+            if first_found and any(generator_result.result for generator_result in generator_results):
+                with found_index_lock:
+                    found_index = min(found_index, member_index)
+            member_futures[member_index].set_result(generator_results)
+
+        def get_member_names(member_indices: list[int]) -> set[str]:
+            return {members[member_index][0] for member_index in member_indices}
+
+        def get_previous_calls(member_indices: list[int]) -> list[Future]:
+            """Groups of previous calls that still read configs of given members,
+            which update_config is about to replace"""
+            member_names = get_member_names(member_indices)
+            return [group_future for group_future, previous_member_names in self._in_flight_groups
+                    if previous_member_names & member_names]
+
+        def abandon_group(member_indices: list[int]) -> None:
+            for member_index in member_indices:
+                if member_futures[member_index].set_running_or_notify_cancel():
+                    member_futures[member_index].set_exception(
+                        TimeoutError("previous call of the source is still running"))
+                member_picked[member_index].set()
+
+        def run_group(member_indices: list[int], previous_calls: list[Future]):
+            if wait(previous_calls, previous_call_timeout).not_done:
+                abandon_group(member_indices)
+                return
+            for member_index in member_indices:
+                if not start_member(member_index):
+                    continue
+                enum_name, generator = members[member_index]
+                try:
+                    self._config.update_config(enum_name)
+                    generator_results = generator.get(query, additional_filter)
+                except Exception as e:
+                    fail_member(member_index, e)
+                    continue
+                finish_member(member_index, generator_results)
+
+        async def run_group_async(member_indices: list[int], previous_calls: list[Future]):
+            if previous_calls:
+                _, not_done = await asyncio.wait([asyncio.wrap_future(group_future) for group_future in previous_calls],
+                                                 timeout=previous_call_timeout)
+                if not_done:
+                    abandon_group(member_indices)
+                    return
+            for member_index in member_indices:
+                if not start_member(member_index):
+                    continue
+                enum_name, generator = members[member_index]
+                try:
+                    # groups don't share configs, so other coroutines can't change this one
+                    self._config.update_config(enum_name)
+                    generator_results = await generator.get_async(query, additional_filter)
+                except Exception as e:
+                    fail_member(member_index, e)
+                    continue
+                finish_member(member_index, generator_results)
+
+        if inline:
+            for member_indices in self._member_groups:
+                run_group(member_indices, get_previous_calls(member_indices))
+            return member_futures, member_picked, started_at, None
+
+        if all(generator.is_async for _, generator in members) and not EVENT_LOOP.is_loop_thread():
+            self._in_flight_groups.extend(
+                [(EVENT_LOOP.submit(run_group_async(member_indices, get_previous_calls(member_indices))),
+                  get_member_names(member_indices))
+                 for member_indices in self._member_groups])
+            return member_futures, member_picked, started_at, None
+
+        executor = ThreadPoolExecutor(max_workers=min(len(self._member_groups), CHAIN_MAX_WORKERS),
+                                      thread_name_prefix=f"{self.parser_info.full_name} chain")
+        self._in_flight_groups.extend(
+            [(executor.submit(run_group, member_indices, get_previous_calls(member_indices)),
+              get_member_names(member_indices))
+             for member_indices in self._member_groups])
+        return member_futures, member_picked, started_at, executor
+
+    def _wait_for_member(self,
+                         member_index: int,
+                         member_future: Future,
+                         member_picked: threading.Event,
+                         started_at: list[Optional[float]],
+                         deadline: Optional[float],
+                         blocked: bool) -> list[GeneratorReturn[list[Card]]]:
+        """Waits for member results within time limits. Raises TimeoutError with
+        abandonment reason if the member has to be abandoned"""
+        member_timeout = self.config["member timeout"]
+        while not member_future.done():
+            now = time.monotonic()
+            if not member_picked.is_set():
+                if blocked:
+                    raise TimeoutError("waits for abandoned source")
+                if deadline is not None and now >= deadline:
+                    raise TimeoutError("deadline exceeded")
+                member_picked.wait(None if deadline is None else deadline - now)
+                continue
+
+            member_deadline = started_at[member_index] + member_timeout if member_timeout > 0 else None  # type: ignore
+            if member_deadline is not None and now >= member_deadline:
+                raise TimeoutError("member timeout exceeded")
+            if deadline is not None and now >= deadline:
+                raise TimeoutError("deadline exceeded")
+            wait_until = min((limit for limit in (deadline, member_deadline) if limit is not None), default=None)
+            try:
+                return member_future.result(None if wait_until is None else wait_until - now)
+            except TimeoutError:
+                continue
+        return member_future.result()
 
     def get(self,
             query: str,
             additional_filter: Callable[[CardFormat], bool] | None = None) -> list[GeneratorReturn[list[Card]]]:
+        chain_start = time.monotonic()
+        first_found = self.config["query type"] == "first found"
+        deadline = chain_start + self.config["deadline"] if self.config["deadline"] > 0 else None
+        time_limited = deadline is not None or self.config["member timeout"] > 0
+        collect_statistics = self.config["adaptive order"]
+        if collect_statistics and first_found:
+            self._apply_adaptive_order()
+
+        abandoned_members: set[int] = set()
+        member_futures, member_picked, started_at, executor = self._dispatch(
+            query, additional_filter, first_found,
+            inline=len(self._member_groups) == 1 and not time_limited,
+            abandoned_members=abandoned_members,
+            collect_statistics=collect_statistics,
+            previous_call_timeout=min((limit for limit in (self.config["deadline"], self.config["member timeout"])
+                                       if limit > 0),
+                                      default=None))
+
         res: list[GeneratorReturn[list[Card]]] = []
-        for enum_name, generator in self.enum_name2generator.items():
-            self._config.update_config(enum_name)
-            current_generator_results = generator.get(query, additional_filter)
-        
-            for i, parser_result in enumerate(current_generator_results):
-                if self.config["error verbosity"] == "silent":
-                    object.__setattr__(parser_result, "error_message", "")
-                elif self.config["error verbosity"] == "if found" and not parser_result.result and parser_result.error_message:
-                    current_generator_results.pop(i)
-                if generator.parser_info.parser_t == ParserType.chain:
-                    hierarchical_name = f"::{enum_name}{parser_result.parser_info.name}"
-                else: 
-                    hierarchical_name = f"::{enum_name}"
-                object.__setattr__(parser_result.parser_info, "name",  hierarchical_name)
-            res.extend(current_generator_results)
-            if self.config["query type"] == "first found" and res[0].result:
-                break
+        abandoned_groups: set[int] = set()
+        try:
+            for member_index, ((enum_name, generator), member_future) in enumerate(zip(self.enum_name2generator.items(),
+                                                                                       member_futures)):
+                group_index = self._member2group[member_index]
+                try:
+                    current_generator_results = self._wait_for_member(member_index,
+                                                                      member_future,
+                                                                      member_picked[member_index],
+                                                                      started_at,
+                                                                      deadline,
+                                                                      blocked=group_index in abandoned_groups)
+                except TimeoutError as e:
+                    abandoned_members.add(member_index)
+                    abandoned_groups.add(group_index)
+                    timeout_message = get_timeout_message(time.monotonic() - (started_at[member_index] or chain_start),
+                                                          str(e))
+                    if started_at[member_index] is not None:
+                        SOURCE_HEALTH.record_failure(generator.parser_info, timeout_message)
+                        if collect_statistics:
+                            self._statistics.record(enum_name, time.monotonic() - started_at[member_index], False)  # type: ignore
+                    current_generator_results = [GeneratorReturn(
+                        generator_type=generator.parser_info.parser_t,  # type: ignore
+                        name="",
+                        result=[],
+                        error_message=timeout_message)]
+                found_flag = any(parser_result.result for parser_result in current_generator_results)
+
+                for parser_result in current_generator_results:
+                    if self.config["error verbosity"] == "silent":
+                        object.__setattr__(parser_result, "error_message", "")
+                    elif self.config["error verbosity"] == "if found" and not parser_result.result and parser_result.error_message:
+                        continue
+                    if generator.parser_info.parser_t == ParserType.chain:
+                        hierarchical_name = f"::{enum_name}{parser_result.parser_info.name}"
+                    else: 
+                        hierarchical_name = f"::{enum_name}"
+                    object.__setattr__(parser_result.parser_info, "name",  hierarchical_name)
+                    res.append(parser_result)
+                if first_found and found_flag:
+                    break
+        finally:
+            if executor is not None:
+                # members that haven't started yet are skipped. Abandoned ones finish on their own
+                for member_future in member_futures:
+                    member_future.cancel()
+                executor.shutdown(wait=False, cancel_futures=True)
+            if collect_statistics:
+                self._statistics.save()
         return res
 
 
@@ -381,9 +681,81 @@ class ChainOfGenerators(WrappedBatchGeneratorProtocol[BATCH_T]):
         self._config = ChainConfig(config_dir=config_dir,
                                    config_name=requested_chain_info["config_name"],
                                    name_config_pairs=[(parser_name, config) for parser_name, config in
-                                                       zip(requested_chain_info["chain"], parser_configs)])
+                                                       zip(requested_chain_info["chain"], parser_configs)],
+                                   with_read_ahead=True)
+        self._statistics = ChainStatistics(self._config.statistics_path)
+
+    def _set_hierarchical_name(self, enum_name: str, generator_result: GeneratorReturn[BATCH_T]) -> None:
+        if self.enum_name2batch_generator[enum_name].parser_info.parser_t == ParserType.chain:
+            hierarchical_name = f"::{enum_name}{generator_result.parser_info.name}"
+        else: 
+            hierarchical_name = f"::{enum_name}"
+        object.__setattr__(generator_result.parser_info, "name",  hierarchical_name)
 
     def get(self, word: str, card_data: CardFormat) -> Generator[list[GeneratorReturn[BATCH_T]], int, list[GeneratorReturn[BATCH_T]]]:
+        collect_statistics = self.config["adaptive order"]
+        if collect_statistics and self.config["query type"] == "first found":
+            adaptive_order = self._statistics.get_order(self.enum_name2batch_generator)
+            self.enum_name2batch_generator = {enum_name: self.enum_name2batch_generator[enum_name]
+                                              for enum_name in adaptive_order}
+
+        time_limited = self.config["deadline"] > 0 or self.config["member timeout"] > 0
+        try:
+            if (self.config["read ahead"] > 0 or time_limited) and not is_read_ahead_worker():
+                return (yield from self._get_with_read_ahead(word, card_data, collect_statistics))
+            return (yield from self._get_sequentially(word, card_data, collect_statistics))
+        finally:
+            if collect_statistics:
+                self._statistics.save()
+
+    def _get_with_read_ahead(self,
+                             word: str,
+                             card_data: CardFormat,
+                             collect_statistics: bool) -> Generator[list[GeneratorReturn[BATCH_T]], int, list[GeneratorReturn[BATCH_T]]]:
+        batch_size = yield  # type: ignore
+
+        enum_names = list(self.enum_name2batch_generator)
+
+        def record_first_page(member_index: int, latency: float, found: bool) -> None:
+            self._statistics.record(enum_names[member_index], latency, found)
+
+        # members with their own configs are activated once here, on the consumer thread.
+        # The reader asks the consumer to activate the ones that share configs when it gets to them
+        self._config.update_children_configs()
+        shared_config_members = {member_index
+                                 for member_indices in group_by_shared_configs(
+                                     [batch_generator.config for batch_generator in self.enum_name2batch_generator.values()])
+                                 if len(member_indices) > 1
+                                 for member_index in member_indices}
+        reader: ReadAheadReader[BATCH_T] = ReadAheadReader(list(self.enum_name2batch_generator.items()),
+                                                           self._config.update_config,
+                                                           shared_config_members,
+                                                           self.config["read ahead"],
+                                                           batch_size,
+                                                           self.config["query type"] == "first found",
+                                                           self.config["member timeout"],
+                                                           record_first_page if collect_statistics else None,
+                                                           f"{self.parser_info.full_name} read ahead",
+                                                           word,
+                                                           card_data)
+        try:
+            while True:
+                deadline = time.monotonic() + self.config["deadline"] if self.config["deadline"] > 0 else None
+                taken, exhausted = reader.take(batch_size, deadline)
+                res: list[GeneratorReturn[BATCH_T]] = []
+                for member_index, generator_result in taken:
+                    self._set_hierarchical_name(enum_names[member_index], generator_result)
+                    res.append(generator_result)
+                if exhausted:
+                    return res
+                batch_size = yield res
+        finally:
+            reader.cancel()
+
+    def _get_sequentially(self,
+                          word: str,
+                          card_data: CardFormat,
+                          collect_statistics: bool) -> Generator[list[GeneratorReturn[BATCH_T]], int, list[GeneratorReturn[BATCH_T]]]:
         batch_size = yield  # type: ignore
         
         res: list[GeneratorReturn[BATCH_T]] = []
@@ -395,20 +767,32 @@ class ChainOfGenerators(WrappedBatchGeneratorProtocol[BATCH_T]):
             next(generator)  # it is guaranteed that it will start without errors
 
             threw_exception_flag = False
+            first_page = True
             while True: 
-                try:
-                    current_res = generator.send(batch_size - total_length)
-                    threw_exception_flag = False
-                except StopIteration as e:
-                    current_res = e.value
+                if not SOURCE_HEALTH.allow(batch_generator.parser_info):
+                    generator.close()
+                    current_res = [get_skipped_return(batch_generator.parser_info)]
                     threw_exception_flag = True
+                else:
+                    page_requested_at = time.monotonic()
+                    try:
+                        current_res = generator.send(batch_size - total_length)
+                        threw_exception_flag = False
+                    except StopIteration as e:
+                        current_res = e.value
+                        threw_exception_flag = True
+                    except Exception as e:
+                        SOURCE_HEALTH.record_failure(batch_generator.parser_info, str(e))
+                        raise
+                    SOURCE_HEALTH.record_results(batch_generator.parser_info, current_res)
+                    if collect_statistics and first_page:
+                        self._statistics.record(enum_name,
+                                                time.monotonic() - page_requested_at,
+                                                any(generator_result.result for generator_result in current_res))
+                first_page = False
                 
                 for generator_result in current_res: 
-                    if batch_generator.parser_info.parser_t == ParserType.chain:
-                        hierarchical_name = f"::{enum_name}{generator_result.parser_info.name}"
-                    else: 
-                        hierarchical_name = f"::{enum_name}"
-                    object.__setattr__(generator_result.parser_info, "name",  hierarchical_name)
+                    self._set_hierarchical_name(enum_name, generator_result)
                     res.append(generator_result)
                     total_length += len(generator_result.result)
 
@@ -424,6 +808,8 @@ class ChainOfGenerators(WrappedBatchGeneratorProtocol[BATCH_T]):
                 yielded_once_flag = True
                 total_length = 0
                 res = []
+                if threw_exception_flag:
+                    break
             if yielded_once_flag and self.config["query type"] == "first found":
                 break
         return res
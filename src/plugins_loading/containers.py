@@ -208,6 +208,9 @@ class LanguagePackageContainer(Named, LanguagePackageInterface):
         object.__setattr__(self, "hotkeys_and_buttons_help_menu_label",
                            source_module.hotkeys_and_buttons_help_menu_label)
         object.__setattr__(self, "query_settings_language_label_text", source_module.query_settings_language_label_text)
+        object.__setattr__(self, "sources_health_menu_label", source_module.sources_health_menu_label)
+        object.__setattr__(self, "sources_health_no_calls_text", source_module.sources_health_no_calls_text)
+        object.__setattr__(self, "sources_health_reset_button_text", source_module.sources_health_reset_button_text)
         object.__setattr__(self, "help_master_menu_label", source_module.help_master_menu_label)
         object.__setattr__(self, "download_audio_menu_label", source_module.download_audio_menu_label)
         object.__setattr__(self, "change_media_folder_menu_label", source_module.change_media_folder_menu_label)
@@ -373,6 +376,7 @@ class LanguagePackageContainer(Named, LanguagePackageInterface):
         object.__setattr__(self, "find_dialog_nothing_found_message", source_module.find_dialog_nothing_found_message)
         object.__setattr__(self, "find_dialog_find_window_title", source_module.find_dialog_find_window_title)
         object.__setattr__(self, "find_dialog_find_button_text", source_module.find_dialog_find_button_text)
+        object.__setattr__(self, "find_dialog_explain_window_title", source_module.find_dialog_explain_window_title)
 
         # statistics dialog
         object.__setattr__(self, "statistics_dialog_copied_text", source_module.statistics_dialog_copied_text)
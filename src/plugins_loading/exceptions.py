@@ -12,3 +12,7 @@ class LoaderError(PluginError):
 
 class WrongPluginProtocol(PluginError):
     pass
+
+
+class PluginProcessError(PluginError):
+    pass
@@ -23,6 +23,7 @@ from .containers import (CardProcessorContainer, DeckSavingFormatContainer,
                          ThemeContainer, WebAudioGetterContainer,
                          WebSentenceParserContainer, WebWordParserContainer)
 from .exceptions import LoaderError, UnknownPluginName
+from .process_pool import PLUGIN_PROCESS_POOL
 
 
 def parse_namespace(namespace, postfix: str = "") -> dict[str, ModuleType]:
@@ -162,7 +163,9 @@ class PluginFactory:
             if (web_parser := self.web_word_parsers.get(parser_info.name)) is None:
                 raise UnknownPluginName(f"Unknown web word parser: {parser_info.name}")
             return WebCardGenerator(name=web_parser.name,
-                                    word_definition_function=web_parser.define,
+                                    word_definition_function=PLUGIN_PROCESS_POOL.wrap_definition(parser_info,
+                                                                                                 web_parser.define,
+                                                                                                 web_parser.config),
                                     config=web_parser.config,
                                     scheme_docs=web_parser.scheme_docs)
         elif parser_info.parser_t == ParserType.local:
@@ -188,7 +191,9 @@ class PluginFactory:
             if (gen := self.web_sent_parsers.get(parser_info.name)) is None:
                 raise UnknownPluginName(f"Unknown sentence parser: {parser_info.name}")
             return BatchGeneratorWrapper(config=gen.config,
-                                         generator_initializer=gen.get,
+                                         generator_initializer=PLUGIN_PROCESS_POOL.wrap_batch_generator(parser_info,
+                                                                                                        gen.get,
+                                                                                                        gen.config),
                                          parser_name=parser_info.name,
                                          parser_type=ParserType.web)
         elif parser_info.parser_t == ParserType.local:
@@ -208,7 +213,9 @@ class PluginFactory:
             if (gen := self.web_image_parsers.get(parser_info.name)) is None:
                 raise UnknownPluginName(f"Unknown image parser: {parser_info.name}")
             return BatchGeneratorWrapper(config=gen.config,
-                                         generator_initializer=gen.get,
+                                         generator_initializer=PLUGIN_PROCESS_POOL.wrap_batch_generator(parser_info,
+                                                                                                        gen.get,
+                                                                                                        gen.config),
                                          parser_name=parser_info.name,
                                          parser_type=ParserType.web)
         elif parser_info.parser_t == ParserType.local:
@@ -228,14 +235,18 @@ class PluginFactory:
             if (web_gen := self.web_audio_getters.get(parser_info.name)) is None:
                 raise UnknownPluginName(f"Unknown web audio getter: {parser_info.name}")
             return BatchGeneratorWrapper(config=web_gen.config,
-                                         generator_initializer=web_gen.get,
+                                         generator_initializer=PLUGIN_PROCESS_POOL.wrap_batch_generator(parser_info,
+                                                                                                        web_gen.get,
+                                                                                                        web_gen.config),
                                          parser_name=parser_info.name,
                                          parser_type=ParserType.web)
         elif parser_info.parser_t == ParserType.local:
             if (local_gen := self.local_audio_getters.get(parser_info.name)) is None:
                 raise UnknownPluginName(f"Unknown local audio getter: {parser_info.name}")
             return BatchGeneratorWrapper(config=local_gen.config,
-                                         generator_initializer=local_gen.get,
+                                         generator_initializer=PLUGIN_PROCESS_POOL.wrap_batch_generator(parser_info,
+                                                                                                        local_gen.get,
+                                                                                                        local_gen.config),
                                          parser_name=parser_info.name,
                                          parser_type=ParserType.local)
         elif parser_info.parser_t == ParserType.chain:
@@ -19,6 +19,9 @@ class LanguagePackageInterface(Protocol):
     save_files_menu_label: str
     hotkeys_and_buttons_help_menu_label: str
     query_settings_language_label_text: str
+    sources_health_menu_label: str
+    sources_health_no_calls_text: str
+    sources_health_reset_button_text: str
     help_master_menu_label: str
     download_audio_menu_label: str
     change_media_folder_menu_label: str
@@ -144,6 +147,7 @@ class LanguagePackageInterface(Protocol):
     find_dialog_nothing_found_message: str
     find_dialog_find_window_title: str
     find_dialog_find_button_text: str
+    find_dialog_explain_window_title: str
 
     # statistics dialog
     statistics_dialog_copied_text: str
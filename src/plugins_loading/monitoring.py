@@ -0,0 +1,232 @@
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from ..consts import ParserType, TypedParserName
+
+
+class CircuitState(str, Enum):
+    closed    = "closed"
+    open      = "open"
+    half_open = "half-open"
+
+
+@dataclass(slots=True)
+class SourceHealth:
+    state:                CircuitState = CircuitState.closed
+    consecutive_failures: int = 0
+    total_calls:          int = 0
+    total_failures:       int = 0
+    cooldown:             float = 0
+    opened_at:            float = 0
+    probe_started_at:     Optional[float] = None
+    last_error:           str = ""
+
+
+class SourceHealthTracker:
+    """Circuit breaker shared by all chains and data generators.
+    After failure_threshold consecutive failures a source is skipped for a cool-down period.
+    Then a single probe call is let through: success closes the circuit,
+    failure opens it again with doubled cool-down (up to max_cooldown)"""
+
+    def __init__(self,
+                 failure_threshold: int = 3,
+                 cooldown: float = 30,
+                 max_cooldown: float = 600,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sources: dict[TypedParserName, SourceHealth] = {}
+
+    def _get_health(self, parser_info: TypedParserName) -> SourceHealth:
+        if (health := self._sources.get(parser_info)) is None:
+            health = self._sources[parser_info] = SourceHealth(cooldown=self.cooldown)
+        return health
+
+    def allow(self, parser_info: TypedParserName) -> bool:
+        """Whether source can be called now. Moves open circuit to half-open when cool-down is over"""
+        if parser_info.parser_t == ParserType.chain:
+            return True
+
+        with self._lock:
+            health = self._get_health(parser_info)
+            if health.state == CircuitState.closed:
+                return True
+
+            now = self._clock()
+            if health.state == CircuitState.open:
+                if now - health.opened_at < health.cooldown:
+                    return False
+                health.state = CircuitState.half_open
+            # probe that never reported back (e.g. its generator was closed) is replaced by a new one
+            elif health.probe_started_at is not None and now - health.probe_started_at < health.cooldown:
+                return False
+            health.probe_started_at = now
+            return True
+
+    def record_success(self, parser_info: TypedParserName) -> None:
+        if parser_info.parser_t == ParserType.chain:
+            return
+
+        with self._lock:
+            health = self._get_health(parser_info)
+            health.total_calls += 1
+            health.consecutive_failures = 0
+            health.state = CircuitState.closed
+            health.cooldown = self.cooldown
+            health.probe_started_at = None
+
+    def record_failure(self, parser_info: TypedParserName, error_message: str) -> None:
+        if parser_info.parser_t == ParserType.chain:
+            return
+
+        with self._lock:
+            health = self._get_health(parser_info)
+            health.total_calls += 1
+            health.total_failures += 1
+            health.consecutive_failures += 1
+            health.last_error = error_message
+            if health.state == CircuitState.half_open:
+                health.cooldown = min(health.cooldown * 2, self.max_cooldown)
+            elif health.consecutive_failures < self.failure_threshold:
+                return
+            health.state = CircuitState.open
+            health.opened_at = self._clock()
+            health.probe_started_at = None
+
+    def record_results(self, parser_info: TypedParserName, results: Sequence[Any]) -> None:
+        """Takes GeneratorReturn list of a single call.
+        Source is considered failed only when it returned nothing because it couldn't be reached.
+        Errors of a reachable source (e.g. 404 for an unknown word) don't open the circuit"""
+        if results and all(not generator_return.result and generator_return.transport_failed
+                           for generator_return in results):
+            self.record_failure(parser_info, results[-1].error_message)
+        else:
+            self.record_success(parser_info)
+
+    def reset(self, parser_info: Optional[TypedParserName] = None) -> None:
+        with self._lock:
+            if parser_info is None:
+                self._sources.clear()
+            else:
+                self._sources.pop(parser_info, None)
+
+    def get_snapshot(self) -> dict[TypedParserName, SourceHealth]:
+        with self._lock:
+            return {parser_info: replace(health) for parser_info, health in self._sources.items()}
+
+    def get_report(self) -> str:
+        now = self._clock()
+        lines = []
+        for parser_info, health in sorted(self.get_snapshot().items(), key=lambda item: item[0].full_name):
+            line = f"{parser_info.full_name}: {health.state.value}, " \
+                   f"failed {health.total_failures}/{health.total_calls} calls, " \
+                   f"{health.consecutive_failures} in a row"
+            if health.state == CircuitState.open:
+                line += f", retry in {max(0., health.cooldown - (now - health.opened_at)):.0f} s"
+            if health.last_error:
+                line += f"\n    last error: {health.last_error}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def get_circuit_open_message(parser_info: TypedParserName) -> str:
+    return f"{parser_info.full_name} is skipped: too many failures in a row"
+
+
+SOURCE_HEALTH = SourceHealthTracker()
+
+
+STATISTICS_WINDOW = 100
+# share of 95th percentile in latency estimate. Latencies are skewed, so their mean
+# lies between the median and the tail, and sources with slow tails are tried later
+TAIL_LATENCY_WEIGHT = 0.25
+
+
+@dataclass(slots=True)
+class SourceStatistics:
+    hits:      deque[bool]  = field(default_factory=lambda: deque(maxlen=STATISTICS_WINDOW))
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=STATISTICS_WINDOW))
+
+    @property
+    def hit_rate(self) -> float:
+        """Laplace-smoothed, so that unexplored sources aren't considered hopeless"""
+        return (sum(self.hits) + 1) / (len(self.hits) + 2)
+
+    def get_latency_quantile(self, quantile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[round(quantile * 100) - 1]
+
+    def get_expected_latency(self) -> Optional[float]:
+        if (median := self.get_latency_quantile(0.5)) is None:
+            return None
+        return (1 - TAIL_LATENCY_WEIGHT) * median + TAIL_LATENCY_WEIGHT * self.get_latency_quantile(0.95)  # type: ignore
+
+
+class ChainStatistics:
+    """Rolling per-member hit rate and latency of a chain that are kept between sessions.
+    Used to order "first found" chain members by expected time to the first result"""
+
+    ENCODING = "UTF-8"
+
+    def __init__(self, file_path: str):
+        self._file_path = file_path
+        self._lock = threading.Lock()
+        self._members: dict[str, SourceStatistics] = {}
+        self.load()
+
+    def load(self) -> None:
+        self._members = {}
+        if not os.path.exists(self._file_path):
+            return
+        try:
+            with open(self._file_path, "r", encoding=ChainStatistics.ENCODING) as statistics_file:
+                saved_statistics = json.load(statistics_file)
+            for enum_name, member_data in saved_statistics.items():
+                member_statistics = self._members[enum_name] = SourceStatistics()
+                member_statistics.hits.extend(bool(hit) for hit in member_data["hits"])
+                member_statistics.latencies.extend(float(latency) for latency in member_data["latencies"])
+        except (ValueError, TypeError, KeyError, AttributeError):  # corrupted statistics are discarded
+            self._members = {}
+
+    def save(self) -> None:
+        with self._lock:
+            saved_statistics = {enum_name: {"hits": [int(hit) for hit in member_statistics.hits],
+                                            "latencies": [round(latency, 4) for latency in member_statistics.latencies]}
+                                for enum_name, member_statistics in self._members.items()}
+        with open(self._file_path, "w", encoding=ChainStatistics.ENCODING) as statistics_file:
+            json.dump(saved_statistics, statistics_file)
+
+    def record(self, enum_name: str, latency: float, hit: bool) -> None:
+        with self._lock:
+            if (member_statistics := self._members.get(enum_name)) is None:
+                member_statistics = self._members[enum_name] = SourceStatistics()
+            member_statistics.hits.append(hit)
+            member_statistics.latencies.append(latency)
+
+    def get_order(self, enum_names: Iterable[str]) -> list[str]:
+        """Sorts members by expected latency (blend of median and 95th percentile) to hit rate ratio,
+        which minimizes expected time of sequential search for the first result.
+        Members without latency samples are given median expected latency of other members;
+        ties keep given order"""
+        enum_names = list(enum_names)
+        with self._lock:
+            members = [self._members.get(enum_name, SourceStatistics()) for enum_name in enum_names]
+            latencies = [member_statistics.get_expected_latency() for member_statistics in members]
+            known_latencies = [latency for latency in latencies if latency is not None]
+            default_latency = statistics.median(known_latencies) if known_latencies else 0
+            costs = [(default_latency if latency is None else latency) / member_statistics.hit_rate
+                     for latency, member_statistics in zip(latencies, members)]
+        return [enum_name for _, _, enum_name in sorted(zip(costs, range(len(enum_names)), enum_names))]
@@ -0,0 +1,286 @@
+"""
+Isolated execution of parser plugins in worker processes.
+CPU-bound parsing doesn't hold the GIL of the UI process and a crashed or hung
+plugin takes down only its worker, which is replaced by a new one.
+Plugin functions are sent to workers by reference, so they have to be module-level ones.
+"""
+
+
+import asyncio
+import itertools
+import multiprocessing
+import sys
+import threading
+import traceback
+from functools import partial
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Generator, Iterable, Optional, TypeVar
+
+from ..consts import TypedParserName
+from ..plugins_management.config_management import LoadableConfigProtocol
+from ..plugins_management.http_client import (add_transport_failures,
+                                              get_transport_failures)
+from .async_support import (is_async_batch_generator, is_async_definition,
+                            to_sync_batch_generator)
+from .exceptions import PluginProcessError
+
+PLUGIN_PROCESS_WORKERS = 2
+PLUGIN_CALL_TIMEOUT = 30
+
+_CALL  = "call"
+_START = "start"
+_SEND  = "send"
+
+_OK    = "ok"
+_STOP  = "stop"
+_ERROR = "error"
+
+
+def _format_exception(exception: BaseException) -> str:
+    return "".join(traceback.format_exception_only(exception)).strip()
+
+
+def _set_plugin_config(function: Callable, config_data: Optional[dict]) -> None:
+    """Worker side: plugin sees the same config as the one in the UI process"""
+    if config_data is None:
+        return
+    if (config := getattr(sys.modules.get(function.__module__), "config", None)) is not None:
+        config.data = config_data
+
+
+def _worker_main(connection: Connection) -> None:
+    # generator id -> (generator, plugin function that created it)
+    generators: dict[int, tuple[Generator, Callable]] = {}
+    while True:
+        try:
+            command, closed_generator_ids, payload = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        for generator_id in closed_generator_ids:
+            if (generator_data := generators.pop(generator_id, None)) is not None:
+                generator_data[0].close()
+
+        transport_failures = get_transport_failures()
+        try:
+            if command == _CALL:
+                function, config_data, args, kwargs = payload
+                _set_plugin_config(function, config_data)
+                if is_async_definition(function):
+                    response = (_OK, asyncio.run(function(*args, **kwargs)))
+                else:
+                    response = (_OK, function(*args, **kwargs))
+            elif command == _START:
+                generator_id, generator_initializer, config_data, args, kwargs = payload
+                _set_plugin_config(generator_initializer, config_data)
+                if is_async_batch_generator(generator_initializer):
+                    generator = to_sync_batch_generator(generator_initializer)(*args, **kwargs)
+                else:
+                    generator = generator_initializer(*args, **kwargs)
+                next(generator)
+                generators[generator_id] = (generator, generator_initializer)
+                response = (_OK, None)
+            else:
+                generator_id, config_data, batch_size = payload
+                generator, generator_initializer = generators[generator_id]
+                _set_plugin_config(generator_initializer, config_data)
+                try:
+                    response = (_OK, generator.send(batch_size))
+                except StopIteration as e:
+                    generators.pop(generator_id)
+                    response = (_STOP, e.value)
+        except Exception as e:
+            if command == _SEND:
+                generators.pop(payload[0], None)
+            response = (_ERROR, _format_exception(e))
+
+        # transport failures are counted by the UI process thread that made the request
+        transport_failures = get_transport_failures() - transport_failures
+        try:
+            connection.send((*response, transport_failures))
+        except Exception as e:  # results that can't be pickled
+            connection.send((_ERROR, _format_exception(e), transport_failures))
+
+
+class _Worker:
+    """Worker process with a pipe to it. Only one request is in flight at a time"""
+
+    def __init__(self, context: Any, name: str):
+        self._context = context
+        self.name = name
+        self.busy = False
+        # generators started by previous processes are lost on restart
+        self.incarnation = 0
+        self.closed_generator_ids: list[int] = []
+        self._spawn()
+
+    def _spawn(self) -> None:
+        self._connection, child_connection = self._context.Pipe()
+        self._process = self._context.Process(target=_worker_main,
+                                              args=(child_connection,),
+                                              name=self.name,
+                                              daemon=True)
+        self._process.start()
+        child_connection.close()
+        self.incarnation += 1
+        self.closed_generator_ids = []
+
+    def restart(self) -> None:
+        self.stop()
+        self._spawn()
+
+    def stop(self) -> None:
+        self._connection.close()
+        self._process.terminate()
+        self._process.join(1)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+
+    def request(self,
+                command: str,
+                closed_generator_ids: list[int],
+                payload: tuple,
+                timeout: float) -> tuple[str, Any, int]:
+        try:
+            self._connection.send((command, closed_generator_ids, payload))
+            responded = timeout <= 0 or self._connection.poll(timeout)
+            if responded:
+                return self._connection.recv()
+        except (EOFError, OSError) as e:
+            self.restart()
+            raise PluginProcessError(f"Plugin worker process crashed: {_format_exception(e)}") from e
+        self.restart()
+        raise TimeoutError(f"Plugin didn't respond in {timeout} s and its worker process was restarted")
+
+
+R = TypeVar("R")
+BATCH_T = TypeVar("BATCH_T")
+class PluginProcessPool:
+    """Pool of worker processes that run selected plugins.
+    Workers are started on first use. Every call has a timeout after which its worker is restarted.
+    Batch generators live inside the worker that started them"""
+
+    def __init__(self,
+                 n_workers: int = PLUGIN_PROCESS_WORKERS,
+                 call_timeout: float = PLUGIN_CALL_TIMEOUT,
+                 isolated_plugins: Iterable[str] = ()):
+        self.n_workers = max(1, n_workers)
+        self.call_timeout = call_timeout
+        self.isolated_plugins = set(isolated_plugins)
+        self._condition = threading.Condition()
+        self._workers: list[_Worker] = []
+        self._generator_ids = itertools.count()
+
+    def configure(self, n_workers: int, call_timeout: float, isolated_plugins: Iterable[str]) -> None:
+        """Has to be called before isolated plugins are wrapped"""
+        self.n_workers = max(1, n_workers)
+        self.call_timeout = call_timeout
+        self.isolated_plugins = set(isolated_plugins)
+
+    def is_isolated(self, parser_info: TypedParserName) -> bool:
+        return parser_info.full_name in self.isolated_plugins
+
+    def _acquire(self, worker: Optional[_Worker] = None) -> _Worker:
+        """Takes given worker or any free one, waiting until it is free"""
+        with self._condition:
+            if not self._workers:
+                # spawned processes don't inherit the state of this one, so forking threads is avoided
+                context = multiprocessing.get_context("spawn")
+                self._workers = [_Worker(context, f"plugin worker {i}") for i in range(self.n_workers)]
+            while True:
+                candidates = self._workers if worker is None else (worker,)
+                for candidate in candidates:
+                    if not candidate.busy:
+                        candidate.busy = True
+                        return candidate
+                self._condition.wait()
+
+    def _release(self, worker: _Worker) -> None:
+        with self._condition:
+            worker.busy = False
+            self._condition.notify_all()
+
+    def _request(self, command: str, payload: tuple, worker: Optional[_Worker] = None,
+                 incarnation: Optional[int] = None) -> tuple[_Worker, int, str, Any]:
+        worker = self._acquire(worker)
+        with self._condition:
+            closed_generator_ids, worker.closed_generator_ids = worker.closed_generator_ids, []
+        try:
+            if incarnation is not None and worker.incarnation != incarnation:
+                raise PluginProcessError("Plugin worker process was restarted")
+            incarnation = worker.incarnation
+            status, value, transport_failures = worker.request(command, closed_generator_ids, payload,
+                                                               self.call_timeout)
+        finally:
+            self._release(worker)
+        add_transport_failures(transport_failures)
+        if status == _ERROR:
+            raise PluginProcessError(value)
+        return worker, incarnation, status, value
+
+    def call(self,
+             function: Callable[..., R],
+             config: Optional[LoadableConfigProtocol],
+             *args: Any,
+             **kwargs: Any) -> R:
+        _, _, _, result = self._request(_CALL, (function, None if config is None else config.data, args, kwargs))
+        return result
+
+    def run_batch_generator(self,
+                            generator_initializer: Callable[..., Generator[tuple[BATCH_T, str], int, tuple[BATCH_T, str]]],
+                            config: Optional[LoadableConfigProtocol],
+                            *args: Any,
+                            **kwargs: Any) -> Generator[tuple[BATCH_T, str], int, tuple[BATCH_T, str]]:
+        """Generator with the protocol of plugin getters that proxies to the one living in a worker"""
+        batch_size = yield  # type: ignore
+        generator_id = next(self._generator_ids)
+        worker, incarnation, _, _ = self._request(
+            _START, (generator_id, generator_initializer, None if config is None else config.data, args, kwargs))
+        exhausted = False
+        try:
+            while True:
+                _, _, status, batch = self._request(_SEND,
+                                                    (generator_id, None if config is None else config.data, batch_size),
+                                                    worker,
+                                                    incarnation)
+                if status == _STOP:
+                    exhausted = True
+                    return batch
+                batch_size = yield batch
+        except PluginProcessError:
+            exhausted = True
+            raise
+        finally:
+            if not exhausted:
+                # closed on the next request to the worker, so that closing never waits for it
+                with self._condition:
+                    if worker.incarnation == incarnation:
+                        worker.closed_generator_ids.append(generator_id)
+
+    def wrap_definition(self,
+                        parser_info: TypedParserName,
+                        function: Callable[..., R],
+                        config: Optional[LoadableConfigProtocol]) -> Callable[..., R]:
+        """Proxy of isolated plugin definition function. Other functions are returned as they are"""
+        if not self.is_isolated(parser_info):
+            return function
+        return partial(self.call, function, config)
+
+    def wrap_batch_generator(self,
+                             parser_info: TypedParserName,
+                             generator_initializer: Callable[..., Any],
+                             config: Optional[LoadableConfigProtocol]) -> Callable[..., Any]:
+        """Proxy of isolated plugin getter. Other getters are returned as they are"""
+        if not self.is_isolated(parser_info):
+            return generator_initializer
+        return partial(self.run_batch_generator, generator_initializer, config)
+
+    def shutdown(self) -> None:
+        with self._condition:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+
+
+PLUGIN_PROCESS_POOL = PluginProcessPool()
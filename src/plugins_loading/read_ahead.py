@@ -0,0 +1,388 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Generic, Optional, Sized, TypeVar
+
+from .async_support import EVENT_LOOP
+from .monitoring import SOURCE_HEALTH
+from .wrappers import GeneratorReturn, WrappedBatchGeneratorProtocol, get_skipped_return
+
+_worker_state = threading.local()
+
+
+def is_read_ahead_worker() -> bool:
+    """Whether current thread is a read-ahead worker. Nested chains that are driven by
+    a worker don't start their own workers, so that every config is updated only by a single thread"""
+    return getattr(_worker_state, "active", False)
+
+
+def split_generator_return(generator_return: GeneratorReturn, n_items: int) -> tuple[GeneratorReturn, GeneratorReturn]:
+    head = GeneratorReturn(generator_type=generator_return.parser_info.parser_t,
+                           name=generator_return.parser_info.name,
+                           result=generator_return.result[:n_items],
+                           error_message=generator_return.error_message,
+                           transport_failed=generator_return.transport_failed)
+    tail = GeneratorReturn(generator_type=generator_return.parser_info.parser_t,
+                           name=generator_return.parser_info.name,
+                           result=generator_return.result[n_items:],
+                           error_message="")
+    return head, tail
+
+
+def get_timeout_message(elapsed: float, reason: str) -> str:
+    return f"Abandoned after {elapsed:.1f} s: {reason}"
+
+
+BATCH_T = TypeVar("BATCH_T", bound=Sized)
+class ReadAheadReader(Generic[BATCH_T]):
+    """Drives chain members on a background thread (or as a coroutine on the shared
+    event loop when every member is async) and keeps a bounded buffer
+    of already fetched pages. Members are read in chain order, so the next source's
+    first page is fetched while the current one is still being shown.
+    With zero depth pages are fetched only while someone is waiting for them.
+
+    Configs are activated only on the consumer thread: members that share configs
+    wait for the consumer to activate them in take() before their first page is fetched.
+
+    A member that doesn't deliver its page in time is abandoned: its thread is left to finish
+    on its own, its late results are dropped and reading continues from the next member on a new worker"""
+
+    def __init__(self,
+                 members: list[tuple[str, WrappedBatchGeneratorProtocol]],
+                 activate_member: Callable[[str], None],
+                 shared_config_members: set[int],
+                 depth: int,
+                 page_size: int,
+                 first_found: bool,
+                 member_timeout: float,
+                 on_first_page: Optional[Callable[[int, float, bool], None]],
+                 thread_name: str,
+                 *args: Any,
+                 **kwargs: Any):
+        self._members = members
+        self._activate_member = activate_member
+        self._shared_config_members = shared_config_members
+        self._depth = max(0, depth)
+        self._page_size = page_size
+        self._first_found = first_found
+        self._member_timeout = member_timeout
+        self._on_first_page = on_first_page
+        self._thread_name = thread_name
+        self._args = args
+        self._kwargs = kwargs
+
+        # (member index, page, whether member is exhausted)
+        self._buffer: deque[tuple[int, list[GeneratorReturn[BATCH_T]], bool]] = deque()
+        self._condition = threading.Condition()
+        self._cancelled = False
+        self._finished = False
+        self._exception: Optional[Exception] = None
+        self._demand = False
+        self._found = False
+        # (member index, time when its current page was requested, whether it is member's first page)
+        self._in_flight: Optional[tuple[int, float, bool]] = None
+        # member whose shared config the worker waits to be activated by the consumer
+        self._activation_request: Optional[int] = None
+        self._active_member: Optional[int] = None
+        # every abandonment starts a new worker; workers of previous generations are stale
+        self._generation = 0
+        # set when the worker is a coroutine on the shared event loop
+        self._wakeup: Optional[asyncio.Event] = None
+        if all(batch_generator.is_async for _, batch_generator in members) and not EVENT_LOOP.is_loop_thread():
+            self._wakeup = asyncio.Event()
+
+        with self._condition:
+            self._start_worker(0)
+
+    def cancel(self) -> None:
+        with self._condition:
+            self._cancelled = True
+            self._generation += 1
+            self._buffer.clear()
+            self._notify()
+
+    def _notify(self) -> None:
+        self._condition.notify_all()
+        if self._wakeup is not None:
+            EVENT_LOOP.loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _activate(self, member_index: int) -> None:
+        self._activate_member(self._members[member_index][0])
+        self._active_member = member_index
+        self._activation_request = None
+        self._notify()
+
+    def _start_worker(self, start_index: int) -> None:
+        """Called on the consumer thread only"""
+        self._generation += 1
+        self._in_flight = None
+        self._activation_request = None
+        self._active_member = None
+        if start_index >= len(self._members):
+            self._finished = True
+            self._notify()
+            return
+        if start_index in self._shared_config_members:
+            self._activate(start_index)
+        if self._wakeup is not None:
+            EVENT_LOOP.submit(self._work_async(self._generation, start_index))
+            return
+        threading.Thread(target=self._work,
+                         args=(self._generation, start_index),
+                         name=f"{self._thread_name} [{self._generation}]",
+                         daemon=True).start()
+
+    def _is_stale(self, generation: int) -> bool:
+        return self._cancelled or generation != self._generation
+
+    def _wants_page(self) -> bool:
+        if self._depth:
+            return len(self._buffer) < self._depth
+        return self._demand and not self._buffer
+
+    # Helpers below are shared by both workers and have to be called under the condition lock
+
+    def _is_activated(self, member_index: int) -> bool:
+        """Requests activation of the member from the consumer if its config is shared"""
+        if member_index not in self._shared_config_members or self._active_member == member_index:
+            return True
+        if self._activation_request != member_index:
+            self._activation_request = member_index
+            self._notify()
+        return False
+
+    def _should_stop(self, generation: int) -> bool:
+        return self._is_stale(generation) or self._first_found and self._found
+
+    def _request_page(self, member_index: int, first_page: bool) -> tuple[int, float]:
+        page_requested_at = time.monotonic()
+        self._in_flight = (member_index, page_requested_at, first_page)
+        self._notify()
+        return self._page_size, page_requested_at
+
+    def _record_failure(self, generation: int, batch_generator: WrappedBatchGeneratorProtocol, exception: Exception) -> None:
+        if not self._is_stale(generation):
+            SOURCE_HEALTH.record_failure(batch_generator.parser_info, str(exception))
+
+    def _put_page(self,
+                  generation: int,
+                  member_index: int,
+                  page: list[GeneratorReturn[BATCH_T]],
+                  member_exhausted: bool,
+                  skipped: bool,
+                  first_page: bool,
+                  page_requested_at: float) -> bool:
+        """Returns False if the worker is stale. Late results of abandoned members are dropped"""
+        if self._is_stale(generation):
+            return False
+        batch_generator = self._members[member_index][1]
+        page_found = any(generator_return.result for generator_return in page)
+        if not skipped:
+            SOURCE_HEALTH.record_results(batch_generator.parser_info, page)
+            if first_page and self._on_first_page is not None:
+                self._on_first_page(member_index, time.monotonic() - page_requested_at, page_found)
+        self._found = self._found or page_found
+        self._in_flight = None
+        self._buffer.append((member_index, page, member_exhausted))
+        self._notify()
+        return True
+
+    def _finish_worker(self, generation: int, exception: Optional[Exception]) -> None:
+        if not self._is_stale(generation):
+            self._exception = exception
+            self._finished = True
+            self._in_flight = None
+            self._notify()
+
+    def _work(self, generation: int, start_index: int) -> None:
+        _worker_state.active = True
+        exception: Optional[Exception] = None
+        try:
+            for member_index in range(start_index, len(self._members)):
+                batch_generator = self._members[member_index][1]
+                with self._condition:
+                    while not self._should_stop(generation) and not self._is_activated(member_index):
+                        self._condition.wait()
+                    if self._should_stop(generation):
+                        return
+
+                generator = batch_generator.get(*self._args, **self._kwargs)
+                next(generator)  # it is guaranteed that it will start without errors
+                try:
+                    member_exhausted = False
+                    first_page = True
+                    while not member_exhausted:
+                        with self._condition:
+                            while not self._is_stale(generation) and not self._wants_page():
+                                self._condition.wait()
+                            if self._is_stale(generation):
+                                return
+                            page_size, page_requested_at = self._request_page(member_index, first_page)
+
+                        skipped = not SOURCE_HEALTH.allow(batch_generator.parser_info)
+                        if skipped:
+                            page = [get_skipped_return(batch_generator.parser_info)]
+                            member_exhausted = True
+                        else:
+                            try:
+                                page = generator.send(page_size)
+                            except StopIteration as e:
+                                page = e.value
+                                member_exhausted = True
+                            except Exception as e:
+                                with self._condition:
+                                    self._record_failure(generation, batch_generator, e)
+                                raise
+
+                        with self._condition:
+                            if not self._put_page(generation, member_index, page, member_exhausted,
+                                                  skipped, first_page, page_requested_at):
+                                return
+                        first_page = False
+                finally:
+                    generator.close()
+        except Exception as e:
+            exception = e
+        finally:
+            with self._condition:
+                self._finish_worker(generation, exception)
+
+    async def _work_async(self, generation: int, start_index: int) -> None:
+        """Worker for chains of async members. Runs on the shared event loop instead of a thread
+        and waits for the consumer on self._wakeup instead of the condition"""
+        assert self._wakeup is not None
+        exception: Optional[Exception] = None
+        try:
+            for member_index in range(start_index, len(self._members)):
+                batch_generator = self._members[member_index][1]
+                while True:
+                    self._wakeup.clear()
+                    with self._condition:
+                        if self._should_stop(generation):
+                            return
+                        if self._is_activated(member_index):
+                            break
+                    await self._wakeup.wait()
+
+                generator = batch_generator.get_async(*self._args, **self._kwargs)
+                await generator.asend(None)  # type: ignore
+                try:
+                    member_exhausted = False
+                    first_page = True
+                    while not member_exhausted:
+                        while True:
+                            self._wakeup.clear()
+                            with self._condition:
+                                if self._is_stale(generation):
+                                    return
+                                if self._wants_page():
+                                    page_size, page_requested_at = self._request_page(member_index, first_page)
+                                    break
+                            await self._wakeup.wait()
+
+                        skipped = not SOURCE_HEALTH.allow(batch_generator.parser_info)
+                        if skipped:
+                            page = [get_skipped_return(batch_generator.parser_info)]
+                            member_exhausted = True
+                        else:
+                            try:
+                                page = await generator.asend(page_size)
+                            except StopAsyncIteration:
+                                # the last page has already been put
+                                with self._condition:
+                                    if self._is_stale(generation):
+                                        return
+                                    self._in_flight = None
+                                break
+                            except Exception as e:
+                                with self._condition:
+                                    self._record_failure(generation, batch_generator, e)
+                                raise
+
+                        with self._condition:
+                            if not self._put_page(generation, member_index, page, member_exhausted,
+                                                  skipped, first_page, page_requested_at):
+                                return
+                        first_page = False
+                finally:
+                    await generator.aclose()
+        except Exception as e:
+            exception = e
+        finally:
+            with self._condition:
+                self._finish_worker(generation, exception)
+
+    def _abandon_in_flight(self, reason: str) -> tuple[int, GeneratorReturn[BATCH_T]]:
+        member_index, started_at, first_page = self._in_flight  # type: ignore
+        batch_generator = self._members[member_index][1]
+        elapsed = time.monotonic() - started_at
+        timeout_message = get_timeout_message(elapsed, reason)
+        SOURCE_HEALTH.record_failure(batch_generator.parser_info, timeout_message)
+        if first_page and self._on_first_page is not None:
+            self._on_first_page(member_index, elapsed, False)
+        timeout_result: GeneratorReturn = GeneratorReturn(
+            generator_type=batch_generator.parser_info.parser_t,  # type: ignore
+            name="",
+            result=[],
+            error_message=timeout_message)
+        # in first found mode sources following the one that found something are never read
+        self._start_worker(len(self._members) if self._first_found and self._found else member_index + 1)
+        return member_index, timeout_result
+
+    def take(self,
+             n_items: int,
+             deadline: Optional[float] = None) -> tuple[list[tuple[int, GeneratorReturn[BATCH_T]]], bool]:
+        """Blocks until n_items results are gathered, all members are exhausted or
+        deadline (time.monotonic() based) is reached.
+        Returns taken (member index, result) pairs and whether everything was read.
+        Abandoned members are reported as empty results with error message"""
+        taken: list[tuple[int, GeneratorReturn[BATCH_T]]] = []
+        total_length = 0
+        with self._condition:
+            self._page_size = n_items
+            self._demand = True
+            self._notify()
+            try:
+                while total_length < n_items:
+                    while not self._buffer and not self._finished:
+                        if self._activation_request is not None:
+                            self._activate(self._activation_request)
+                            continue
+
+                        now = time.monotonic()
+                        member_deadline = None
+                        if self._member_timeout > 0 and self._in_flight is not None:
+                            member_deadline = self._in_flight[1] + self._member_timeout
+                            if now >= member_deadline:
+                                taken.append(self._abandon_in_flight("member timeout exceeded"))
+                                continue
+
+                        if deadline is not None and now >= deadline:
+                            if self._in_flight is not None:
+                                taken.append(self._abandon_in_flight("deadline exceeded"))
+                            return taken, self._finished and not self._buffer
+
+                        wait_until = min((limit for limit in (deadline, member_deadline) if limit is not None),
+                                         default=None)
+                        self._condition.wait(None if wait_until is None else wait_until - now)
+
+                    if not self._buffer:
+                        if self._exception is not None:
+                            raise self._exception
+                        break
+
+                    member_index, page, member_exhausted = self._buffer.popleft()
+                    self._notify()
+                    for i, generator_return in enumerate(page):
+                        if total_length + len(generator_return.result) > n_items:
+                            head, tail = split_generator_return(generator_return, n_items - total_length)
+                            taken.append((member_index, head))
+                            total_length += len(head.result)
+                            self._buffer.appendleft((member_index, [tail] + page[i + 1:], member_exhausted))
+                            break
+                        taken.append((member_index, generator_return))
+                        total_length += len(generator_return.result)
+                return taken, self._finished and not self._buffer
+            finally:
+                self._demand = False
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator, Generic, Hashable, Optional, TypeVar
+
+from ..consts import TypedParserName
+from ..plugins_management.config_management import LoadableConfigProtocol
+from ..plugins_management.http_client import get_transport_failures
+from .async_support import EVENT_LOOP
+
+RESULT_CACHE_MAX_ENTRIES = 512
+RESULT_CACHE_TTL = 15 * 60
+
+
+def get_config_hash(config: Optional[LoadableConfigProtocol]) -> str:
+    if config is None:
+        return ""
+    return json.dumps(config.data, sort_keys=True, default=str)
+
+
+def get_query_key(*args: Any, **kwargs: Any) -> str:
+    return json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+T = TypeVar("T")
+class CachedBatchStream(Generic[T]):
+    """Results of a single batch generator call. Already produced items are replayed to every
+    reader and the paused generator is resumed only when someone needs more"""
+
+    def __init__(self, generator_initializer: Callable[[], Generator[tuple[list[T], str], int, tuple[list[T], str]]]):
+        self._generator_initializer = generator_initializer
+        self._generator: Optional[Generator[tuple[list[T], str], int, tuple[list[T], str]]] = None
+        self._lock = threading.Lock()
+        self.items: list[T] = []
+        self.exhausted = False
+        self.failed = False
+        self._error_message = ""
+        self._transport_failed = False
+
+    def read(self, position: int, batch_size: int) -> tuple[list[T], str, bool, bool]:
+        """Returns at most batch_size items starting from position, error message,
+        whether the stream has nothing more after these items and
+        whether pulling them failed to reach the source (see http_client.get_transport_failures)"""
+        with self._lock:
+            if len(self.items) - position < batch_size and not self.exhausted:
+                self._pull(batch_size - (len(self.items) - position))
+            # a slice is a copy, so readers can't change items replayed to others
+            batch = self.items[position:position + batch_size]
+            error_message, self._error_message = self._error_message, ""
+            transport_failed, self._transport_failed = self._transport_failed, False
+            return (batch,
+                    error_message,
+                    self.exhausted and position + len(batch) >= len(self.items),
+                    transport_failed)
+
+    async def read_async(self, position: int, batch_size: int) -> tuple[list[T], str, bool, bool]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.read, position, batch_size)
+
+    def _pull(self, n_items: int) -> None:
+        transport_failures = get_transport_failures()
+        try:
+            if self._generator is None:
+                self._generator = self._generator_initializer()
+                next(self._generator)
+            batch, self._error_message = self._generator.send(n_items)
+        except StopIteration as e:
+            batch, self._error_message = e.value
+            self.exhausted = True
+        except Exception:
+            self.failed = True
+            raise
+        finally:
+            self._transport_failed = get_transport_failures() > transport_failures
+        self.items.extend(batch)
+        # errors are most likely transient, so empty failed results aren't memoized
+        if self.exhausted and not self.items and self._error_message:
+            self.failed = True
+
+    def close(self) -> None:
+        if self._generator is None:
+            return
+        try:
+            self._generator.close()
+        except ValueError:  # generator is being read by another thread
+            pass
+
+
+class AsyncCachedBatchStream(CachedBatchStream[T]):
+    """CachedBatchStream of an async batch getter. The getter is pulled only on the shared event loop,
+    so reading it doesn't occupy a thread. Async getters yield (batch, error message) pairs
+    and their end is an empty batch"""
+
+    def __init__(self, generator_initializer: Callable[[], AsyncGenerator[tuple[list[T], str], int]]):
+        super().__init__(generator_initializer)  # type: ignore
+        self._async_generator: Optional[AsyncGenerator[tuple[list[T], str], int]] = None
+        # created lazily, as it has to be used on the event loop only
+        self._async_lock: Optional[asyncio.Lock] = None
+        self._got_error = False
+
+    def read(self, position: int, batch_size: int) -> tuple[list[T], str, bool, bool]:
+        return EVENT_LOOP.run(self.read_async(position, batch_size))
+
+    async def read_async(self, position: int, batch_size: int) -> tuple[list[T], str, bool, bool]:
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if len(self.items) - position < batch_size and not self.exhausted:
+                await self._pull_async(batch_size - (len(self.items) - position))
+            batch = self.items[position:position + batch_size]
+            error_message, self._error_message = self._error_message, ""
+            transport_failed, self._transport_failed = self._transport_failed, False
+            return (batch,
+                    error_message,
+                    self.exhausted and position + len(batch) >= len(self.items),
+                    transport_failed)
+
+    async def _pull_async(self, n_items: int) -> None:
+        # counts requests that async getters make through the shared client on the event loop thread
+        transport_failures = get_transport_failures()
+        try:
+            if self._async_generator is None:
+                self._async_generator = self._generator_initializer()  # type: ignore
+                await self._async_generator.asend(None)  # type: ignore
+            batch, self._error_message = await self._async_generator.asend(n_items)  # type: ignore
+        except StopAsyncIteration:
+            batch, self._error_message = [], ""
+            self.exhausted = True
+        except Exception:
+            self.failed = True
+            raise
+        finally:
+            self._transport_failed = get_transport_failures() > transport_failures
+        self.items.extend(batch)
+        self._got_error = self._got_error or bool(self._error_message)
+        if self.exhausted and not self.items and self._got_error:
+            self.failed = True
+
+    def close(self) -> None:
+        if self._async_generator is None:
+            return
+
+        async def close_generator(async_generator: AsyncGenerator) -> None:
+            try:
+                await async_generator.aclose()
+            except RuntimeError:  # generator is being read
+                pass
+        EVENT_LOOP.submit(close_generator(self._async_generator))
+
+
+class ResultCache:
+    """LRU cache of parsers results with expiration.
+    Keys consist of parser identity, hash of its config data and the query"""
+
+    def __init__(self,
+                 max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 ttl: float = RESULT_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def _get(self, key: Hashable) -> Optional[Any]:
+        if (entry := self._entries.get(key)) is None:
+            return None
+        created_at, value = entry
+        if self._clock() - created_at > self.ttl:
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: Hashable) -> None:
+        _, value = self._entries.pop(key)
+        if isinstance(value, CachedBatchStream):
+            value.close()
+
+    def get_results(self,
+                    parser_info: TypedParserName,
+                    config: Optional[LoadableConfigProtocol],
+                    query: str,
+                    compute: Callable[[], tuple[list[T], str]]) -> tuple[list[T], str]:
+        """Memoized word definition function call. Failed calls aren't memoized.
+        Callers get their own copies of the results list, so they can't change the memoized one"""
+        key = (parser_info, get_config_hash(config), query)
+        with self._lock:
+            if (cached := self._get(key)) is not None:
+                return list(cached[0]), cached[1]
+
+        results, error_message = compute()
+        self._put_results(key, results, error_message)
+        return results, error_message
+
+    async def get_results_async(self,
+                                parser_info: TypedParserName,
+                                config: Optional[LoadableConfigProtocol],
+                                query: str,
+                                compute: Callable[[], Awaitable[tuple[list[T], str]]]) -> tuple[list[T], str]:
+        """get_results for async word definition functions"""
+        key = (parser_info, get_config_hash(config), query)
+        with self._lock:
+            if (cached := self._get(key)) is not None:
+                return list(cached[0]), cached[1]
+
+        results, error_message = await compute()
+        self._put_results(key, results, error_message)
+        return results, error_message
+
+    def _put_results(self, key: Hashable, results: list[Any], error_message: str) -> None:
+        if results or not error_message:
+            with self._lock:
+                self._put(key, (tuple(results), error_message))
+
+    def get_stream(self,
+                   parser_info: TypedParserName,
+                   config: Optional[LoadableConfigProtocol],
+                   query_key: str,
+                   generator_initializer: Callable[[], Generator[tuple[list[T], str], int, tuple[list[T], str]] |
+                                                       AsyncGenerator[tuple[list[T], str], int]],
+                   is_async: bool = False) -> CachedBatchStream[T]:
+        """is_async: generator_initializer creates an async batch getter"""
+        key = (parser_info, get_config_hash(config), query_key)
+        with self._lock:
+            stream = self._get(key)
+            if stream is None or stream.failed:
+                stream = AsyncCachedBatchStream(generator_initializer) if is_async \
+                    else CachedBatchStream(generator_initializer)  # type: ignore
+                self._put(key, stream)
+            return stream
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._discard(key)
+
+
+RESULT_CACHE = ResultCache()
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+import pytest
+
+from ..app_utils.cards import Card
+from ..consts import ParserType
+from .read_ahead import ReadAheadReader
+from .result_cache import RESULT_CACHE
+from .wrappers import BatchGeneratorWrapper, WebCardGenerator
+
+
+class DummyConfig:
+    def __init__(self, name: str):
+        self.data = {"name": name}
+
+
+async def async_define(word: str):
+    await asyncio.sleep(0.01)
+    return [{"word": word}], ""
+
+
+async def async_batch_getter(word: str, card_data: dict):
+    batch_size = yield
+    items = [f"{word} {i}" for i in range(5)]
+    while items:
+        await asyncio.sleep(0.01)
+        batch, items = items[:batch_size], items[batch_size:]
+        batch_size = yield batch, ""
+
+
+async def _pages(async_generator, batch_size: int):
+    try:
+        while True:
+            yield await async_generator.asend(batch_size)
+    except StopAsyncIteration:
+        return
+
+
+def test_async_definition():
+    generator = WebCardGenerator(async_define, "async define", DummyConfig("async define"), "")
+    assert generator.is_async
+
+    results = generator.get("word", lambda card: card["word"] == "word")
+    assert len(results) == 1
+    assert results[0].result == [Card({"word": "word"})]
+    assert not results[0].error_message
+
+    async_results = asyncio.run(generator.get_async("other"))
+    assert async_results[0].result == [Card({"word": "other"})]
+
+
+def test_async_batch_generator():
+    wrapper = BatchGeneratorWrapper(ParserType.web, "async getter", DummyConfig("async getter"), async_batch_getter)
+    assert wrapper.is_async
+
+    generator = wrapper.get("word", {})
+    next(generator)
+    assert generator.send(2)[0].result == ["word 0", "word 1"]
+    assert generator.send(2)[0].result == ["word 2", "word 3"]
+    assert generator.send(2)[0].result == ["word 4"]
+    # async getters can't return, so their end is an empty batch
+    with pytest.raises(StopIteration) as stop:
+        generator.send(2)
+    assert stop.value.value[0].result == []
+
+    # replayed from the result cache
+    async def read_all() -> list[str]:
+        async_generator = wrapper.get_async("word", {})
+        await async_generator.asend(None)
+        return [item async for page in _pages(async_generator, 3) for item in page[0].result]
+    assert asyncio.run(read_all()) == [f"word {i}" for i in range(5)]
+
+
+def test_read_ahead_of_async_members():
+    RESULT_CACHE.clear()
+    members = [(f"async getter [{i}]", BatchGeneratorWrapper(ParserType.web,
+                                                              f"async getter [{i}]",
+                                                              DummyConfig(f"async getter [{i}]"),
+                                                              async_batch_getter))
+               for i in range(2)]
+    for depth in (0, 2):
+        reader = ReadAheadReader(members, lambda enum_name: None, set(), depth, 3, False, 0, None, "test", "word", {})
+        try:
+            read_ahead_threads = [thread for thread in threading.enumerate() if thread.name.startswith("test")]
+            assert not read_ahead_threads
+
+            items = []
+            while True:
+                taken, exhausted = reader.take(3)
+                items.extend(item for _, generator_result in taken for item in generator_result.result)
+                if exhausted:
+                    break
+            assert items == [f"word {i}" for i in range(5)] * 2
+        finally:
+            reader.cancel()
@@ -0,0 +1,96 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from ..app_utils.cards import Card
+from ..plugins_management import http_client
+from .monitoring import ChainStatistics, CircuitState, SourceHealthTracker
+from .wrappers import WebCardGenerator
+
+
+class DummyConfig:
+    def __init__(self, name: str):
+        self.data = {"name": name}
+
+
+class WordPageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/word":
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"word")
+        elif self.path == "/down":
+            self.send_response(503)
+            self.end_headers()
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WordPageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_define(base_url: str):
+    def define(word: str):
+        try:
+            response = http_client.get(f"{base_url}/{word}")
+            response.raise_for_status()
+        except requests.RequestException as e:
+            return [], str(e)
+        return [{"word": response.text}], ""
+    return define
+
+
+def test_not_found_is_success(server_url):
+    generator = WebCardGenerator(make_define(server_url), "not found", DummyConfig("not found"), "")
+    tracker = SourceHealthTracker(failure_threshold=2)
+
+    for _ in range(3):
+        results = generator.get("missing")
+        assert not results[0].result and results[0].error_message
+        assert not results[0].transport_failed
+        tracker.record_results(generator.parser_info, results)
+    health = tracker.get_snapshot()[generator.parser_info]
+    assert health.state == CircuitState.closed
+    assert health.total_failures == 0
+
+    results = generator.get("word")
+    assert results[0].result == [Card({"word": "word"})]
+
+
+def test_transport_failures_open_circuit(server_url):
+    tracker = SourceHealthTracker(failure_threshold=2)
+    unreachable_url = "http://127.0.0.1:9"  # discard port, nothing listens there
+    for base_url in (server_url, unreachable_url):
+        generator = WebCardGenerator(make_define(base_url), base_url, DummyConfig(base_url), "")
+        for _ in range(2):
+            results = generator.get("down")
+            assert not results[0].result and results[0].transport_failed
+            tracker.record_results(generator.parser_info, results)
+        assert not tracker.allow(generator.parser_info)
+
+
+def test_slow_tail_is_tried_later(tmp_path):
+    chain_statistics = ChainStatistics(str(tmp_path / "statistics.json"))
+    for i in range(20):
+        chain_statistics.record("steady", 0.2, True)
+        # same median, but every tenth call hangs
+        chain_statistics.record("flaky", 5 if i % 10 == 0 else 0.2, True)
+    assert chain_statistics.get_order(["flaky", "steady"]) == ["steady", "flaky"]
+
+    chain_statistics.save()
+    assert ChainStatistics(str(tmp_path / "statistics.json")).get_order(["flaky", "steady"]) == ["steady", "flaky"]
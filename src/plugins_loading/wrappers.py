@@ -1,30 +1,49 @@
+import asyncio
 import json
 import os
 from abc import ABC, abstractmethod, abstractproperty
 from dataclasses import dataclass, field
-from typing import Callable, Generator, Generic, Literal, Optional, TypeVar
+from typing import AsyncGenerator, Awaitable, Callable, Generator, Generic, Literal, Optional, TypeVar
 
 from ..consts import CardFormat, ParserType, TypedParserName
 from ..plugins_management.config_management import (HasConfigFile,
                                                     LoadableConfig,
                                                     LoadableConfigProtocol)
+from ..plugins_management.http_client import get_transport_failures
 from ..app_utils.cards import Card
+from .async_support import (EVENT_LOOP, is_async_batch_generator,
+                            is_async_definition, to_async_definition)
+from .monitoring import SOURCE_HEALTH, get_circuit_open_message
+from .result_cache import RESULT_CACHE, CachedBatchStream, get_query_key
 
 T = TypeVar("T")
 @dataclass(init=False, slots=True, frozen=True, eq=False, kw_only=True, order=False, match_args=True, unsafe_hash=False)
 class GeneratorReturn(Generic[T]):
+    """transport_failed: the source couldn't be reached (connection error, timeout, 5xx response),
+    as opposed to an error message of a source that simply has nothing for the query"""
     parser_info: TypedParserName
     result: T
     error_message: str
+    transport_failed: bool
 
     def __init__(self, 
                  generator_type: Literal[ParserType.web, ParserType.local],
                  name: str,
                  result: T,
-                 error_message: str) -> None:
+                 error_message: str,
+                 transport_failed: bool = False) -> None:
         object.__setattr__(self, "parser_info", TypedParserName(parser_t=generator_type, name=name))
         object.__setattr__(self, "result", result)
         object.__setattr__(self, "error_message", error_message)
+        object.__setattr__(self, "transport_failed", transport_failed)
+
+
+def get_skipped_return(parser_info: TypedParserName) -> GeneratorReturn:
+    """Empty result of a source that is skipped by the circuit breaker"""
+    return GeneratorReturn(generator_type=parser_info.parser_t,  # type: ignore
+                           name=parser_info.name,
+                           result=[],
+                           error_message=get_circuit_open_message(parser_info))
 
 
 class TypedParser(ABC):
@@ -44,8 +63,19 @@ class CardGeneratorProtocol(TypedParser, HasConfigFile, ABC):
             additional_filter: Callable[[CardFormat], bool] | None = None) -> list[GeneratorReturn[list[Card]]]:
         ...
 
+    @property
+    def is_async(self) -> bool:
+        """Whether get_async is served by the event loop without occupying a thread"""
+        return False
+
+    async def get_async(self,
+                        query: str,
+                        additional_filter: Callable[[CardFormat], bool] | None = None) -> list[GeneratorReturn[list[Card]]]:
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: self.get(query, additional_filter))
 
-WEB_DEFITION_FUNCTION_T = Callable[[str], tuple[list[CardFormat], str]]
+
+DEFINITION_RETURN_T = tuple[list[CardFormat], str]
+WEB_DEFITION_FUNCTION_T = Callable[[str], DEFINITION_RETURN_T | Awaitable[DEFINITION_RETURN_T]]
 @dataclass(init=False, slots=True, frozen=True, eq=False, kw_only=True, order=False, repr=False, match_args=True, unsafe_hash=False)
 class WebCardGenerator(CardGeneratorProtocol):
     parser_info:              TypedParserName
@@ -63,27 +93,57 @@ class WebCardGenerator(CardGeneratorProtocol):
         object.__setattr__(self, "config", config)
         object.__setattr__(self, "scheme_docs", scheme_docs)
 
-    def _get_search_subset(self, query: str) -> tuple[list[CardFormat], str]:
-        return self.word_definition_function(query)
+    @property
+    def is_async(self) -> bool:
+        return is_async_definition(self.word_definition_function)
 
-    def get(self,
-            query: str,
-            additional_filter: Callable[[CardFormat], bool] | None = None) -> list[GeneratorReturn[list[Card]]]:
+    def _get_search_subset(self, query: str) -> tuple[list[CardFormat], str]:
+        return RESULT_CACHE.get_results(self.parser_info, self.config, query,
+                                        lambda: self.word_definition_function(query))  # type: ignore
+
+    async def _get_search_subset_async(self, query: str) -> tuple[list[CardFormat], str]:
+        return await RESULT_CACHE.get_results_async(self.parser_info, self.config, query,
+                                                    lambda: to_async_definition(self.word_definition_function, query))
+
+    def _wrap_results(self,
+                      results: list[CardFormat],
+                      error_message: str,
+                      additional_filter: Callable[[CardFormat], bool] | None,
+                      transport_failed: bool) -> list[GeneratorReturn[list[Card]]]:
         if additional_filter is None:
             additional_filter = lambda _: True
 
-        results, error_message = self._get_search_subset(query)
         res: list[Card] = [Card(item) for item in results if additional_filter(item)]
 
         return [GeneratorReturn(generator_type=ParserType.web, 
                                 name=self.parser_info.name, 
                                 result=res, 
-                                error_message=error_message)]
+                                error_message=error_message,
+                                transport_failed=transport_failed)]
+
+    def get(self,
+            query: str,
+            additional_filter: Callable[[CardFormat], bool] | None = None) -> list[GeneratorReturn[list[Card]]]:
+        if self.is_async:
+            return EVENT_LOOP.run(self.get_async(query, additional_filter))
+        transport_failures = get_transport_failures()
+        results, error_message = self._get_search_subset(query)
+        return self._wrap_results(results, error_message, additional_filter,
+                                  get_transport_failures() > transport_failures)
+
+    async def get_async(self,
+                        query: str,
+                        additional_filter: Callable[[CardFormat], bool] | None = None) -> list[GeneratorReturn[list[Card]]]:
+        # counts requests that async plugins make through the shared client on the event loop thread
+        transport_failures = get_transport_failures()
+        results, error_message = await self._get_search_subset_async(query)
+        return self._wrap_results(results, error_message, additional_filter,
+                                  get_transport_failures() > transport_failures)
 
 
 
 DICTIONARY_T = TypeVar("DICTIONARY_T")
-LOCAL_DEFITION_FUNCTION_T = Callable[[str, DICTIONARY_T], tuple[list[CardFormat], str]]
+LOCAL_DEFITION_FUNCTION_T = Callable[[str, DICTIONARY_T], DEFINITION_RETURN_T | Awaitable[DEFINITION_RETURN_T]]
 @dataclass(init=False, slots=True, frozen=True, eq=False, kw_only=True, order=False, repr=False, match_args=True, unsafe_hash=False)
 class LocalCardGenerator(Generic[DICTIONARY_T], CardGeneratorProtocol):
     parser_info:              TypedParserName
@@ -109,22 +169,53 @@ class LocalCardGenerator(Generic[DICTIONARY_T], CardGeneratorProtocol):
         with open(local_dict_path, "r", encoding="UTF-8") as f:
             object.__setattr__(self, "local_dictionary", json.load(f))
 
-    def _get_search_subset(self, query: str) -> tuple[list[CardFormat], str]:
-        return self.word_definition_function(query, self.local_dictionary)
+    @property
+    def is_async(self) -> bool:
+        return is_async_definition(self.word_definition_function)
 
-    def get(self,
-            query: str,
-            additional_filter: Callable[[CardFormat], bool] | None = None) -> list[GeneratorReturn[list[Card]]]:
+    def _get_search_subset(self, query: str) -> tuple[list[CardFormat], str]:
+        return RESULT_CACHE.get_results(self.parser_info, self.config, query,
+                                        lambda: self.word_definition_function(query, self.local_dictionary))  # type: ignore
+
+    async def _get_search_subset_async(self, query: str) -> tuple[list[CardFormat], str]:
+        return await RESULT_CACHE.get_results_async(
+            self.parser_info, self.config, query,
+            lambda: to_async_definition(self.word_definition_function, query, self.local_dictionary))
+
+    def _wrap_results(self,
+                      results: list[CardFormat],
+                      error_message: str,
+                      additional_filter: Callable[[CardFormat], bool] | None,
+                      transport_failed: bool) -> list[GeneratorReturn[list[Card]]]:
         if additional_filter is None:
             additional_filter = lambda _: True
 
-        results, error_message = self._get_search_subset(query)
         res: list[Card] = [Card(item) for item in results if additional_filter(item)]
 
         return [GeneratorReturn(generator_type=ParserType.local, 
                                 name=self.parser_info.name, 
                                 result=res, 
-                                error_message=error_message)]
+                                error_message=error_message,
+                                transport_failed=transport_failed)]
+
+    def get(self,
+            query: str,
+            additional_filter: Callable[[CardFormat], bool] | None = None) -> list[GeneratorReturn[list[Card]]]:
+        if self.is_async:
+            return EVENT_LOOP.run(self.get_async(query, additional_filter))
+        transport_failures = get_transport_failures()
+        results, error_message = self._get_search_subset(query)
+        return self._wrap_results(results, error_message, additional_filter,
+                                  get_transport_failures() > transport_failures)
+
+    async def get_async(self,
+                        query: str,
+                        additional_filter: Callable[[CardFormat], bool] | None = None) -> list[GeneratorReturn[list[Card]]]:
+        # counts requests that async plugins make through the shared client on the event loop thread
+        transport_failures = get_transport_failures()
+        results, error_message = await self._get_search_subset_async(query)
+        return self._wrap_results(results, error_message, additional_filter,
+                                  get_transport_failures() > transport_failures)
 
 
 S = TypeVar("S")
@@ -133,15 +224,40 @@ class WrappedBatchGeneratorProtocol(TypedParser, HasConfigFile, ABC, Generic[S])
     def get(self, *arg, **kwargs) -> Generator[list[GeneratorReturn[S]], int, list[GeneratorReturn[S]]]:
         ...
 
+    @property
+    def is_async(self) -> bool:
+        """Whether get_async is served by the event loop without occupying a thread"""
+        return False
+
+    async def get_async(self, *arg, **kwargs) -> AsyncGenerator[list[GeneratorReturn[S]], int]:
+        """Async version of get. Starts the same way (batch_size = yield).
+        As async generators can't return values, the last page is yielded and the generator is over"""
+        batch_size = yield  # type: ignore
+        loop = asyncio.get_running_loop()
+        generator = self.get(*arg, **kwargs)
+        next(generator)
+        try:
+            while True:
+                try:
+                    page = await loop.run_in_executor(None, generator.send, batch_size)
+                except StopIteration as e:
+                    yield e.value
+                    return
+                batch_size = yield page
+        finally:
+            generator.close()
+
 
 BATCH_T =  TypeVar("BATCH_T")
 class BatchGeneratorWrapper(WrappedBatchGeneratorProtocol[BATCH_T]):
-    """It is guaranteed that it will start"""
+    """It is guaranteed that it will start.
+    Async generator initializers are driven by the shared event loop"""
     _parser_type:          Literal[ParserType.web, ParserType.local]
     generator_initializer: Callable[..., 
                                     Generator[tuple[BATCH_T, str], 
                                               int, 
-                                              tuple[BATCH_T, str]]]
+                                              tuple[BATCH_T, str]] |
+                                    AsyncGenerator[tuple[BATCH_T, str], int]]
     _parser_info: TypedParserName
     _config: LoadableConfigProtocol
 
@@ -160,37 +276,62 @@ class BatchGeneratorWrapper(WrappedBatchGeneratorProtocol[BATCH_T]):
                  generator_initializer: Callable[[str, CardFormat], 
                                                  Generator[tuple[BATCH_T, str], 
                                                            int, 
-                                                           tuple[BATCH_T, str]]]) -> None:
+                                                           tuple[BATCH_T, str]] |
+                                                 AsyncGenerator[tuple[BATCH_T, str], int]]) -> None:
         self._parser_info = TypedParserName(parser_t=parser_type, name=parser_name)
         self._parser_type = parser_type
         self._config = config
+        self._is_async = is_async_batch_generator(generator_initializer)
         self.generator_initializer = generator_initializer
 
+    @property
+    def is_async(self) -> bool:
+        return self._is_async
+
+    def _get_stream(self, *arg, **kwargs) -> CachedBatchStream:
+        # same query resumes the cached generator instead of starting over
+        return RESULT_CACHE.get_stream(self.parser_info,
+                                       self._config,
+                                       get_query_key(*arg, **kwargs),
+                                       lambda: self.generator_initializer(*arg, **kwargs),
+                                       is_async=self.is_async)
+
+    def _wrap_batch(self,
+                    batch_results: BATCH_T,
+                    error_message: str,
+                    transport_failed: bool) -> list[GeneratorReturn[BATCH_T]]:
+        return [GeneratorReturn(generator_type=self._parser_type,
+                                name=self.parser_info.name,
+                                result=batch_results,
+                                error_message=error_message,
+                                transport_failed=transport_failed)]
+
     def get(self, *arg, **kwargs) -> Generator[list[GeneratorReturn[BATCH_T]], 
                                                int, 
                                                list[GeneratorReturn[BATCH_T]]]:
         batch_size = yield  # type: ignore
-        generator = self.generator_initializer(*arg, **kwargs)
-        try:
-            next(generator)
-        except StopIteration as e:
-            return [GeneratorReturn(generator_type=self._parser_type,
-                                    name=self.parser_info.name,
-                                    result=e.value[0],
-                                    error_message=e.value[1])] 
-
+        stream = self._get_stream(*arg, **kwargs)
+        position = 0
         while True:
-            try:
-                batch_results, error_message = generator.send(batch_size)
-                batch_size = yield [GeneratorReturn(generator_type=self._parser_type,
-                                                    name=self.parser_info.name,
-                                                    result=batch_results,
-                                                    error_message=error_message)]
-            except StopIteration as e:
-                return [GeneratorReturn(generator_type=self._parser_type,
-                                        name=self.parser_info.name,
-                                        result=e.value[0],
-                                        error_message=e.value[1])]
+            batch_results, error_message, exhausted, transport_failed = stream.read(position, batch_size)
+            position += len(batch_results)
+            generator_results = self._wrap_batch(batch_results, error_message, transport_failed)  # type: ignore
+            if exhausted:
+                return generator_results
+            batch_size = yield generator_results
+
+    async def get_async(self, *arg, **kwargs) -> AsyncGenerator[list[GeneratorReturn[BATCH_T]], int]:
+        batch_size = yield  # type: ignore
+        stream = self._get_stream(*arg, **kwargs)
+        position = 0
+        while True:
+            batch_results, error_message, exhausted, transport_failed = await stream.read_async(position, batch_size)
+            position += len(batch_results)
+            generator_results = self._wrap_batch(batch_results, error_message, transport_failed)  # type: ignore
+            if exhausted:
+                yield generator_results
+                return
+            batch_size = yield generator_results
 
 
 BATCH_V = TypeVar("BATCH_V")
@@ -209,6 +350,12 @@ class ExternalDataGenerator(TypedParser, Generic[BATCH_V]):
         self._start()
 
     def _start(self):
+        if (previous_generator := getattr(self, "_data_generator", None)) is not None:
+            # stops background prefetching of the previous query
+            try:
+                previous_generator.close()
+            except ValueError:  # generator is already executing
+                pass
         self._data_generator = self._get_data_generator()
         next(self._data_generator)
 
@@ -221,6 +368,8 @@ class ExternalDataGenerator(TypedParser, Generic[BATCH_V]):
     def _get_data_generator(self) -> Generator[list[GeneratorReturn[BATCH_V]], int, None]:
         batch_size = yield  # type: ignore
 
+        # chains consult health tracker for each of their members
+        source_info = self.data_generator.parser_info
         data_generator = self.data_generator.get(*self._args_params, **self._kwargs_param)
         try:
             next(data_generator)
@@ -229,14 +378,26 @@ class ExternalDataGenerator(TypedParser, Generic[BATCH_V]):
             return
 
         self._update_status = False
-        while True:
-            try:
-                batch_size = yield data_generator.send(batch_size)
+        try:
+            while True:
+                if not SOURCE_HEALTH.allow(source_info):
+                    yield [get_skipped_return(source_info)]
+                    return
+                try:
+                    page = data_generator.send(batch_size)
+                except StopIteration as e:
+                    SOURCE_HEALTH.record_results(source_info, e.value)
+                    yield e.value
+                    return
+                except Exception as e:
+                    SOURCE_HEALTH.record_failure(source_info, str(e))
+                    raise
+                SOURCE_HEALTH.record_results(source_info, page)
+                batch_size = yield page
                 if self._update_status :
                     break
-            except StopIteration as e:
-                yield e.value
-                return
+        finally:
+            data_generator.close()
 
     def get(self, batch_size: int, *args, **kwargs) -> Optional[list[GeneratorReturn[BATCH_V]]]:
         if self._args_params != args or self._kwargs_param != kwargs:
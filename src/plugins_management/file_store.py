@@ -0,0 +1,138 @@
+"""
+Size-bounded persistent store of files with least recently used eviction.
+Index is kept in SQLite, contents are stored once per their sha256 digest.
+Shared by the HTTP cache and the image cache.
+"""
+
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+_SCHEME = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    digest      TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    metadata    TEXT NOT NULL,
+    stored_at   REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class StoredFile:
+    content:   bytes
+    metadata:  dict[str, Any]
+    stored_at: float
+
+
+class LRUFileStore:
+    def __init__(self,
+                 store_dir: str,
+                 max_size: int,
+                 clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self._clock = clock
+        self._files_dir = os.path.join(store_dir, "files")
+        os.makedirs(self._files_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(store_dir, "index.sqlite3"), check_same_thread=False)
+        self._connection.executescript(_SCHEME)
+
+    def _get_file_path(self, digest: str) -> str:
+        return os.path.join(self._files_dir, digest[:2], digest)
+
+    def get(self, key: str) -> Optional[StoredFile]:
+        with self._lock:
+            row = self._connection.execute("SELECT digest, metadata, stored_at FROM entries WHERE key = ?",
+                                           (key,)).fetchone()
+            if row is None:
+                return None
+            digest, metadata, stored_at = row
+            try:
+                with open(self._get_file_path(digest), "rb") as stored_file:
+                    content = stored_file.read()
+            except OSError:  # file was removed by hand
+                self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._connection.commit()
+                return None
+            self._connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (self._clock(), key))
+            self._connection.commit()
+        return StoredFile(content=content, metadata=json.loads(metadata), stored_at=stored_at)
+
+    def put(self, key: str, content: bytes, metadata: Optional[dict[str, Any]] = None) -> None:
+        digest = hashlib.sha256(content).hexdigest()
+        file_path = self._get_file_path(digest)
+        # content is written outside the lock, but it becomes visible only together with its row,
+        # so that eviction can't remove it in between
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as stored_file:
+            stored_file.write(content)
+
+        now = self._clock()
+        with self._lock:
+            try:
+                os.replace(temp_path, file_path)
+            except OSError:
+                os.remove(temp_path)
+                raise
+            previous = self._connection.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            self._connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                                     (key, digest, len(content), json.dumps(metadata or {}), now, now))
+            if previous is not None and previous[0] != digest:
+                self._remove_unreferenced_file(previous[0])
+            self._evict()
+            self._connection.commit()
+
+    def refresh(self, key: str) -> None:
+        """Marks entry as just stored"""
+        now = self._clock()
+        with self._lock:
+            self._connection.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                                     (now, now, key))
+            self._connection.commit()
+
+    def _remove_unreferenced_file(self, digest: str) -> None:
+        if self._connection.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+            try:
+                os.remove(self._get_file_path(digest))
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        """Removes least recently used entries until total size fits max_size"""
+        total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total_size <= self.max_size:
+            return
+        for key, digest, size in self._connection.execute(
+                "SELECT key, digest, size FROM entries ORDER BY accessed_at").fetchall():
+            self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._remove_unreferenced_file(digest)
+            total_size -= size
+            if total_size <= self.max_size:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            for (digest,) in self._connection.execute("SELECT DISTINCT digest FROM entries").fetchall():
+                try:
+                    os.remove(self._get_file_path(digest))
+                except OSError:
+                    pass
+            self._connection.execute("DELETE FROM entries")
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
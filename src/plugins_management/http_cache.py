@@ -0,0 +1,86 @@
+"""
+Persistent cache of HTTP GET responses used by the shared HTTP client.
+Responses are kept in a size-bounded LRU file store.
+"""
+
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .file_store import LRUFileStore
+
+DEFAULT_MAX_SIZE = 256 * 2 ** 20
+DEFAULT_TTL = 24 * 60 * 60
+# Dictionary pages almost never change
+HOST_TTLS = {
+    "dictionary.cambridge.org": 7 * 24 * 60 * 60,
+    "forvo.com":                7 * 24 * 60 * 60,
+    "sentencedict.com":         7 * 24 * 60 * 60,
+    "searchsentences.com":      7 * 24 * 60 * 60,
+    "api.dictionaryapi.dev":    7 * 24 * 60 * 60,
+}
+
+
+@dataclass(slots=True, frozen=True)
+class CachedResponse:
+    url:           str
+    status:        int
+    headers:       dict[str, str]
+    content:       bytes
+    etag:          Optional[str]
+    last_modified: Optional[str]
+    stored_at:     float
+
+
+class HTTPCache:
+    def __init__(self,
+                 cache_dir: str,
+                 max_size: int = DEFAULT_MAX_SIZE,
+                 default_ttl: float = DEFAULT_TTL,
+                 host_ttls: Optional[dict[str, float]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.default_ttl = default_ttl
+        self.host_ttls = HOST_TTLS if host_ttls is None else host_ttls
+        self._clock = clock
+        self._store = LRUFileStore(cache_dir, max_size, clock)
+
+    def get_ttl(self, host: str) -> float:
+        """TTL of the host or of its closest parent domain"""
+        domain = host.split(":")[0]
+        while domain:
+            if (ttl := self.host_ttls.get(domain)) is not None:
+                return ttl
+            _, _, domain = domain.partition(".")
+        return self.default_ttl
+
+    def is_fresh(self, host: str, cached_response: CachedResponse) -> bool:
+        return self._clock() - cached_response.stored_at < self.get_ttl(host)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        if (stored := self._store.get(url)) is None:
+            return None
+        return CachedResponse(url=url,
+                              status=stored.metadata["status"],
+                              headers=stored.metadata["headers"],
+                              content=stored.content,
+                              etag=stored.metadata["etag"],
+                              last_modified=stored.metadata["last_modified"],
+                              stored_at=stored.stored_at)
+
+    def put(self, url: str, host: str, status: int, headers: dict[str, str], content: bytes) -> None:
+        self._store.put(url, content, {"host":          host,
+                                       "status":        status,
+                                       "headers":       headers,
+                                       "etag":          headers.get("ETag"),
+                                       "last_modified": headers.get("Last-Modified")})
+
+    def refresh(self, url: str) -> None:
+        """Marks entry as fresh after successful revalidation"""
+        self._store.refresh(url)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def close(self) -> None:
+        self._store.close()
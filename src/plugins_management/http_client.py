@@ -0,0 +1,199 @@
+"""
+Shared HTTP client for web plugins and media downloaders.
+Connections are kept alive and pooled per host, so consecutive requests
+to the same site don't pay for TCP and TLS handshakes again.
+"""
+
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.request import ACCEPT_ENCODING
+
+from .http_cache import CachedResponse, HTTPCache
+
+DEFAULT_TIMEOUT = 5
+DEFAULT_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/114.0"
+# gzip and deflate, and br when brotli decoder is installed
+DEFAULT_HEADERS = {
+    "User-Agent": DEFAULT_USER_AGENT,
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+POOL_CONNECTIONS = 16  # number of hosts with kept connections
+POOL_MAXSIZE = 8       # kept connections per host
+# describe transferred body rather than the decoded one that is cached
+_NOT_CACHED_HEADERS = ("Content-Encoding", "Content-Length", "Transfer-Encoding", "Connection", "Keep-Alive")
+
+
+_thread_state = threading.local()
+
+
+def get_transport_failures() -> int:
+    """Number of transport failures (connection errors, timeouts and 5xx responses)
+    of requests made by the current thread. Callers compare it before and after a plugin call
+    to tell an unreachable source from a one that has nothing for the query"""
+    return getattr(_thread_state, "transport_failures", 0)
+
+
+def add_transport_failures(n_failures: int) -> None:
+    """Counts failures of requests made on behalf of the current thread elsewhere, e.g. in a worker process"""
+    _thread_state.transport_failures = get_transport_failures() + n_failures
+
+
+@dataclass(slots=True)
+class HostMetrics:
+    requests:        int = 0
+    errors:          int = 0
+    bytes_received:  int = 0
+    total_time:      float = 0
+    cache_hits:      int = 0
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.requests if self.requests else 0
+
+
+class HTTPClient:
+    def __init__(self,
+                 headers: Optional[dict[str, str]] = None,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE):
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.headers.update(DEFAULT_HEADERS if headers is None else headers)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._metrics_lock = threading.Lock()
+        self._metrics: dict[str, HostMetrics] = {}
+
+        self.cache: Optional[HTTPCache] = None
+        self.offline_fallback = True
+
+    def set_cache(self, cache: Optional[HTTPCache], offline_fallback: bool = True) -> None:
+        """Enables persistent cache of GET responses. When offline_fallback is set,
+        stale cached responses are returned if the network request fails"""
+        if self.cache is not None:
+            self.cache.close()
+        self.cache = cache
+        self.offline_fallback = offline_fallback
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """requests.request with pooled connections. Falls back to default timeout.
+        Headers are merged with default ones. Not streamed GET requests go through the cache"""
+        kwargs.setdefault("timeout", self.timeout)
+        if kwargs.get("params"):
+            url = requests.Request(method, url, params=kwargs.pop("params")).prepare().url  # type: ignore
+        host = urlsplit(url).netloc
+        if method.upper() == "GET" and self.cache is not None and not kwargs.get("stream"):
+            return self._cached_get(self.cache, url, host, **kwargs)
+        return self._send(method, url, host, **kwargs)
+
+    def _cached_get(self, cache: HTTPCache, url: str, host: str, **kwargs: Any) -> requests.Response:
+        if (cached_response := cache.get(url)) is not None and cache.is_fresh(host, cached_response):
+            return self._from_cache(host, cached_response)
+
+        if cached_response is not None:
+            headers = dict(kwargs.pop("headers", None) or {})
+            if cached_response.etag is not None:
+                headers["If-None-Match"] = cached_response.etag
+            if cached_response.last_modified is not None:
+                headers["If-Modified-Since"] = cached_response.last_modified
+            kwargs["headers"] = headers
+
+        try:
+            response = self._send("GET", url, host, **kwargs)
+        except requests.RequestException:
+            if cached_response is not None and self.offline_fallback:
+                return self._from_cache(host, cached_response)
+            raise
+
+        if cached_response is not None:
+            if response.status_code == 304:
+                cache.refresh(url)
+                return self._from_cache(host, cached_response)
+            if response.status_code >= 500 and self.offline_fallback:
+                return self._from_cache(host, cached_response)
+
+        if response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+            cache.put(url, host, response.status_code,
+                      {key: value for key, value in response.headers.items() if key not in _NOT_CACHED_HEADERS},
+                      response.content)
+        return response
+
+    def _from_cache(self, host: str, cached_response: CachedResponse) -> requests.Response:
+        with self._metrics_lock:
+            if (host_metrics := self._metrics.get(host)) is None:
+                host_metrics = self._metrics[host] = HostMetrics()
+            host_metrics.cache_hits += 1
+
+        response = requests.Response()
+        response.url = cached_response.url
+        response.status_code = cached_response.status
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(cached_response.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = cached_response.content
+        return response
+
+    def _send(self, method: str, url: str, host: str, **kwargs: Any) -> requests.Response:
+        start = time.perf_counter()
+        try:
+            response = self._session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self._record(host, time.perf_counter() - start, 0, failed=True)
+            add_transport_failures(1)
+            raise
+        if response.status_code >= 500:
+            add_transport_failures(1)
+        # streamed bodies are counted by Content-Length, others are already read
+        if kwargs.get("stream"):
+            n_bytes = int(response.headers.get("Content-Length", 0) or 0)
+        else:
+            n_bytes = len(response.content)
+        self._record(host, time.perf_counter() - start, n_bytes, failed=not response.ok)
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    def _record(self, host: str, elapsed: float, n_bytes: int, failed: bool) -> None:
+        with self._metrics_lock:
+            if (host_metrics := self._metrics.get(host)) is None:
+                host_metrics = self._metrics[host] = HostMetrics()
+            host_metrics.requests += 1
+            host_metrics.errors += failed
+            host_metrics.bytes_received += n_bytes
+            host_metrics.total_time += elapsed
+
+    def get_metrics(self) -> dict[str, HostMetrics]:
+        with self._metrics_lock:
+            return {host: replace(host_metrics) for host, host_metrics in self._metrics.items()}
+
+    def get_report(self) -> str:
+        return "\n".join(f"{host}: {host_metrics.requests} requests, {host_metrics.errors} failed, "
+                         f"{host_metrics.cache_hits} served from cache, "
+                         f"{host_metrics.bytes_received / 1024:.1f} KiB, "
+                         f"average {host_metrics.average_time * 1000:.0f} ms"
+                         for host, host_metrics in sorted(self.get_metrics().items()))
+
+    def close(self) -> None:
+        self._session.close()
+
+
+HTTP_CLIENT = HTTPClient()
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return HTTP_CLIENT.get(url, **kwargs)